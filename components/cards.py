@@ -53,6 +53,79 @@ def create_stat_card(title, value, change, color, icon):
     )
 
 
+def create_budget_progress(title, spent, amount):
+    """创建预算进度条"""
+    ratio = spent / amount if amount > 0 else 0
+    if ratio >= 1:
+        color = ft.Colors.RED_500
+    elif ratio >= 0.8:
+        color = ft.Colors.ORANGE_500
+    else:
+        color = ft.Colors.GREEN_500
+
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Text(title, size=13, weight=ft.FontWeight.W_500),
+                        ft.Text(
+                            f"¥{spent:.2f} / ¥{amount:.2f}",
+                            size=12,
+                            color=color if ratio >= 1 else ft.Colors.GREY_600,
+                        ),
+                    ],
+                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                ),
+                ft.ProgressBar(
+                    value=min(ratio, 1.0),
+                    color=color,
+                    bgcolor=ft.Colors.GREY_200,
+                    bar_height=8,
+                    border_radius=4,
+                ),
+                (
+                    ft.Text(
+                        f"已超出预算 ¥{spent - amount:.2f}",
+                        size=11,
+                        color=ft.Colors.RED_500,
+                    )
+                    if ratio > 1
+                    else ft.Container()
+                ),
+            ],
+            spacing=6,
+        ),
+        padding=ft.padding.symmetric(vertical=6),
+    )
+
+
+def create_budget_list(statuses, state):
+    """创建预算进度列表"""
+    if not statuses:
+        return ft.Container(
+            content=ft.Text(
+                "暂未设置预算，可在设置页面添加",
+                size=14,
+                color=ft.Colors.GREY_600,
+                text_align=ft.TextAlign.CENTER,
+            ),
+            alignment=ft.alignment.center,
+            height=60,
+        )
+
+    items = []
+    for status in statuses:
+        if status.budget.is_overall:
+            title = "月度总预算"
+        else:
+            category = state.get_category_by_id(status.budget.category_id)
+            title = category.name if category else "未知分类"
+        items.append(create_budget_progress(title, status.spent, status.budget.amount))
+
+    return ft.Column(items, spacing=4)
+
+
 def create_page_header(title, subtitle=""):
     """创建页面标题"""
     return ft.Container(
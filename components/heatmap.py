@@ -0,0 +1,139 @@
+"""
+Calendar heatmap component for the application
+"""
+
+from datetime import date, timedelta
+
+import flet as ft
+
+# 颜色等级：无数据 + 4 个强度等级
+HEATMAP_COLORS = [
+    ft.Colors.GREY_100,
+    ft.Colors.RED_100,
+    ft.Colors.RED_200,
+    ft.Colors.RED_400,
+    ft.Colors.RED_700,
+]
+
+CELL_SIZE = 11
+CELL_SPACING = 2
+
+
+def get_heatmap_level(value, max_value) -> int:
+    """根据金额占最大值的比例计算颜色等级"""
+    if value <= 0 or max_value <= 0:
+        return 0
+    ratio = value / max_value
+    if ratio <= 0.25:
+        return 1
+    if ratio <= 0.5:
+        return 2
+    if ratio <= 0.75:
+        return 3
+    return 4
+
+
+def create_calendar_heatmap(year, daily_values, on_prev_year=None, on_next_year=None):
+    """创建年度日历热力图
+
+    Args:
+        year: 显示的年份
+        daily_values: 按当年天序排列的每日金额数组
+        on_prev_year: 切换到上一年的回调
+        on_next_year: 切换到下一年的回调
+    """
+    first_day = date(year, 1, 1)
+    max_value = max(daily_values) if daily_values else 0
+    total = sum(daily_values) if daily_values else 0
+
+    # 第一列从包含1月1日的那一周的周一开始
+    start = first_day - timedelta(days=first_day.weekday())
+    week_columns = []
+    month_labels = []
+    current = start
+
+    while current.year <= year:
+        cells = []
+        label = ""
+        for _ in range(7):
+            if current.year == year:
+                index = (current - first_day).days
+                value = daily_values[index] if index < len(daily_values) else 0
+                if current.day == 1:
+                    label = f"{current.month}月"
+                cells.append(
+                    ft.Container(
+                        width=CELL_SIZE,
+                        height=CELL_SIZE,
+                        bgcolor=HEATMAP_COLORS[get_heatmap_level(value, max_value)],
+                        border_radius=2,
+                        tooltip=f"{current.strftime('%Y-%m-%d')}  ¥{value:.2f}",
+                    )
+                )
+            else:
+                cells.append(ft.Container(width=CELL_SIZE, height=CELL_SIZE))
+            current += timedelta(days=1)
+
+        week_columns.append(ft.Column(cells, spacing=CELL_SPACING))
+        month_labels.append(
+            ft.Container(
+                content=ft.Text(label, size=9, color=ft.Colors.GREY_600, no_wrap=True),
+                width=CELL_SIZE,
+            )
+        )
+
+    legend = ft.Row(
+        [ft.Text("少", size=10, color=ft.Colors.GREY_600)]
+        + [
+            ft.Container(
+                width=CELL_SIZE, height=CELL_SIZE, bgcolor=color, border_radius=2
+            )
+            for color in HEATMAP_COLORS
+        ]
+        + [ft.Text("多", size=10, color=ft.Colors.GREY_600)],
+        spacing=4,
+    )
+
+    return ft.Column(
+        [
+            ft.Row(
+                [
+                    ft.Row(
+                        [
+                            ft.IconButton(
+                                icon=ft.Icons.CHEVRON_LEFT,
+                                tooltip="上一年",
+                                on_click=on_prev_year,
+                            ),
+                            ft.Text(f"{year}年", size=14, weight=ft.FontWeight.W_600),
+                            ft.IconButton(
+                                icon=ft.Icons.CHEVRON_RIGHT,
+                                tooltip="下一年",
+                                on_click=on_next_year,
+                                disabled=year >= date.today().year,
+                            ),
+                        ],
+                        spacing=0,
+                    ),
+                    ft.Text(
+                        f"全年支出 ¥{total:.2f}", size=12, color=ft.Colors.GREY_600
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            ft.Row(
+                [
+                    ft.Column(
+                        [
+                            ft.Row(month_labels, spacing=CELL_SPACING),
+                            ft.Row(week_columns, spacing=CELL_SPACING),
+                        ],
+                        spacing=4,
+                    )
+                ],
+                scroll=ft.ScrollMode.AUTO,
+            ),
+            legend,
+        ],
+        spacing=8,
+    )
@@ -0,0 +1,206 @@
+"""
+Anomaly detection for expenses based on per-category running statistics
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from models.record import Record
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 至少积累这么多笔支出后才开始判断异常
+MIN_SAMPLES = 5
+# 超过均值这么多个标准差视为异常
+Z_THRESHOLD = 3.0
+
+
+@dataclass
+class RunningStats:
+    """Welford 在线均值/方差"""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float):
+        """加入一个样本"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float):
+        """移除一个样本（记录被删除或修改时）"""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def std(self) -> float:
+        """样本标准差"""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    def zscore(self, value: float) -> Optional[float]:
+        """计算样本的 z 分数，样本不足时返回None"""
+        if self.count < MIN_SAMPLES:
+            return None
+        std = self.std
+        if std == 0:
+            return 0.0 if value == self.mean else math.inf
+        return (value - self.mean) / std
+
+
+@dataclass
+class AnomalyResult:
+    category_id: int
+    amount: float
+    mean: float
+    zscore: float
+
+
+class AnomalyDetector:
+    """
+    支出异常检测器
+
+    为每个支出分类维护持久化的运行均值和方差，新增记录时以 O(1) 判断是否异常。
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.user_id: Optional[int] = None
+        self.stats: Dict[int, RunningStats] = {}
+
+    def load(self, user_id: int):
+        """加载用户的分类统计，首次使用时由数据库聚合一次初始化"""
+        self.user_id = user_id
+        rows = self.db.get_category_stats(user_id)
+        if not rows:
+            rows = self.db.seed_category_stats(user_id)
+        self.stats = {
+            category_id: RunningStats(row["count"], row["mean"], row["m2"])
+            for category_id, row in rows.items()
+        }
+
+    def reset(self):
+        """清空统计"""
+        self.user_id = None
+        self.stats = {}
+
+    def check(self, record: Record) -> Optional[AnomalyResult]:
+        """判断一笔支出相对于该分类的历史是否异常"""
+        if record.record_type != "expense":
+            return None
+        stats = self.stats.get(record.category_id)
+        if stats is None:
+            return None
+        zscore = stats.zscore(record.amount)
+        if zscore is None or zscore < Z_THRESHOLD:
+            return None
+        return AnomalyResult(
+            category_id=record.category_id,
+            amount=record.amount,
+            mean=stats.mean,
+            zscore=zscore,
+        )
+
+    def observe(self, record: Optional[Record], sign: int = 1):
+        """
+        将记录计入（或移出）统计并持久化
+
+        Args:
+            record (Record): 记录对象
+            sign (int): 1 表示新增，-1 表示移除
+        """
+        if record is None or record.record_type != "expense" or self.user_id is None:
+            return
+
+        stats = self.stats.setdefault(record.category_id, RunningStats())
+        if sign > 0:
+            stats.add(record.amount)
+        else:
+            stats.remove(record.amount)
+        self.db.save_category_stats(
+            self.user_id, record.category_id, stats.count, stats.mean, stats.m2
+        )
+
+    def observe_many(self, records: List[Record], sign: int = 1):
+        """批量计入（或移出）统计，每个受影响的分类只持久化一次"""
+        if self.user_id is None:
+            return
+        touched = set()
+        for record in records:
+            if record is None or record.record_type != "expense":
+                continue
+            stats = self.stats.setdefault(record.category_id, RunningStats())
+            if sign > 0:
+                stats.add(record.amount)
+            else:
+                stats.remove(record.amount)
+            touched.add(record.category_id)
+
+        for category_id in touched:
+            stats = self.stats[category_id]
+            self.db.save_category_stats(
+                self.user_id, category_id, stats.count, stats.mean, stats.m2
+            )
+
+    def score_batch(self, records: List[Record]) -> List[Optional[float]]:
+        """
+        批量计算一组记录的 z 分数（用于导入文件）
+
+        Returns:
+            List[Optional[float]]: 每条记录的 z 分数；非支出或样本不足时为None
+        """
+        if not records:
+            return []
+        if not NUMPY_AVAILABLE:
+            return [
+                self.stats[r.category_id].zscore(r.amount)
+                if r.record_type == "expense" and r.category_id in self.stats
+                else None
+                for r in records
+            ]
+
+        category_ids = list(self.stats)
+        index = {category_id: i for i, category_id in enumerate(category_ids)}
+        means = np.array([self.stats[c].mean for c in category_ids] + [0.0])
+        stds = np.array([self.stats[c].std for c in category_ids] + [0.0])
+        counts = np.array([self.stats[c].count for c in category_ids] + [0])
+
+        missing = len(category_ids)
+        positions = np.array([index.get(r.category_id, missing) for r in records])
+        amounts = np.array([r.amount for r in records], dtype=float)
+        is_expense = np.array([r.record_type == "expense" for r in records])
+
+        record_means = means[positions]
+        record_stds = stds[positions]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (amounts - record_means) / record_stds
+        scores = np.where(
+            record_stds == 0,
+            np.where(amounts == record_means, 0.0, np.inf),
+            scores,
+        )
+        valid = is_expense & (counts[positions] >= MIN_SAMPLES)
+
+        return [float(s) if ok else None for s, ok in zip(scores, valid, strict=True)]
+
+    def flag_batch(self, records: List[Record]) -> List[bool]:
+        """批量判断一组记录是否异常"""
+        return [
+            score is not None and score >= Z_THRESHOLD
+            for score in self.score_batch(records)
+        ]
@@ -2,15 +2,38 @@
 AppState for global state control
 """
 
-from typing import List, Optional
+import bisect
+import threading
+from array import array
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 import flet as ft
 
+from models.anomaly import AnomalyDetector, AnomalyResult
+from models.budget import Budget, BudgetStatus, BudgetTracker, get_month_key
 from models.category import Category
 from models.database import DatabaseManager
+from models.export_job import ExportJob
+from models.forecast import ForecastService
+from models.lru_cache import LRUCache
 from models.record import Record
+from models.recurring import RecurringRule, RecurringScheduler
 from models.user import User
 
+# 定期交易在后台生成后需要刷新的只读页面（编辑表单不打断）
+REFRESH_ROUTES = ("/dashboard", "/records", "/statistics")
+# 一次变更的记录数超过该值时改为过滤后整体排序，否则逐条二分插入/删除
+BISECT_MAX_CHANGES = 64
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _descending_date_key(record: Record) -> timedelta:
+    """内存记录按日期降序排列，取反后供 bisect 按升序查找"""
+    return _EPOCH - record.date
+
 
 class AppState:
     """全局应用状态管理"""
@@ -22,25 +45,183 @@ class AppState:
         self.records: List[Record] = []
         self.categories: List[Category] = []
         self.filtered_records: List[Record] = []
+        # 按年份缓存的每日收支汇总，供日历热力图使用
+        self.daily_totals_cache: Dict[int, Dict[str, array]] = {}
+        # 预算消耗的增量累计及最近一次写入后超支的预算
+        self.budget_tracker = BudgetTracker()
+        self.budget_alerts: List[BudgetStatus] = []
+        # 数据版本号，每次写入记录后递增，用于缓存失效
+        self.data_version = 0
+        self.forecast_service = ForecastService(db)
+        # 支出异常检测及最近一次新增记录的检测结果
+        self.anomaly_detector = AnomalyDetector(db)
+        self.last_anomaly: Optional[AnomalyResult] = None
+        # 定期交易调度器
+        self.recurring_scheduler = RecurringScheduler(db)
+        # 仪表板最近交易条目控件缓存（条目不绑定视图事件，可跨视图复用）
+        self.transaction_item_cache = LRUCache(64)
+        # 后台导出任务（切换页面后继续运行）
+        self.export_job: Optional[ExportJob] = None
+        # 保护记录、预算累计和分类统计，定时器线程与页面事件线程都会写入
+        self._lock = threading.RLock()
 
     def set_current_user(self, user: User):
         """设置当前用户"""
-        self.current_user = user
-        self.load_user_data()
+        with self._lock:
+            self.current_user = user
+            # 先加载分类统计：首次加载时会从数据库播种，
+            # 若在补生成之后加载，新记录会被播种一次后再次累加
+            self.anomaly_detector.load(user.user_id)
+            # 再补生成到期的定期交易，然后加载数据
+            generated = self.recurring_scheduler.run_due(user.user_id)
+            self.anomaly_detector.observe_many(generated)
+            self.load_user_data()
+            self.load_budgets()
+            self.recurring_scheduler.start(user.user_id, self.on_recurring_generated)
+
+    def on_recurring_generated(self, user_id: int, records: List[Record]):
+        """定时器线程生成定期交易后，交给页面事件线程同步状态并刷新页面"""
+        self.page.run_thread(self._sync_recurring_generated, user_id, records, True)
+
+    def _sync_recurring_generated(
+        self, user_id: int, records: List[Record], refresh: bool = False
+    ):
+        """将生成的定期交易计入状态"""
+        with self._lock:
+            # 生成期间已退出或切换用户时，记录已落库，下次登录时从数据库加载
+            if not records or not self.current_user or self.current_user.user_id != user_id:
+                return
+            self._apply_bulk_change([], records)
+        if refresh and self.page.route in REFRESH_ROUTES:
+            self.page.go(self.page.route)
+
+    def save_recurring_rule(self, rule: RecurringRule) -> bool:
+        """保存定期交易规则，并立即生成已到期的记录"""
+        if not self.current_user:
+            return False
+        rule.user_id = self.current_user.user_id
+        if not self.db.save_recurring_rule(rule):
+            return False
+        user_id = self.current_user.user_id
+        self._sync_recurring_generated(user_id, self.recurring_scheduler.run_due(user_id))
+        return True
+
+    def delete_recurring_rule(self, rule_id: int) -> bool:
+        """删除定期交易规则"""
+        return self.db.delete_recurring_rule(rule_id)
 
     def load_user_data(self):
         """加载用户数据"""
-        if self.current_user:
-            self.load_categories()
-            self.records = self.db.get_records(self.current_user.user_id)
+        with self._lock:
+            if self.current_user:
+                self.load_categories()
+                self.records = self.db.get_records(self.current_user.user_id)
+                self.daily_totals_cache.clear()
+                self.data_version += 1
 
-            # BUG: 存在状态不一致缺陷, 强制重置 filtered_records, 破坏外部视图的筛选状态
-            self.filtered_records = self.records.copy()
+                # BUG: 存在状态不一致缺陷, 强制重置 filtered_records, 破坏外部视图的筛选状态
+                self.filtered_records = self.records.copy()
 
     def load_categories(self):
         """加载分类"""
         self.categories = self.db.get_categories()
 
+    def load_budgets(self):
+        """加载预算并用本月分类支出汇总初始化累计值"""
+        if not self.current_user:
+            return
+        now = datetime.now()
+        budgets = self.db.get_budgets(self.current_user.user_id)
+        spent = self.db.get_monthly_expense_by_category(
+            self.current_user.user_id, now.year, now.month
+        )
+        self.budget_tracker.reset(budgets, spent, get_month_key(now))
+        self.budget_alerts = self.budget_tracker.get_alerts()
+
+    def get_budget_statuses(self) -> List[BudgetStatus]:
+        """获取本月各预算的使用情况"""
+        if self.budget_tracker.month != get_month_key(datetime.now()):
+            # 跨月后重新初始化累计值
+            self.load_budgets()
+        return self.budget_tracker.get_statuses()
+
+    def save_budget(self, budget: Budget) -> bool:
+        """保存预算"""
+        if self.db.save_budget(budget):
+            self.budget_tracker.add_budget(budget)
+            self.budget_alerts = self.budget_tracker.get_alerts()
+            return True
+        return False
+
+    def delete_budget(self, budget_id: int) -> bool:
+        """删除预算"""
+        if self.db.delete_budget(budget_id):
+            self.budget_tracker.remove_budget(budget_id)
+            self.budget_alerts = self.budget_tracker.get_alerts()
+            return True
+        return False
+
+    def _apply_record_change(
+        self, old_record: Optional[Record], new_record: Optional[Record]
+    ):
+        """增量更新预算累计值和分类支出统计"""
+        self.budget_tracker.apply(old_record, -1)
+        self.budget_tracker.apply(new_record, 1)
+        self.budget_alerts = self.budget_tracker.get_alerts()
+        self.anomaly_detector.observe(old_record, -1)
+        self.anomaly_detector.observe(new_record, 1)
+
+    def _apply_bulk_change(self, old_records: List[Record], new_records: List[Record]):
+        """批量操作后增量更新预算累计值、分类支出统计和内存中的记录"""
+        for record in old_records:
+            self.budget_tracker.apply(record, -1)
+        for record in new_records:
+            self.budget_tracker.apply(record, 1)
+        self.budget_alerts = self.budget_tracker.get_alerts()
+        self.anomaly_detector.observe_many(old_records, -1)
+        self.anomaly_detector.observe_many(new_records, 1)
+        self._replace_loaded_records(old_records, new_records)
+
+    def add_imported_records(self, records: List[Record]):
+        """导入写入一批记录后增量更新状态（调用方持有状态锁）"""
+        self._apply_bulk_change([], records)
+
+    def _replace_loaded_records(
+        self, old_records: List[Optional[Record]], new_records: List[Optional[Record]]
+    ):
+        """在内存中替换变更的记录，避免每次写入后重新读取全部历史"""
+        old_records = [record for record in old_records if record is not None]
+        new_records = [record for record in new_records if record is not None]
+        if len(old_records) + len(new_records) > BISECT_MAX_CHANGES:
+            changed_ids = {record.record_id for record in old_records + new_records}
+            self.records = [
+                record for record in self.records if record.record_id not in changed_ids
+            ]
+            self.records.extend(new_records)
+            self.records.sort(key=lambda record: record.date, reverse=True)
+        else:
+            for record in old_records:
+                self._remove_loaded_record(record)
+            for record in new_records:
+                bisect.insort(self.records, record, key=_descending_date_key)
+        self.daily_totals_cache.clear()
+        self.data_version += 1
+
+    def _remove_loaded_record(self, record: Record):
+        """按日期二分定位并移除内存中的一条记录"""
+        key = _descending_date_key(record)
+        index = bisect.bisect_left(self.records, key, key=_descending_date_key)
+        while index < len(self.records) and _descending_date_key(self.records[index]) == key:
+            if self.records[index].record_id == record.record_id:
+                del self.records[index]
+                return
+            index += 1
+        # 内存中的日期与数据库不一致时退回按ID查找
+        for index, loaded in enumerate(self.records):
+            if loaded.record_id == record.record_id:
+                del self.records[index]
+                return
+
     def get_category_by_id(self, category_id: int) -> Optional[Category]:
         """根据ID获取分类"""
         for category in self.categories:
@@ -48,30 +229,99 @@ class AppState:
                 return category
         return self.db.get_category(category_id)
 
+    def get_daily_totals(self, year: int) -> Dict[str, array]:
+        """获取某年的每日收支汇总（按年缓存）"""
+        if not self.current_user:
+            return {}
+        if year not in self.daily_totals_cache:
+            self.daily_totals_cache[year] = self.db.get_daily_totals(
+                self.current_user.user_id, year
+            )
+        return self.daily_totals_cache[year]
+
     def add_record(self, record: Record) -> bool:
         """添加记录"""
-        if self.db.save_record(record):
-            self.load_user_data()
-            return True
-        return False
+        with self._lock:
+            if self.db.save_record(record):
+                # 先用加入前的统计判断是否异常
+                self.last_anomaly = self.anomaly_detector.check(record)
+                self._apply_record_change(None, record)
+                self._replace_loaded_records([], [self.db.get_record(record.record_id)])
+                return True
+            return False
 
     def update_record(self, record: Record) -> bool:
         """更新记录"""
-        if self.db.save_record(record):
-            self.load_user_data()
-            return True
-        return False
+        with self._lock:
+            old_record = self.db.get_record(record.record_id)
+            if self.db.save_record(record):
+                self._apply_record_change(old_record, record)
+                self._replace_loaded_records(
+                    [old_record], [self.db.get_record(record.record_id)]
+                )
+                return True
+            return False
 
     def delete_record(self, record_id: int) -> bool:
         """删除记录"""
-        if self.db.delete_record(record_id):
-            self.load_user_data()
-            return True
-        return False
+        with self._lock:
+            old_record = self.db.get_record(record_id)
+            if self.db.delete_record(record_id):
+                self._apply_record_change(old_record, None)
+                self._replace_loaded_records([old_record], [])
+                return True
+            return False
+
+    def delete_records(self, record_ids: List[int]) -> int:
+        """批量删除记录（一个事务），返回删除的记录数"""
+        with self._lock:
+            old_records = self.db.get_records_by_ids(record_ids)
+            deleted = self.db.delete_records(record_ids)
+            if deleted:
+                self._apply_bulk_change(old_records, [])
+            return deleted
+
+    def update_records(self, record_ids: List[int], **fields) -> int:
+        """批量修改记录的分类、类型等字段（一个事务），返回修改的记录数"""
+        with self._lock:
+            old_records = self.db.get_records_by_ids(record_ids)
+            updated = self.db.update_records(record_ids, **fields)
+            if updated:
+                now = datetime.now()
+                new_records = [
+                    replace(record, updated_at=now, **fields) for record in old_records
+                ]
+                self._apply_bulk_change(old_records, new_records)
+            return updated
+
+    def stop_background_work(self):
+        """
+        退出登录并等待后台写入结束（恢复备份前调用）
+
+        定时器停止后等待进行中的生成完成；导出取消后等待线程退出；
+        导入在下一批写入前发现用户已退出而中止，进行中的一批持有状态锁，
+        退出登录需等它完成。
+        """
+        job = self.export_job
+        self.clear_user_data()
+        self.recurring_scheduler.stop(wait=True)
+        if job:
+            job.wait()
 
     def clear_user_data(self):
         """清除用户数据"""
-        self.current_user = None
-        self.records = []
-        self.categories = []
-        self.filtered_records = []
+        with self._lock:
+            self.recurring_scheduler.stop()
+            if self.export_job and self.export_job.running:
+                self.export_job.cancel()
+            self.export_job = None
+            self.current_user = None
+            self.records = []
+            self.categories = []
+            self.filtered_records = []
+            self.daily_totals_cache.clear()
+            self.budget_tracker = BudgetTracker()
+            self.budget_alerts = []
+            self.anomaly_detector.reset()
+            self.last_anomaly = None
+            self.transaction_item_cache.clear()
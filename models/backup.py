@@ -0,0 +1,318 @@
+"""
+Online database backup and restore with compressed, checksummed archives
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 在线备份每一步复制的页数（默认页大小 4KB 时每步约 4MB），分步以便报告进度和取消
+BACKUP_PAGES_PER_STEP = 1024
+# 压缩和校验时每次读写的字节数
+BACKUP_CHUNK_SIZE = 1 << 20
+# deflate 压缩级别：3 级的压缩率接近 6 级，速度约快一倍
+BACKUP_COMPRESS_LEVEL = 3
+BACKUP_FORMAT = "financebook-backup"
+BACKUP_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DATABASE_NAME = "finance_book.db"
+# 恢复前检查这些表是否存在
+REQUIRED_TABLES = ("users", "categories", "records")
+
+# 进度回调: (阶段, 已完成, 总数)，阶段为 copy / compress / verify / restore
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class BackupCancelled(Exception):
+    """备份被用户取消"""
+
+
+def read_manifest(path) -> Dict:
+    """
+    读取备份文件中的清单
+
+    Raises:
+        ValueError: 不是有效的备份文件
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read(MANIFEST_NAME).decode("utf-8"))
+    except (OSError, KeyError, zipfile.BadZipFile, ValueError) as e:
+        raise ValueError(f"不是有效的备份文件: {e}") from e
+
+    if manifest.get("format") != BACKUP_FORMAT:
+        raise ValueError("不是有效的备份文件: 格式标识不符")
+    if manifest.get("version", 0) > BACKUP_FORMAT_VERSION:
+        raise ValueError("备份文件由更新版本的应用创建")
+    database = manifest.get("database") or {}
+    if not database.get("file") or not database.get("sha256"):
+        raise ValueError("备份清单不完整")
+    return manifest
+
+
+def _database_info(conn: sqlite3.Connection) -> Dict:
+    """读取数据库的页信息和主要表的行数"""
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in REQUIRED_TABLES
+    }
+    return {
+        "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+        "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+        "counts": counts,
+    }
+
+
+class BackupModule:
+    """
+    数据备份与恢复模块
+
+    备份通过 sqlite3 在线备份接口分步复制数据库，复制期间应用可以继续读写；
+    复制出的快照压缩为 zip 文件，附带记录大小和 SHA-256 的清单。
+    恢复时先解压到临时文件并校验，再用同一接口整体写回，
+    写回在一个事务中完成，中途失败时原数据库保持不变。
+    """
+
+    def __init__(self, state):
+        """初始化备份模块
+
+        Args:
+            state: AppState对象,包含数据库管理器
+        """
+        self.state = state
+        self.backup_dir = Path.cwd() / "FinanceBookBackups"
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.cancel_event = threading.Event()
+
+    @property
+    def db_path(self) -> Path:
+        return Path(self.state.db.db_path)
+
+    def cancel(self):
+        """请求取消正在进行的备份"""
+        self.cancel_event.set()
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise BackupCancelled()
+
+    def list_backups(self) -> List[Path]:
+        """备份目录中的备份文件，最新的在前"""
+        return sorted(
+            self.backup_dir.glob("finance_backup_*.zip"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+
+    def create_backup(
+        self,
+        filename: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> tuple[bool, str]:
+        """创建完整备份
+
+        Args:
+            filename: 文件名(可选),默认使用时间戳
+            on_progress: 进度回调
+
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"finance_backup_{timestamp}.zip"
+
+        if not filename.endswith(".zip"):
+            filename += ".zip"
+
+        filepath = self.backup_dir / filename
+        snapshot = filepath.with_name(f".{filepath.stem}.db.part")
+        tmp_path = filepath.with_name(f".{filepath.name}.part")
+        self.cancel_event.clear()
+        try:
+            info = self._copy_database(snapshot, on_progress)
+            self._write_archive(snapshot, tmp_path, info, on_progress)
+            os.replace(tmp_path, filepath)
+            return True, str(filepath)
+
+        except BackupCancelled:
+            return False, "备份已取消"
+        except Exception as e:
+            return False, f"备份失败: {str(e)}"
+        finally:
+            snapshot.unlink(missing_ok=True)
+            tmp_path.unlink(missing_ok=True)
+
+    def _copy_database(
+        self, snapshot: Path, on_progress: Optional[ProgressCallback]
+    ) -> Dict:
+        """
+        分步复制数据库到快照文件，返回快照的页信息和行数
+
+        复制期间在源连接上保持一个读事务：其他连接的写入每次都会让在线备份从第一页重来，
+        持续写入时大库可能永远复制不完。持有共享锁后写入等待复制结束
+        （连接默认的忙等待超时内），快照即为开始复制时的一致状态。
+        """
+
+        def progress(status, remaining, total):
+            self._check_cancelled()
+            if on_progress:
+                on_progress("copy", total - remaining, total)
+
+        source = sqlite3.connect(self.db_path, isolation_level=None)
+        target = sqlite3.connect(snapshot)
+        try:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+            source.execute("COMMIT")
+            return _database_info(target)
+        finally:
+            target.close()
+            source.close()
+
+    def _write_archive(
+        self,
+        snapshot: Path,
+        archive_path: Path,
+        info: Dict,
+        on_progress: Optional[ProgressCallback],
+    ):
+        """将快照压缩写入备份文件，边写边计算校验和，最后写入清单"""
+        size = snapshot.stat().st_size
+        digest = hashlib.sha256()
+        written = 0
+        with zipfile.ZipFile(
+            archive_path,
+            "w",
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=BACKUP_COMPRESS_LEVEL,
+        ) as archive:
+            with open(snapshot, "rb") as src, archive.open(
+                DATABASE_NAME, "w", force_zip64=True
+            ) as dst:
+                while chunk := src.read(BACKUP_CHUNK_SIZE):
+                    self._check_cancelled()
+                    digest.update(chunk)
+                    dst.write(chunk)
+                    written += len(chunk)
+                    if on_progress:
+                        on_progress("compress", written, size)
+
+            manifest = {
+                "format": BACKUP_FORMAT,
+                "version": BACKUP_FORMAT_VERSION,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "sqlite_version": sqlite3.sqlite_version,
+                "database": {
+                    "file": DATABASE_NAME,
+                    "size": size,
+                    "sha256": digest.hexdigest(),
+                    "page_size": info["page_size"],
+                    "page_count": info["page_count"],
+                },
+                "counts": info["counts"],
+            }
+            archive.writestr(
+                MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2)
+            )
+
+    def restore_backup(
+        self, path, on_progress: Optional[ProgressCallback] = None
+    ) -> tuple[bool, str]:
+        """从备份文件恢复数据库
+
+        依次校验清单、解压数据的大小和 SHA-256、SQLite 完整性及必需的表，
+        全部通过后才写回当前数据库。恢复后应重新登录。
+
+        Args:
+            path: 备份文件路径
+            on_progress: 进度回调
+
+        Returns:
+            (成功标志, 提示信息)
+        """
+        restored = self.db_path.with_name(f".{self.db_path.name}.restore")
+        try:
+            manifest = read_manifest(path)
+            self._extract_database(path, manifest, restored, on_progress)
+            self._validate_database(restored)
+            self._swap_in(restored, on_progress)
+            # 旧版本的备份在恢复后补齐新增的表、列和索引
+            self.state.db.init_database()
+            records = manifest.get("counts", {}).get("records", 0)
+            return True, f"已恢复 {records} 条记录（备份于 {manifest['created_at']}）"
+
+        except Exception as e:
+            return False, f"恢复失败: {str(e)}"
+        finally:
+            restored.unlink(missing_ok=True)
+
+    @staticmethod
+    def _extract_database(
+        path,
+        manifest: Dict,
+        restored: Path,
+        on_progress: Optional[ProgressCallback],
+    ):
+        """解压数据库文件并核对大小和 SHA-256"""
+        database = manifest["database"]
+        size = database.get("size", 0)
+        digest = hashlib.sha256()
+        written = 0
+        with zipfile.ZipFile(path) as archive, archive.open(
+            database["file"]
+        ) as src, open(restored, "wb") as dst:
+            while chunk := src.read(BACKUP_CHUNK_SIZE):
+                digest.update(chunk)
+                dst.write(chunk)
+                written += len(chunk)
+                if on_progress:
+                    on_progress("verify", written, size)
+
+        if written != size or digest.hexdigest() != database["sha256"]:
+            raise ValueError("备份数据校验和不符，文件可能已损坏")
+
+    @staticmethod
+    def _validate_database(restored: Path):
+        """检查解压出的数据库完整且包含必需的表"""
+        conn = sqlite3.connect(restored)
+        try:
+            result = conn.execute("PRAGMA quick_check").fetchone()[0]
+            if result != "ok":
+                raise ValueError(f"备份数据库损坏: {result}")
+            tables = {
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            missing = [table for table in REQUIRED_TABLES if table not in tables]
+            if missing:
+                raise ValueError(f"备份数据库缺少表: {', '.join(missing)}")
+        finally:
+            conn.close()
+
+    def _swap_in(self, restored: Path, on_progress: Optional[ProgressCallback]):
+        """
+        将校验过的数据库整体写回当前数据库
+
+        在线备份接口在目标库上持有写锁直到复制完成，并通过回滚日志保证原子性：
+        中途出错或进程退出时，当前数据库保持恢复前的内容。
+        """
+
+        def progress(status, remaining, total):
+            if on_progress:
+                on_progress("restore", total - remaining, total)
+
+        source = sqlite3.connect(restored)
+        target = sqlite3.connect(self.db_path)
+        try:
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,141 @@
+"""
+Budget class in FinanceBook
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.record import Record
+
+
+@dataclass
+class Budget:
+    budget_id: Optional[int] = None
+    user_id: int = 0
+    category_id: Optional[int] = None  # None 表示月度总预算
+    amount: float = 0.0
+    is_active: bool = True
+
+    @property
+    def is_overall(self) -> bool:
+        """是否为总预算"""
+        return self.category_id is None
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "budget_id": self.budget_id,
+            "user_id": self.user_id,
+            "category_id": self.category_id,
+            "amount": self.amount,
+            "is_active": self.is_active,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Budget":
+        """从字典创建预算对象"""
+        return cls(
+            budget_id=data.get("budget_id"),
+            user_id=data.get("user_id", 0),
+            category_id=data.get("category_id"),
+            amount=float(data.get("amount") or 0.0),
+            is_active=bool(data.get("is_active", True)),
+        )
+
+
+@dataclass
+class BudgetStatus:
+    budget: Budget
+    spent: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """已使用比例"""
+        if self.budget.amount <= 0:
+            return 0.0
+        return self.spent / self.budget.amount
+
+    @property
+    def remaining(self) -> float:
+        """剩余额度"""
+        return self.budget.amount - self.spent
+
+    @property
+    def is_over(self) -> bool:
+        """是否超出预算"""
+        return self.spent > self.budget.amount
+
+
+def get_month_key(value) -> str:
+    """获取月份标识 (YYYY-MM)，兼容 datetime 和日期字符串"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m")
+    return str(value)[:7]
+
+
+class BudgetTracker:
+    """
+    预算消耗跟踪器
+
+    按月维护每个分类的支出累计值，记录增删改时增量更新，
+    检查全部预算只需遍历预算列表本身。
+    """
+
+    def __init__(self):
+        self.month: Optional[str] = None
+        self.budgets: List[Budget] = []
+        self.category_spent: Dict[int, float] = defaultdict(float)
+        self.total_spent = 0.0
+
+    def reset(self, budgets: List[Budget], category_spent: Dict[int, float], month: str):
+        """用数据库中的月度汇总重置累计值"""
+        self.month = month
+        self.budgets = list(budgets)
+        self.category_spent = defaultdict(float, category_spent)
+        self.total_spent = sum(category_spent.values())
+
+    def apply(self, record: Optional[Record], sign: int = 1):
+        """
+        增量应用一条记录
+
+        Args:
+            record (Record): 记录对象
+            sign (int): 1 表示新增，-1 表示移除
+        """
+        if record is None or record.record_type != "expense":
+            return
+        if self.month is None or get_month_key(record.date) != self.month:
+            return
+
+        delta = sign * record.amount
+        self.category_spent[record.category_id] += delta
+        self.total_spent += delta
+
+    def add_budget(self, budget: Budget):
+        """添加或替换预算"""
+        self.remove_budget(budget.budget_id)
+        self.budgets.append(budget)
+
+    def remove_budget(self, budget_id: Optional[int]):
+        """移除预算"""
+        self.budgets = [b for b in self.budgets if b.budget_id != budget_id]
+
+    def get_statuses(self) -> List[BudgetStatus]:
+        """获取所有预算的使用情况"""
+        statuses = []
+        for budget in self.budgets:
+            if not budget.is_active:
+                continue
+            spent = (
+                self.total_spent
+                if budget.is_overall
+                else self.category_spent.get(budget.category_id, 0.0)
+            )
+            statuses.append(BudgetStatus(budget=budget, spent=max(spent, 0.0)))
+        return statuses
+
+    def get_alerts(self) -> List[BudgetStatus]:
+        """获取已超支的预算"""
+        return [status for status in self.get_statuses() if status.is_over]
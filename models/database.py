@@ -5,12 +5,17 @@ This module provides the DatabaseManager class for handling all database operati
 including table creation, record management, and data querying for the Finance Book application.
 """
 
+import json
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from models.budget import Budget
 from models.category import Category
-from models.record import Record
+from models.record import Record, content_fingerprint
+from models.record_filter import FilterCriteria
+from models.recurring import RecurringRule
 from models.user import User
 
 def adapt_datetime(dt):
@@ -22,6 +27,36 @@ def convert_datetime(s):
 sqlite3.register_adapter(datetime, adapt_datetime)
 sqlite3.register_converter("timestamp", convert_datetime)
 
+# trigram 分词器要求查询至少 3 个字符，更短的查询改用 LIKE
+FTS_MIN_TERM_LENGTH = 3
+
+# 记录查询允许的排序方式，值中均带 record_id 以保证分页稳定
+RECORD_ORDERINGS = {
+    "date DESC": "date DESC, record_id DESC",
+    "date ASC": "date ASC, record_id ASC",
+    "amount DESC": "amount DESC, record_id DESC",
+    "amount ASC": "amount ASC, record_id ASC",
+}
+
+# 批量操作允许修改的记录字段
+BULK_UPDATE_FIELDS = ("amount", "date", "record_type", "note", "category_id")
+# 单条 SQL 中 IN (...) 参数的数量上限，避免超过 SQLite 的变量个数限制
+ID_CHUNK_SIZE = 500
+
+
+def next_month_key(month: str) -> str:
+    """下一个月份标识 (YYYY-MM)"""
+    year, month_number = int(month[:4]), int(month[5:7])
+    if month_number == 12:
+        return f"{year + 1}-01"
+    return f"{year}-{month_number + 1:02d}"
+
+
+def register_fingerprint_function(conn: sqlite3.Connection):
+    """在连接上注册 content_fingerprint(date, amount, record_type, note) SQL函数"""
+    conn.create_function("content_fingerprint", 4, content_fingerprint, deterministic=True)
+
+
 class DatabaseManager:
     """
     Database Manager Class
@@ -30,15 +65,19 @@ class DatabaseManager:
     and data retrieval for users, categories, and financial records.
     """
 
-    def __init__(self, db_path: str = "finance_book.db"):
+    def __init__(self, db_path: str = "finance_book.db", initialize: bool = True):
         """
         初始化数据库管理器
 
         Args:
             db_path (str): 数据库文件路径
+            initialize (bool): 是否建表及迁移；只读取已初始化数据库的工作进程传False，
+                不执行任何写入（搜索使用 LIKE）
         """
         self.db_path = db_path
-        self.init_database()
+        self.fts_available = False
+        if initialize:
+            self.init_database()
 
     def init_database(self):
         """初始化数据库表"""
@@ -85,17 +124,292 @@ class DatabaseManager:
                     user_id INTEGER NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    fingerprint TEXT,
+                    FOREIGN KEY (category_id) REFERENCES categories (category_id),
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            """
+            )
+            self._migrate_record_fingerprints(conn)
+
+            # 预算表 - category_id 为空表示月度总预算
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS budgets (
+                    budget_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    category_id INTEGER,
+                    amount REAL NOT NULL CHECK (amount > 0),
+                    is_active BOOLEAN DEFAULT 1,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (category_id) REFERENCES categories (category_id),
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            """
+            )
+
+            # 分类支出运行统计表 - 用于支出异常检测（Welford 均值/方差）
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS category_stats (
+                    user_id INTEGER NOT NULL,
+                    category_id INTEGER NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    mean REAL NOT NULL DEFAULT 0,
+                    m2 REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, category_id),
+                    FOREIGN KEY (category_id) REFERENCES categories (category_id),
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            """
+            )
+
+            # 定期交易规则表
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS recurring_rules (
+                    rule_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    category_id INTEGER NOT NULL,
+                    record_type TEXT NOT NULL CHECK (record_type IN ('income', 'expense')),
+                    amount REAL NOT NULL,
+                    note TEXT,
+                    frequency TEXT NOT NULL CHECK (frequency IN ('weekly', 'monthly', 'yearly')),
+                    anchor_day INTEGER,
+                    next_date DATE NOT NULL,
+                    is_active BOOLEAN DEFAULT 1,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (category_id) REFERENCES categories (category_id),
                     FOREIGN KEY (user_id) REFERENCES users (user_id)
                 )
             """
             )
 
+            # 按用户和日期的索引，支撑记录列表的筛选、排序和分页
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_records_user_date ON records (user_id, date)"
+            )
+            # 按内容指纹的索引，支撑导入时批量查重
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_records_user_fingerprint "
+                "ON records (user_id, fingerprint)"
+            )
+
+            # 余额检查点表 - 每月月初之前的累计收支，用于按日期查询余额
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS balance_checkpoints (
+                    user_id INTEGER NOT NULL,
+                    month TEXT NOT NULL,
+                    income REAL NOT NULL DEFAULT 0,
+                    expense REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, month),
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            """
+            )
+            self._init_checkpoint_triggers(conn)
+            self._migrate_balance_checkpoints(conn)
+
+            # 增量导出水位 - 每个用户、每个导出目标已导出到的变更序号
+            # last_seq 为 NULL 表示首次完整导出尚未完成
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS export_watermarks (
+                    user_id INTEGER NOT NULL,
+                    destination TEXT NOT NULL,
+                    last_seq INTEGER,
+                    exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, destination),
+                    FOREIGN KEY (user_id) REFERENCES users (user_id)
+                )
+            """
+            )
+
+            # 记录变更日志 - 由触发器写入，只记录设置了导出水位的用户
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS record_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    operation TEXT NOT NULL CHECK (operation IN ('upsert', 'delete'))
+                )
+            """
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_record_changes_user_seq "
+                "ON record_changes(user_id, seq)"
+            )
+            self._init_change_log_triggers(conn)
+
             conn.commit()
+            self.fts_available = self._init_search_index(conn)
 
         # 使用Category类的静态方法初始化默认分类
         self._init_default_categories()
 
+    def _migrate_record_fingerprints(self, conn: sqlite3.Connection):
+        """旧数据库的记录表没有 fingerprint 列时添加该列并回填"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+        if "fingerprint" in columns:
+            return
+        conn.execute("ALTER TABLE records ADD COLUMN fingerprint TEXT")
+        # 回填不改变记录内容，先删除更新触发器（随后的初始化会重新创建），
+        # 避免重建搜索索引、修正检查点和写入变更日志
+        for name in ("records_fts_update", "checkpoints_update", "changes_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        register_fingerprint_function(conn)
+        conn.execute(
+            "UPDATE records SET fingerprint = content_fingerprint(date, amount, record_type, note)"
+        )
+
+    def _init_checkpoint_triggers(self, conn: sqlite3.Connection):
+        """
+        记录增删改时只修正该记录所在月份之后的检查点；
+        某月写入第一条记录时，由之前最近的检查点加上其后的记录创建该月的检查点
+        """
+        delta = """
+            income = income + {sign} CASE WHEN {row}.record_type = 'income' THEN {row}.amount ELSE 0 END,
+            expense = expense + {sign} CASE WHEN {row}.record_type = 'expense' THEN {row}.amount ELSE 0 END
+        """
+        fix_new = (
+            f"UPDATE balance_checkpoints SET {delta.format(sign='', row='new')} "
+            "WHERE user_id = new.user_id AND month > strftime('%Y-%m', new.date);"
+        )
+        fix_old = (
+            f"UPDATE balance_checkpoints SET {delta.format(sign='-', row='old')} "
+            "WHERE user_id = old.user_id AND month > strftime('%Y-%m', old.date);"
+        )
+        for name, event, body in [
+            ("checkpoints_insert", "INSERT", fix_new),
+            ("checkpoints_delete", "DELETE", fix_old),
+            ("checkpoints_update", "UPDATE", fix_old + fix_new),
+        ]:
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON records BEGIN {body} END"
+            )
+
+        month = "strftime('%Y-%m', new.date)"
+        previous = (
+            "FROM balance_checkpoints WHERE user_id = new.user_id "
+            f"AND month < {month} ORDER BY month DESC LIMIT 1"
+        )
+        since_previous = (
+            "FROM records WHERE user_id = new.user_id "
+            f"AND date >= COALESCE((SELECT month {previous}) || '-01', '') "
+            f"AND date < {month} || '-01'"
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS checkpoints_create AFTER INSERT ON records
+            WHEN NOT EXISTS (
+                SELECT 1 FROM balance_checkpoints
+                WHERE user_id = new.user_id AND month = {month}
+            )
+            BEGIN
+                INSERT INTO balance_checkpoints (user_id, month, income, expense)
+                SELECT new.user_id, {month},
+                    COALESCE((SELECT income {previous}), 0) + COALESCE(
+                        SUM(CASE WHEN record_type = 'income' THEN amount END), 0),
+                    COALESCE((SELECT expense {previous}), 0) + COALESCE(
+                        SUM(CASE WHEN record_type = 'expense' THEN amount END), 0)
+                {since_previous};
+            END
+            """
+        )
+
+    def _migrate_balance_checkpoints(self, conn: sqlite3.Connection):
+        """为创建检查点触发器之前已有记录、但还没有检查点的用户一次性建立检查点"""
+        user_ids = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT user_id FROM records
+                WHERE user_id NOT IN (SELECT user_id FROM balance_checkpoints)
+                """
+            )
+        ]
+        for user_id in user_ids:
+            self._rebuild_checkpoints(conn, user_id)
+
+    def _init_change_log_triggers(self, conn: sqlite3.Connection):
+        """记录增删改时写入变更日志（删除写入墓碑）"""
+        for name, event, row, operation in [
+            ("changes_insert", "INSERT", "new", "upsert"),
+            ("changes_update", "UPDATE", "new", "upsert"),
+            ("changes_delete", "DELETE", "old", "delete"),
+        ]:
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON records
+                WHEN EXISTS (SELECT 1 FROM export_watermarks WHERE user_id = {row}.user_id)
+                BEGIN
+                    INSERT INTO record_changes (user_id, record_id, operation)
+                    VALUES ({row}.user_id, {row}.record_id, '{operation}');
+                END
+                """
+            )
+
+    def _init_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        创建记录全文索引（FTS5 trigram 分词，适合中文备注）及同步触发器
+
+        Returns:
+            bool: 当前 SQLite 支持 FTS5 时返回True
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'records_fts'"
+        ).fetchone()
+        try:
+            conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+                    note, category_name, amount_text, tokenize = 'trigram'
+                )
+            """
+            )
+        except sqlite3.OperationalError as e:
+            print(f"全文索引不可用，搜索将使用 LIKE: {e}")
+            return False
+
+        fts_row = """
+            (SELECT name FROM categories WHERE category_id = new.category_id),
+            CAST(new.amount AS TEXT)
+        """
+        conn.executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+                INSERT INTO records_fts (rowid, note, category_name, amount_text)
+                VALUES (new.record_id, new.note, {fts_row});
+            END;
+            CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+                DELETE FROM records_fts WHERE rowid = old.record_id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE ON records BEGIN
+                DELETE FROM records_fts WHERE rowid = old.record_id;
+                INSERT INTO records_fts (rowid, note, category_name, amount_text)
+                VALUES (new.record_id, new.note, {fts_row});
+            END;
+            CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN
+                UPDATE records_fts SET category_name = new.name
+                WHERE rowid IN (SELECT record_id FROM records WHERE category_id = new.category_id);
+            END;
+            """
+        )
+
+        # 首次创建时为已有记录建立索引
+        if not exists:
+            conn.execute(
+                """
+                INSERT INTO records_fts (rowid, note, category_name, amount_text)
+                SELECT r.record_id, r.note, c.name, CAST(r.amount AS TEXT)
+                FROM records r LEFT JOIN categories c ON r.category_id = c.category_id
+            """
+            )
+        conn.commit()
+        return True
+
     def _init_default_categories(self):
         """使用Category类的静态方法初始化默认分类"""
         try:
@@ -296,6 +610,166 @@ class DatabaseManager:
         )
         return Category.from_dict(result[0]) if result else None
 
+    # ==================== 预算相关方法 ====================
+
+    def save_budget(self, budget: Budget) -> bool:
+        """
+        保存预算（同一用户同一分类只保留一条预算）
+
+        Args:
+            budget (Budget): 预算对象
+
+        Returns:
+            bool: 保存成功返回True，失败返回False
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                if budget.budget_id is None or budget.budget_id == 0:
+                    cursor.execute(
+                        "SELECT budget_id FROM budgets WHERE user_id = ? AND category_id IS ?",
+                        (budget.user_id, budget.category_id),
+                    )
+                    existing = cursor.fetchone()
+                    if existing:
+                        budget.budget_id = existing[0]
+
+                if budget.budget_id is None or budget.budget_id == 0:
+                    cursor.execute(
+                        "INSERT INTO budgets (user_id, category_id, amount, is_active) VALUES (?, ?, ?, ?)",
+                        (budget.user_id, budget.category_id, budget.amount, budget.is_active),
+                    )
+                    budget.budget_id = cursor.lastrowid
+                else:
+                    cursor.execute(
+                        "UPDATE budgets SET category_id = ?, amount = ?, is_active = ? WHERE budget_id = ?",
+                        (budget.category_id, budget.amount, budget.is_active, budget.budget_id),
+                    )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error saving budget: {e}")
+            return False
+
+    def get_budgets(self, user_id: int, active_only: bool = True) -> List[Budget]:
+        """
+        获取用户的预算列表
+
+        Args:
+            user_id (int): 用户ID
+            active_only (bool): 是否只获取启用的预算
+
+        Returns:
+            List[Budget]: 预算对象列表
+        """
+        sql = "SELECT * FROM budgets WHERE user_id = ?"
+        if active_only:
+            sql += " AND is_active = 1"
+        sql += " ORDER BY category_id IS NOT NULL, category_id"
+
+        results = self.query(sql, (user_id,))
+        return [Budget.from_dict(row) for row in results]
+
+    def delete_budget(self, budget_id: int) -> bool:
+        """
+        删除预算
+
+        Args:
+            budget_id (int): 预算ID
+
+        Returns:
+            bool: 删除成功返回True，失败返回False
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM budgets WHERE budget_id = ?", (budget_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Database error deleting budget: {e}")
+            return False
+
+    # ==================== 异常检测统计方法 ====================
+
+    def get_category_stats(self, user_id: int) -> Dict[int, Dict]:
+        """
+        获取用户各分类的支出运行统计
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Dict[int, Dict]: 分类ID到 {count, mean, m2} 的映射
+        """
+        rows = self.query(
+            "SELECT category_id, count, mean, m2 FROM category_stats WHERE user_id = ?",
+            (user_id,),
+        )
+        return {row["category_id"]: row for row in rows}
+
+    def save_category_stats(
+        self, user_id: int, category_id: int, count: int, mean: float, m2: float
+    ) -> bool:
+        """
+        保存单个分类的运行统计
+
+        Args:
+            user_id (int): 用户ID
+            category_id (int): 分类ID
+            count (int): 样本数
+            mean (float): 均值
+            m2 (float): 离差平方和
+
+        Returns:
+            bool: 保存成功返回True，失败返回False
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    """
+                    INSERT INTO category_stats (user_id, category_id, count, mean, m2)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, category_id)
+                    DO UPDATE SET count = excluded.count, mean = excluded.mean, m2 = excluded.m2
+                    """,
+                    (user_id, category_id, count, mean, m2),
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error saving category stats: {e}")
+            return False
+
+    def seed_category_stats(self, user_id: int) -> Dict[int, Dict]:
+        """
+        由已有支出记录一次性聚合出各分类的运行统计并保存
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Dict[int, Dict]: 分类ID到 {count, mean, m2} 的映射
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO category_stats (user_id, category_id, count, mean, m2)
+                    SELECT user_id, category_id, COUNT(*), AVG(amount),
+                           MAX(SUM(amount * amount) - COUNT(*) * AVG(amount) * AVG(amount), 0)
+                    FROM records
+                    WHERE user_id = ? AND record_type = 'expense'
+                    GROUP BY category_id
+                    """,
+                    (user_id,),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error seeding category stats: {e}")
+            return {}
+        return self.get_category_stats(user_id)
+
     # ==================== 记录相关方法 ====================
 
     def save_record(self, record: Record) -> bool:
@@ -315,8 +789,8 @@ class DatabaseManager:
                     # 插入新记录
                     cursor.execute(
                         """
-                        INSERT INTO records (amount, date, record_type, note, category_id, user_id)
-                        VALUES (?, ?, ?, ?, ?, ?)
+                        INSERT INTO records (amount, date, record_type, note, category_id, user_id, fingerprint)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
                     """,
                         (
                             record.amount,
@@ -325,6 +799,7 @@ class DatabaseManager:
                             record.note,
                             record.category_id,
                             record.user_id,
+                            record.fingerprint,
                         ),
                     )
                     record.record_id = cursor.lastrowid
@@ -333,7 +808,8 @@ class DatabaseManager:
                     cursor.execute(
                         """
                         UPDATE records 
-                        SET amount=?, date=?, record_type=?, note=?, category_id=?, updated_at=?
+                        SET amount=?, date=?, record_type=?, note=?, category_id=?, updated_at=?,
+                            fingerprint=?
                         WHERE record_id=?
                     """,
                         (
@@ -343,6 +819,7 @@ class DatabaseManager:
                             record.note,
                             record.category_id,
                             datetime.now(),
+                            record.fingerprint,
                             record.record_id,
                         ),
                     )
@@ -456,65 +933,939 @@ class DatabaseManager:
         result = self.query("SELECT * FROM records WHERE record_id = ?", (record_id,))
         return Record.from_dict(result[0]) if result else None
 
-    def get_all_records(self, user_id: int, limit: int = 10000) -> List[Record]:
+    def get_records_by_ids(self, record_ids: List[int]) -> List[Record]:
         """
-        加载所有记录
-        
+        按ID批量获取记录
+
         Args:
-            user_id (int): 用户ID
-            limit (int): 最大返回数量,默认10000条(防止内存溢出)
-        
+            record_ids (List[int]): 记录ID列表
+
         Returns:
-            List[Record]: 记录列表
+            List[Record]: 记录对象列表（不保证顺序）
         """
-        sql = "SELECT * FROM records WHERE user_id = ? ORDER BY date DESC LIMIT ?"
-        
-        results = self.query(sql, (user_id, limit))
-        
-        return [Record.from_dict(row) for row in results]
-
-    # ==================== 统计方法 ====================
+        records = []
+        for start in range(0, len(record_ids), ID_CHUNK_SIZE):
+            chunk = list(record_ids[start : start + ID_CHUNK_SIZE])
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.query(
+                f"SELECT * FROM records WHERE record_id IN ({placeholders})", tuple(chunk)
+            )
+            records.extend(Record.from_dict(row) for row in rows)
+        return records
 
-    def get_user_balance(self, user_id: int) -> Dict[str, float]:
+    def delete_records(self, record_ids: List[int]) -> int:
         """
-        获取用户余额统计
+        在一个事务中批量删除记录
 
         Args:
-            user_id (int): 用户ID
+            record_ids (List[int]): 记录ID列表
 
         Returns:
-            Dict[str, float]: 包含总收入、总支出和余额的字典
+            int: 删除的记录数，失败返回0
         """
-        income_result = self.query(
-            "SELECT COALESCE(SUM(amount), 0) as total FROM records WHERE user_id = ? AND record_type = 'income'",
-            (user_id,),
-        )
-        expense_result = self.query(
-            "SELECT COALESCE(SUM(amount), 0) as total FROM records WHERE user_id = ? AND record_type = 'expense'",
-            (user_id,),
-        )
-
-        total_income = float(income_result[0]["total"]) if income_result else 0.0
-        total_expense = float(expense_result[0]["total"]) if expense_result else 0.0
-
-        return {
-            "income": total_income,
-            "expense": total_expense,
-            "balance": total_income - total_expense,
-        }
+        if not record_ids:
+            return 0
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                deleted = 0
+                for start in range(0, len(record_ids), ID_CHUNK_SIZE):
+                    chunk = list(record_ids[start : start + ID_CHUNK_SIZE])
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor = conn.execute(
+                        f"DELETE FROM records WHERE record_id IN ({placeholders})", chunk
+                    )
+                    deleted += cursor.rowcount
+                conn.commit()
+                return deleted
+        except sqlite3.Error as e:
+            print(f"Database error deleting records: {e}")
+            return 0
 
-    def get_records_by_period(
-        self, user_id: int, period: str = "month"
-    ) -> List[Record]:
+    def update_records(self, record_ids: List[int], **fields) -> int:
         """
-        根据时间段获取记录
+        在一个事务中批量修改记录的字段
 
         Args:
-            user_id (int): 用户ID
-            period (str): 时间段 ('today', 'week', 'month', 'year')
+            record_ids (List[int]): 记录ID列表
+            **fields: 要修改的字段，只允许 BULK_UPDATE_FIELDS 中的字段
 
         Returns:
-            List[Record]: 记录列表
+            int: 修改的记录数，失败或包含不允许修改的字段时返回0
+        """
+        invalid = set(fields) - set(BULK_UPDATE_FIELDS)
+        if invalid:
+            print(f"不允许批量修改的字段: {', '.join(sorted(invalid))}")
+            return 0
+        if not record_ids or not fields:
+            return 0
+
+        columns = [name for name in BULK_UPDATE_FIELDS if name in fields]
+        assignments = ", ".join(f"{name} = ?" for name in columns) + ", updated_at = ?"
+        values = [fields[name] for name in columns] + [datetime.now()]
+        if set(columns) != {"category_id"}:
+            # 在同一条 UPDATE 中重新计算指纹，参数取新值，未修改的字段取原值
+            fingerprint_args = ["date", "amount", "record_type", "note"]
+            assignments += ", fingerprint = content_fingerprint({})".format(
+                ", ".join("?" if name in fields else name for name in fingerprint_args)
+            )
+            values += [fields[name] for name in fingerprint_args if name in fields]
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                register_fingerprint_function(conn)
+                updated = 0
+                for start in range(0, len(record_ids), ID_CHUNK_SIZE):
+                    chunk = list(record_ids[start : start + ID_CHUNK_SIZE])
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor = conn.execute(
+                        f"UPDATE records SET {assignments} WHERE record_id IN ({placeholders})",
+                        values + chunk,
+                    )
+                    updated += cursor.rowcount
+                conn.commit()
+                return updated
+        except sqlite3.Error as e:
+            print(f"Database error updating records: {e}")
+            return 0
+
+    def count_fingerprints(self, user_id: int, fingerprints: List[str]) -> Dict[str, int]:
+        """
+        一次查询统计一批内容指纹在用户记录中出现的次数
+
+        Returns:
+            Dict[str, int]: 指纹 -> 次数（未出现的指纹不在结果中）
+        """
+        if not fingerprints:
+            return {}
+        result = self.query(
+            """
+            SELECT fingerprint, COUNT(*) AS count FROM records
+            WHERE user_id = ? AND fingerprint IN (SELECT value FROM json_each(?))
+            GROUP BY fingerprint
+            """,
+            (user_id, json.dumps(list(fingerprints))),
+        )
+        return {row["fingerprint"]: row["count"] for row in result}
+
+    def get_record_keys(self, user_id: int, start_day: str, end_day: str) -> List[Dict]:
+        """
+        读取日期区间内（含两端）记录的日期、金额、类型和指纹，用于识别疑似重复
+
+        Args:
+            user_id (int): 用户ID
+            start_day (str): 开始日期 YYYY-MM-DD
+            end_day (str): 结束日期 YYYY-MM-DD
+        """
+        end = (date.fromisoformat(end_day) + timedelta(days=1)).isoformat()
+        return self.query(
+            """
+            SELECT substr(date, 1, 10) AS day, amount, record_type, fingerprint
+            FROM records
+            WHERE user_id = ? AND date >= ? AND date < ?
+            """,
+            (user_id, start_day, end),
+        )
+
+    def get_all_records(self, user_id: int, limit: int = 10000) -> List[Record]:
+        """
+        加载所有记录
+        
+        Args:
+            user_id (int): 用户ID
+            limit (int): 最大返回数量,默认10000条(防止内存溢出)
+        
+        Returns:
+            List[Record]: 记录列表
+        """
+        sql = "SELECT * FROM records WHERE user_id = ? ORDER BY date DESC LIMIT ?"
+        
+        results = self.query(sql, (user_id, limit))
+        
+        return [Record.from_dict(row) for row in results]
+
+    def _build_record_filter(self, user_id: int, criteria: FilterCriteria):
+        """
+        将筛选条件转换为 WHERE 子句和参数
+
+        日期以字符串区间比较（不包裹函数），以便使用 (user_id, date) 索引。
+        """
+        conditions = ["user_id = ?"]
+        params: List = [user_id]
+
+        if criteria.record_type != "all":
+            conditions.append("record_type = ?")
+            params.append(criteria.record_type)
+        if criteria.start_date is not None:
+            conditions.append("date >= ?")
+            params.append(criteria.start_date.isoformat())
+        if criteria.end_date is not None:
+            conditions.append("date < ?")
+            params.append((criteria.end_date + timedelta(days=1)).isoformat())
+        if criteria.category_ids is not None:
+            category_ids = sorted(criteria.category_ids)
+            if not category_ids:
+                conditions.append("0")
+            else:
+                placeholders = ", ".join("?" * len(category_ids))
+                conditions.append(f"category_id IN ({placeholders})")
+                params.extend(category_ids)
+        if criteria.min_amount is not None:
+            conditions.append("amount >= ?")
+            params.append(criteria.min_amount)
+        if criteria.max_amount is not None:
+            conditions.append("amount <= ?")
+            params.append(criteria.max_amount)
+
+        text = criteria.search_text.strip()
+        if text:
+            text_sql, text_params = self._build_text_condition(text)
+            conditions.append(text_sql)
+            params.extend(text_params)
+
+        return " AND ".join(conditions), tuple(params)
+
+    def _build_text_condition(self, text: str):
+        """按备注、分类名称和金额做子串匹配的条件，优先使用全文索引"""
+        if self.fts_available and len(text) >= FTS_MIN_TERM_LENGTH:
+            return (
+                "record_id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)",
+                ('"' + text.replace('"', '""') + '"',),
+            )
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        return (
+            "(note LIKE ? ESCAPE '\\' OR CAST(amount AS TEXT) LIKE ? ESCAPE '\\'"
+            " OR category_id IN (SELECT category_id FROM categories WHERE name LIKE ? ESCAPE '\\'))",
+            (pattern, pattern, pattern),
+        )
+
+    def query_records(
+        self,
+        user_id: int,
+        criteria: FilterCriteria,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        order_by: str = "date DESC",
+    ) -> List[Record]:
+        """
+        按筛选条件分页查询记录
+
+        Args:
+            user_id (int): 用户ID
+            criteria (FilterCriteria): 筛选条件
+            limit (Optional[int]): 每页条数，None 表示不限
+            offset (int): 偏移量
+            order_by (str): 排序方式，必须是 RECORD_ORDERINGS 中的一项
+
+        Returns:
+            List[Record]: 记录对象列表
+        """
+        where, params = self._build_record_filter(user_id, criteria)
+        ordering = RECORD_ORDERINGS.get(order_by, RECORD_ORDERINGS["date DESC"])
+        sql = f"SELECT * FROM records WHERE {where} ORDER BY {ordering}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+        return [Record.from_dict(row) for row in self.query(sql, params)]
+
+    def count_records(self, user_id: int, criteria: FilterCriteria) -> int:
+        """
+        统计符合筛选条件的记录数
+
+        Args:
+            user_id (int): 用户ID
+            criteria (FilterCriteria): 筛选条件
+
+        Returns:
+            int: 记录数
+        """
+        where, params = self._build_record_filter(user_id, criteria)
+        result = self.query(f"SELECT COUNT(*) AS count FROM records WHERE {where}", params)
+        return result[0]["count"] if result else 0
+
+    def query_record_ids(self, user_id: int, criteria: FilterCriteria) -> List[int]:
+        """
+        只查询符合筛选条件的记录ID，不构建记录对象
+
+        Args:
+            user_id (int): 用户ID
+            criteria (FilterCriteria): 筛选条件
+
+        Returns:
+            List[int]: 记录ID列表
+        """
+        where, params = self._build_record_filter(user_id, criteria)
+        rows = self.query(f"SELECT record_id FROM records WHERE {where}", params)
+        return [row["record_id"] for row in rows]
+
+    def iter_records(
+        self,
+        user_id: int,
+        batch_size: int = 1000,
+        order_by: str = "date DESC",
+    ) -> Iterator[Record]:
+        """
+        流式遍历用户的全部记录，每次只从游标读取一批
+
+        Args:
+            user_id (int): 用户ID
+            batch_size (int): 每批读取的行数
+            order_by (str): 排序方式，"date ASC" 或 "date DESC"
+
+        Yields:
+            Record: 记录对象
+        """
+        direction = "ASC" if order_by.strip().upper() == "DATE ASC" else "DESC"
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                f"SELECT * FROM records WHERE user_id = ? ORDER BY date {direction}, record_id {direction}",
+                (user_id,),
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Record.from_dict(dict(row))
+        finally:
+            conn.close()
+
+    def insert_records(self, records: List[Record]) -> int:
+        """
+        在一个事务中批量插入记录
+
+        Args:
+            records (List[Record]): 记录列表
+
+        Returns:
+            int: 插入的记录数，失败返回0
+        """
+        if not records:
+            return 0
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._insert_records(conn, records)
+                conn.commit()
+                return len(records)
+        except sqlite3.Error as e:
+            print(f"Database error inserting records: {e}")
+            return 0
+
+    def _insert_records(self, conn: sqlite3.Connection, records: List[Record]):
+        """
+        在给定连接上批量插入记录（不提交），并回填记录ID
+
+        同一事务内没有其他写入者，自增ID连续分配，
+        最后一条的ID减去条数即得第一条的ID
+        """
+        conn.executemany(
+            """
+            INSERT INTO records (amount, date, record_type, note, category_id, user_id, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    record.amount,
+                    record.date,
+                    record.record_type,
+                    record.note,
+                    record.category_id,
+                    record.user_id,
+                    record.fingerprint,
+                )
+                for record in records
+            ],
+        )
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        for record_id, record in enumerate(records, start=last_id - len(records) + 1):
+            record.record_id = record_id
+
+    # ==================== 定期交易方法 ====================
+
+    def save_recurring_rule(self, rule: RecurringRule) -> bool:
+        """
+        保存定期交易规则
+
+        Args:
+            rule (RecurringRule): 规则对象
+
+        Returns:
+            bool: 保存成功返回True，失败返回False
+        """
+        values = (
+            rule.category_id,
+            rule.record_type,
+            rule.amount,
+            rule.note,
+            rule.frequency,
+            rule.anchor_day,
+            rule.next_date.isoformat() if rule.next_date else None,
+            rule.is_active,
+        )
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                if rule.rule_id is None or rule.rule_id == 0:
+                    cursor.execute(
+                        """
+                        INSERT INTO recurring_rules
+                            (category_id, record_type, amount, note, frequency,
+                             anchor_day, next_date, is_active, user_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        values + (rule.user_id,),
+                    )
+                    rule.rule_id = cursor.lastrowid
+                else:
+                    cursor.execute(
+                        """
+                        UPDATE recurring_rules
+                        SET category_id=?, record_type=?, amount=?, note=?, frequency=?,
+                            anchor_day=?, next_date=?, is_active=?
+                        WHERE rule_id=?
+                        """,
+                        values + (rule.rule_id,),
+                    )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error saving recurring rule: {e}")
+            return False
+
+    def get_recurring_rules(
+        self, user_id: int, active_only: bool = True
+    ) -> List[RecurringRule]:
+        """
+        获取用户的定期交易规则
+
+        Args:
+            user_id (int): 用户ID
+            active_only (bool): 是否只获取启用的规则
+
+        Returns:
+            List[RecurringRule]: 规则列表
+        """
+        sql = "SELECT * FROM recurring_rules WHERE user_id = ?"
+        if active_only:
+            sql += " AND is_active = 1"
+        sql += " ORDER BY next_date"
+        return [RecurringRule.from_dict(row) for row in self.query(sql, (user_id,))]
+
+    def delete_recurring_rule(self, rule_id: int) -> bool:
+        """
+        删除定期交易规则
+
+        Args:
+            rule_id (int): 规则ID
+
+        Returns:
+            bool: 删除成功返回True，失败返回False
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM recurring_rules WHERE rule_id = ?", (rule_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Database error deleting recurring rule: {e}")
+            return False
+
+    def apply_recurring_schedule(
+        self, records: List[Record], next_dates: Dict[int, date]
+    ) -> bool:
+        """
+        在一个事务中插入到期记录并推进规则的下次日期
+
+        Args:
+            records (List[Record]): 生成的记录
+            next_dates (Dict[int, date]): 规则ID到新的下次日期的映射
+
+        Returns:
+            bool: 成功返回True，失败返回False
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._insert_records(conn, records)
+                conn.executemany(
+                    "UPDATE recurring_rules SET next_date = ? WHERE rule_id = ?",
+                    [(d.isoformat(), rule_id) for rule_id, d in next_dates.items()],
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error applying recurring schedule: {e}")
+            return False
+
+    # ==================== 搜索方法 ====================
+
+    def search_record_ids(
+        self, user_id: int, text: str, limit: int = 50, offset: int = 0
+    ) -> List[int]:
+        """
+        按备注、分类名称和金额搜索记录（子串匹配），分页返回记录ID
+
+        全文索引可用且查询不少于 3 个字符时按相关度排序，
+        否则退化为 LIKE 匹配并按日期降序排序。
+
+        Args:
+            user_id (int): 用户ID
+            text (str): 搜索文本
+            limit (int): 每页条数
+            offset (int): 偏移量
+
+        Returns:
+            List[int]: 记录ID列表
+        """
+        text = text.strip()
+        if not text:
+            return []
+
+        if self.fts_available and len(text) >= FTS_MIN_TERM_LENGTH:
+            # 整个查询作为一个短语，trigram 分词下即为子串（含前缀）匹配
+            rows = self.query(
+                """
+                SELECT r.record_id
+                FROM records_fts
+                JOIN records r ON r.record_id = records_fts.rowid
+                WHERE records_fts MATCH ? AND r.user_id = ?
+                ORDER BY records_fts.rank, r.date DESC, r.record_id DESC
+                LIMIT ? OFFSET ?
+                """,
+                ('"' + text.replace('"', '""') + '"', user_id, limit, offset),
+            )
+        else:
+            text_sql, text_params = self._build_text_condition(text)
+            rows = self.query(
+                f"""
+                SELECT record_id FROM records
+                WHERE user_id = ? AND {text_sql}
+                ORDER BY date DESC, record_id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (user_id,) + text_params + (limit, offset),
+            )
+        return [row["record_id"] for row in rows]
+
+    # ==================== 统计方法 ====================
+
+    def get_user_balance(self, user_id: int) -> Dict[str, float]:
+        """
+        获取用户余额统计
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            Dict[str, float]: 包含总收入、总支出和余额的字典
+        """
+        income_result = self.query(
+            "SELECT COALESCE(SUM(amount), 0) as total FROM records WHERE user_id = ? AND record_type = 'income'",
+            (user_id,),
+        )
+        expense_result = self.query(
+            "SELECT COALESCE(SUM(amount), 0) as total FROM records WHERE user_id = ? AND record_type = 'expense'",
+            (user_id,),
+        )
+
+        total_income = float(income_result[0]["total"]) if income_result else 0.0
+        total_expense = float(expense_result[0]["total"]) if expense_result else 0.0
+
+        return {
+            "income": total_income,
+            "expense": total_expense,
+            "balance": total_income - total_expense,
+        }
+
+    def get_running_balances(self, user_id: int, record_ids: List[int]) -> Dict[int, float]:
+        """
+        计算一页记录中每条记录之后的账户余额
+
+        余额按 (date, record_id) 顺序累计全部收支：起始余额取自该页最早一条所在月份的
+        检查点加上当月在它之前的记录，再用窗口函数只在该页的日期范围内累加。
+
+        Args:
+            user_id (int): 用户ID
+            record_ids (List[int]): 本页的记录ID
+
+        Returns:
+            Dict[int, float]: 记录ID到该笔交易后余额的映射
+        """
+        balances = {}
+        for start in range(0, len(record_ids), ID_CHUNK_SIZE):
+            chunk = list(record_ids[start : start + ID_CHUNK_SIZE])
+            balances.update(self._get_running_balances(user_id, chunk))
+        return balances
+
+    def _get_running_balances(self, user_id: int, record_ids: List[int]) -> Dict[int, float]:
+        """计算一批记录之后的余额（ID数量不超过 ID_CHUNK_SIZE）"""
+        placeholders = ", ".join("?" * len(record_ids))
+        page_sql = (
+            f"SELECT date, record_id FROM records "
+            f"WHERE user_id = ? AND record_id IN ({placeholders}) "
+        )
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                lo = conn.execute(
+                    page_sql + "ORDER BY date, record_id LIMIT 1", (user_id, *record_ids)
+                ).fetchone()
+                if lo is None:
+                    return {}
+                hi = conn.execute(
+                    page_sql + "ORDER BY date DESC, record_id DESC LIMIT 1",
+                    (user_id, *record_ids),
+                ).fetchone()
+                base = self._get_balance_before(conn, user_id, lo[0], lo[1])
+                rows = conn.execute(
+                    f"""
+                    WITH running AS (
+                        SELECT record_id,
+                               ? + SUM(CASE WHEN record_type = 'income'
+                                            THEN amount ELSE -amount END)
+                                   OVER (ORDER BY date, record_id) AS balance
+                        FROM records
+                        WHERE user_id = ?
+                          AND (date, record_id) >= (?, ?)
+                          AND (date, record_id) <= (?, ?)
+                    )
+                    SELECT record_id, balance FROM running
+                    WHERE record_id IN ({placeholders})
+                    """,
+                    (base, user_id, lo[0], lo[1], hi[0], hi[1], *record_ids),
+                ).fetchall()
+                return {record_id: balance for record_id, balance in rows}
+        except sqlite3.Error as e:
+            print(f"Database error computing running balances: {e}")
+            return {}
+
+    # ==================== 增量导出方法 ====================
+
+    def get_export_watermark(self, user_id: int, destination: str) -> Optional[int]:
+        """
+        获取导出目标的水位
+
+        Returns:
+            Optional[int]: 已导出到的变更序号；尚未完成过完整导出时返回None
+        """
+        result = self.query(
+            "SELECT last_seq FROM export_watermarks WHERE user_id = ? AND destination = ?",
+            (user_id, destination),
+        )
+        return result[0]["last_seq"] if result else None
+
+    def start_change_log(self, user_id: int, destination: str) -> int:
+        """
+        开始为导出目标记录变更，返回当前的变更序号
+
+        首次调用时登记一个未完成的水位，之后对该用户记录的增删改都会写入变更日志。
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO export_watermarks (user_id, destination, last_seq) "
+                    "VALUES (?, ?, NULL)",
+                    (user_id, destination),
+                )
+                return conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM record_changes"
+                ).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Database error starting change log: {e}")
+            return 0
+
+    def save_export_watermark(self, user_id: int, destination: str, seq: int) -> bool:
+        """保存导出水位，并清理所有导出目标都已导出的变更日志"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    """
+                    UPDATE export_watermarks
+                    SET last_seq = ?, exported_at = CURRENT_TIMESTAMP
+                    WHERE user_id = ? AND destination = ?
+                    """,
+                    (seq, user_id, destination),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM record_changes
+                    WHERE user_id = ? AND seq <= (
+                        SELECT MIN(COALESCE(last_seq, 0)) FROM export_watermarks
+                        WHERE user_id = ?
+                    )
+                    """,
+                    (user_id, user_id),
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error as e:
+            print(f"Database error saving export watermark: {e}")
+            return False
+
+    def iter_record_changes(
+        self, user_id: int, since_seq: int, until_seq: int, batch_size: int = 1000
+    ) -> Iterator[Tuple[int, Optional[Record]]]:
+        """
+        流式遍历 (since_seq, until_seq] 之间变更过的记录，每条记录只出现一次
+
+        Yields:
+            (记录ID, 记录对象)：记录已被删除时记录对象为None（墓碑）
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(
+                """
+                SELECT c.record_id AS changed_id, r.*
+                FROM (
+                    SELECT record_id, MAX(seq) AS seq FROM record_changes
+                    WHERE user_id = ? AND seq > ? AND seq <= ?
+                    GROUP BY record_id
+                ) AS latest
+                JOIN record_changes c ON c.seq = latest.seq
+                LEFT JOIN records r
+                    ON r.record_id = c.record_id AND c.operation = 'upsert'
+                ORDER BY latest.seq
+                """,
+                (user_id, since_seq, until_seq),
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    data = dict(row)
+                    changed_id = data.pop("changed_id")
+                    if data["record_id"] is None:
+                        yield changed_id, None
+                    else:
+                        yield changed_id, Record.from_dict(data)
+        finally:
+            conn.close()
+
+    # ==================== 余额检查点方法 ====================
+
+    def get_balance_as_of(self, user_id: int, as_of: date) -> Dict[str, float]:
+        """
+        查询某一天结束时的累计收支和余额
+
+        读取该月的检查点，再加上当月截至该日的记录，不需要汇总全部历史。
+
+        Args:
+            user_id (int): 用户ID
+            as_of (date): 日期（含当天）
+
+        Returns:
+            Dict[str, float]: 包含 income、expense 和 balance 的字典
+        """
+        month = as_of.strftime("%Y-%m")
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                income, expense = self._get_checkpoint(conn, user_id, month)
+                month_income, month_expense = conn.execute(
+                    """
+                    SELECT
+                        COALESCE(SUM(CASE WHEN record_type = 'income' THEN amount END), 0),
+                        COALESCE(SUM(CASE WHEN record_type = 'expense' THEN amount END), 0)
+                    FROM records
+                    WHERE user_id = ? AND date >= ? AND date < ?
+                    """,
+                    (
+                        user_id,
+                        f"{month}-01",
+                        (as_of + timedelta(days=1)).isoformat(),
+                    ),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Database error querying balance: {e}")
+            return {"income": 0.0, "expense": 0.0, "balance": 0.0}
+
+        income += month_income
+        expense += month_expense
+        return {"income": income, "expense": expense, "balance": income - expense}
+
+    def _get_balance_before(
+        self, conn: sqlite3.Connection, user_id: int, date_value: str, record_id: int
+    ) -> float:
+        """按 (date, record_id) 顺序，某条记录之前的余额"""
+        month = str(date_value)[:7]
+        income, expense = self._get_checkpoint(conn, user_id, month)
+        partial = conn.execute(
+            """
+            SELECT COALESCE(SUM(CASE WHEN record_type = 'income'
+                                     THEN amount ELSE -amount END), 0)
+            FROM records
+            WHERE user_id = ? AND date >= ? AND (date, record_id) < (?, ?)
+            """,
+            (user_id, f"{month}-01", date_value, record_id),
+        ).fetchone()[0]
+        return income - expense + partial
+
+    def _get_checkpoint(self, conn: sqlite3.Connection, user_id: int, month: str):
+        """
+        读取某月月初之前的累计 (收入, 支出)
+
+        取该月或之前最近的检查点，再加上检查点所在月份到该月之间的记录。
+        只读取不写入：检查点由写入记录时的触发器创建和修正。
+        """
+        row = conn.execute(
+            """
+            SELECT month, income, expense FROM balance_checkpoints
+            WHERE user_id = ? AND month <= ?
+            ORDER BY month DESC LIMIT 1
+            """,
+            (user_id, month),
+        ).fetchone()
+        checkpoint_month, income, expense = row if row else (None, 0.0, 0.0)
+        if checkpoint_month == month:
+            return income, expense
+
+        gap_income, gap_expense = conn.execute(
+            """
+            SELECT
+                COALESCE(SUM(CASE WHEN record_type = 'income' THEN amount END), 0),
+                COALESCE(SUM(CASE WHEN record_type = 'expense' THEN amount END), 0)
+            FROM records
+            WHERE user_id = ? AND date >= ? AND date < ?
+            """,
+            (
+                user_id,
+                f"{checkpoint_month}-01" if checkpoint_month else "",
+                f"{month}-01",
+            ),
+        ).fetchone()
+        return income + gap_income, expense + gap_expense
+
+    def _rebuild_checkpoints(self, conn: sqlite3.Connection, user_id: int):
+        """用一次按月汇总重建用户从首笔记录到本月的检查点（仅供迁移使用）"""
+        monthly = {
+            month: (income, expense)
+            for month, income, expense in conn.execute(
+                """
+                SELECT strftime('%Y-%m', date) AS month,
+                       COALESCE(SUM(CASE WHEN record_type = 'income' THEN amount END), 0),
+                       COALESCE(SUM(CASE WHEN record_type = 'expense' THEN amount END), 0)
+                FROM records
+                WHERE user_id = ?
+                GROUP BY month
+                """,
+                (user_id,),
+            )
+        }
+        if not monthly:
+            return
+
+        last_month = max(datetime.now().strftime("%Y-%m"), *monthly)
+        month = min(monthly)
+        income = expense = 0.0
+        checkpoints = []
+        while month < last_month:
+            month_income, month_expense = monthly.get(month, (0.0, 0.0))
+            income += month_income
+            expense += month_expense
+            month = next_month_key(month)
+            checkpoints.append((user_id, month, income, expense))
+
+        conn.execute("DELETE FROM balance_checkpoints WHERE user_id = ?", (user_id,))
+        conn.executemany(
+            "INSERT INTO balance_checkpoints (user_id, month, income, expense) VALUES (?, ?, ?, ?)",
+            checkpoints,
+        )
+
+    def get_dashboard_snapshot(
+        self, user_id: int, recent_limit: int = 5, today: Optional[date] = None
+    ) -> Dict:
+        """
+        在一个读事务中获取仪表板所需的全部数据
+
+        Args:
+            user_id (int): 用户ID
+            recent_limit (int): 最近交易条数
+            today (Optional[date]): 基准日期，默认今天
+
+        Returns:
+            Dict: 包含以下键的字典
+                income / expense / balance: 累计收入、支出和余额
+                current_month / last_month: 本月和上月的 {"income", "expense"} 合计
+                recent: 最近交易列表，每项为 {"record": Record, "category_name": str}
+        """
+        today = today or datetime.now().date()
+        current_start = today.replace(day=1)
+        last_start = (current_start - timedelta(days=1)).replace(day=1)
+
+        snapshot = {
+            "income": 0.0,
+            "expense": 0.0,
+            "balance": 0.0,
+            "current_month": {"income": 0.0, "expense": 0.0},
+            "last_month": {"income": 0.0, "expense": 0.0},
+            "recent": [],
+        }
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                # 显式开启事务，保证多条查询读到同一时刻的数据
+                conn.execute("BEGIN")
+                totals = conn.execute(
+                    """
+                    SELECT record_type,
+                           COALESCE(SUM(amount), 0) AS total,
+                           COALESCE(SUM(CASE WHEN date >= ? THEN amount END), 0) AS current_month,
+                           COALESCE(SUM(CASE WHEN date >= ? AND date < ? THEN amount END), 0)
+                               AS last_month
+                    FROM records
+                    WHERE user_id = ?
+                    GROUP BY record_type
+                    """,
+                    (
+                        current_start.isoformat(),
+                        last_start.isoformat(),
+                        current_start.isoformat(),
+                        user_id,
+                    ),
+                ).fetchall()
+                recent = conn.execute(
+                    """
+                    SELECT r.*, COALESCE(c.name, '未知分类') AS category_name
+                    FROM records r
+                    LEFT JOIN categories c ON r.category_id = c.category_id
+                    WHERE r.user_id = ?
+                    ORDER BY r.date DESC, r.record_id DESC
+                    LIMIT ?
+                    """,
+                    (user_id, recent_limit),
+                ).fetchall()
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error loading dashboard snapshot: {e}")
+            return snapshot
+
+        for row in totals:
+            record_type = row["record_type"]
+            if record_type not in ("income", "expense"):
+                continue
+            snapshot[record_type] = row["total"]
+            snapshot["current_month"][record_type] = row["current_month"]
+            snapshot["last_month"][record_type] = row["last_month"]
+        snapshot["balance"] = snapshot["income"] - snapshot["expense"]
+        snapshot["recent"] = [
+            {"record": Record.from_dict(dict(row)), "category_name": row["category_name"]}
+            for row in recent
+        ]
+        return snapshot
+
+    def get_records_by_period(
+        self, user_id: int, period: str = "month"
+    ) -> List[Record]:
+        """
+        根据时间段获取记录
+
+        Args:
+            user_id (int): 用户ID
+            period (str): 时间段 ('today', 'week', 'month', 'year')
+
+        Returns:
+            List[Record]: 记录列表
         """
         now = datetime.now()
 
@@ -534,3 +1885,98 @@ class DatabaseManager:
             return self.get_records(user_id)
 
         return self.get_records(user_id, start_date, end_date)
+
+    def get_daily_totals(self, user_id: int, year: int) -> Dict[str, array]:
+        """
+        获取某一年按天汇总的收支金额
+
+        通过一次 GROUP BY 查询得到每天的收入和支出合计，
+        结果为按年内天序排列的紧凑 float 数组（平年365项，闰年366项）。
+
+        Args:
+            user_id (int): 用户ID
+            year (int): 年份
+
+        Returns:
+            Dict[str, array]: {"income": array, "expense": array}，下标为当年第几天（从0开始）
+        """
+        days_in_year = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+        totals = {
+            "income": array("d", [0.0]) * days_in_year,
+            "expense": array("d", [0.0]) * days_in_year,
+        }
+
+        rows = self.query(
+            """
+            SELECT CAST(strftime('%j', date) AS INTEGER) AS day_of_year,
+                   record_type,
+                   SUM(amount) AS total
+            FROM records
+            WHERE user_id = ? AND date >= ? AND date < ?
+            GROUP BY day_of_year, record_type
+            """,
+            (user_id, f"{year:04d}-01-01", f"{year + 1:04d}-01-01"),
+        )
+
+        for row in rows:
+            day_of_year = row["day_of_year"]
+            if row["record_type"] in totals and day_of_year and 1 <= day_of_year <= days_in_year:
+                totals[row["record_type"]][day_of_year - 1] = float(row["total"] or 0)
+
+        return totals
+
+    def get_monthly_expense_by_category(
+        self, user_id: int, year: int, month: int
+    ) -> Dict[int, float]:
+        """
+        获取某月各分类的支出合计
+
+        Args:
+            user_id (int): 用户ID
+            year (int): 年份
+            month (int): 月份
+
+        Returns:
+            Dict[int, float]: 分类ID到支出合计的映射
+        """
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        rows = self.query(
+            """
+            SELECT category_id, SUM(amount) AS total
+            FROM records
+            WHERE user_id = ? AND record_type = 'expense' AND date >= ? AND date < ?
+            GROUP BY category_id
+            """,
+            (
+                user_id,
+                f"{year:04d}-{month:02d}-01",
+                f"{next_year:04d}-{next_month:02d}-01",
+            ),
+        )
+        return {row["category_id"]: float(row["total"] or 0) for row in rows}
+
+    def get_daily_category_totals(
+        self, user_id: int, start_date: str, end_date: str
+    ) -> List[Dict]:
+        """
+        获取日期范围内按天、类型和分类汇总的金额
+
+        Args:
+            user_id (int): 用户ID
+            start_date (str): 开始日期（YYYY-MM-DD格式，包含）
+            end_date (str): 结束日期（YYYY-MM-DD格式，包含）
+
+        Returns:
+            List[Dict]: 含 day、record_type、category_id、total 的汇总行
+        """
+        end_exclusive = (date.fromisoformat(end_date) + timedelta(days=1)).isoformat()
+        return self.query(
+            """
+            SELECT date(date) AS day, record_type, category_id, SUM(amount) AS total
+            FROM records
+            WHERE user_id = ? AND date >= ? AND date < ?
+            GROUP BY day, record_type, category_id
+            ORDER BY day
+            """,
+            (user_id, start_date, end_exclusive),
+        )
@@ -1,20 +1,319 @@
 """
-ExportModule for exporting data to JSON/Excel formats
+ExportModule for exporting data to JSON/Excel/CSV/Parquet/PDF formats
 """
 
+import bz2
+import csv
+import gzip
+import heapq
 import json
+import lzma
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from models.record import Record
+from models.report import (
+    MATPLOTLIB_AVAILABLE,
+    REPORTLAB_AVAILABLE,
+    ChartCache,
+    build_report_file,
+    generate_pdf_report,
+    parse_period,
+    periods_of_year,
+)
 
 try:
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Alignment, Font, PatternFill
 
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# 导出时每次从数据库游标读取的记录数
+EXPORT_BATCH_SIZE = 1000
+# Excel 单个工作表的最大行数（含表头）
+MAX_SHEET_ROWS = 1048576
+
+# CSV 列顺序固定，便于跨机器比对
+CSV_COLUMNS = [
+    "record_id",
+    "date",
+    "record_type",
+    "category_id",
+    "category_name",
+    "amount",
+    "note",
+    "created_at",
+    "updated_at",
+]
+# 可选的压缩格式：名称 -> (打开函数, 文件后缀)
+CSV_COMPRESSIONS = {
+    "gzip": (gzip.open, ".gz"),
+    "bz2": (bz2.open, ".bz2"),
+    "xz": (lzma.open, ".xz"),
+}
+# Parquet 每个行组的记录数
+PARQUET_ROW_GROUP_SIZE = 50000
+# 增量解析JSON时每次读取的字符数
+JSON_CHUNK_SIZE = 1 << 16
+
+
+def parquet_schema():
+    """Parquet 列类型：金额以分为单位的 int64，分类和类型字典编码"""
+    return pa.schema(
+        [
+            ("record_id", pa.int64()),
+            ("date", pa.timestamp("us")),
+            ("record_type", pa.dictionary(pa.int8(), pa.string())),
+            ("category_id", pa.int64()),
+            ("category_name", pa.dictionary(pa.int32(), pa.string())),
+            ("amount_cents", pa.int64()),
+            ("note", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ]
+    )
+
+
+def open_csv(path, mode: str, compression: Optional[str] = None):
+    """按压缩格式以文本模式打开CSV文件"""
+    if compression is None:
+        return open(path, mode, encoding="utf-8", newline="")
+    opener, _ = CSV_COMPRESSIONS[compression]
+    return opener(path, mode + "t", encoding="utf-8", newline="")
+
+
+def detect_compression(path) -> Optional[str]:
+    """根据文件后缀判断压缩格式"""
+    name = str(path).lower()
+    for compression, (_, suffix) in CSV_COMPRESSIONS.items():
+        if name.endswith(suffix):
+            return compression
+    return None
+
+
+def iter_json_array(
+    f: TextIO, key: str, chunk_size: int = JSON_CHUNK_SIZE
+) -> Iterator:
+    """
+    增量解析JSON文件中某个键对应的数组，逐个生成元素
+
+    文件按块读取，用 JSONDecoder.raw_decode 解析一个元素后丢弃已解析的内容，
+    内存占用与数组长度无关。
+    """
+    decoder = json.JSONDecoder()
+    marker = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    buffer = ""
+    eof = False
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = f.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+    # 定位数组开头，保留末尾一段避免标记被块边界切断
+    while True:
+        match = marker.search(buffer)
+        if match:
+            buffer = buffer[match.end() :]
+            break
+        if eof:
+            raise ValueError(f"文件中没有 {key} 数组")
+        buffer = buffer[-(len(key) + 64) :]
+        fill()
+
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise ValueError(f"{key} 数组不完整")
+            buffer, pos = "", 0
+            fill()
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # 元素被块边界切断，读入更多内容后重试
+            buffer, pos = buffer[pos:], 0
+            fill()
+            continue
+
+        yield item
+        pos = end
+        if pos >= chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def read_json_header(f: TextIO, chunk_size: int = JSON_CHUNK_SIZE) -> dict:
+    """读取导出文件中 records 数组之前的头部字段，不解析记录"""
+    marker = re.compile(r'"records"\s*:\s*\[')
+    buffer = ""
+    while True:
+        match = marker.search(buffer)
+        if match:
+            return json.loads(buffer[: match.start()].rstrip().rstrip(",") + "}")
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ValueError("文件中没有 records 数组")
+        buffer += chunk
+
+
+def _record_order(record: dict) -> tuple:
+    """导出文件中的记录按日期、ID降序排列"""
+    return record["date"], record["record_id"]
+
+
+def write_json_export(
+    f: TextIO, header: dict, records: Iterable[dict], deleted: Optional[List] = None
+):
+    """
+    逐条写出导出文件：头部字段、records 数组（每条记录一行）、可选的 deleted 数组和汇总
+
+    deleted 在写完记录后才写出，可以在遍历 records 时填充。
+    """
+    # 去掉末尾的 "}"，接着写 records 数组
+    f.write(json.dumps(header, ensure_ascii=False, indent=2)[:-2])
+    f.write(',\n  "records": [')
+
+    total_records = 0
+    total_income = 0.0
+    total_expense = 0.0
+    for record in records:
+        f.write(",\n    " if total_records else "\n    ")
+        f.write(json.dumps(record, ensure_ascii=False))
+        total_records += 1
+        if record["record_type"] == "income":
+            total_income += record["amount"]
+        elif record["record_type"] == "expense":
+            total_expense += record["amount"]
+
+    summary = {
+        "total_records": total_records,
+        "total_income": total_income,
+        "total_expense": total_expense,
+    }
+    f.write("\n  ]," if total_records else "],")
+    if deleted is not None:
+        f.write(f'\n  "deleted": {json.dumps(deleted)},')
+        summary["total_deleted"] = len(deleted)
+    f.write('\n  "summary": ')
+    f.write(json.dumps(summary, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+    f.write("\n}\n")
+
+
+def merge_json_exports(base_path, delta_paths: List, output_path) -> tuple[bool, str]:
+    """由一个完整导出和其后的增量导出合并出新的完整快照
+
+    增量文件按序号排序后依次应用，序号必须首尾相接；输出文件与完整导出格式相同，
+    可以作为之后增量合并的基础文件。基础文件逐条流式读取，只有增量中的变更按记录ID
+    保存在内存中，与按日期降序排好的基础记录归并后写出。
+
+    Args:
+        base_path: export_delta 导出的完整（base）文件
+        delta_paths: 同一导出目标的增量（delta）文件，顺序不限
+        output_path: 输出文件路径
+
+    Returns:
+        (成功标志, 文件路径或错误信息)
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.name}.part")
+    try:
+        with open(base_path, encoding="utf-8") as f:
+            snapshot = read_json_header(f)
+        if snapshot.get("export_type") != "base":
+            return False, "合并失败: 基础文件不是完整导出"
+
+        deltas = []
+        for path in delta_paths:
+            with open(path, encoding="utf-8") as f:
+                delta = read_json_header(f)
+            if delta.get("export_type") != "delta":
+                return False, f"合并失败: {path} 不是增量导出"
+            if (
+                delta["destination"] != snapshot["destination"]
+                or delta["user"]["user_id"] != snapshot["user"]["user_id"]
+            ):
+                return False, f"合并失败: {path} 与基础文件不属于同一导出目标"
+            deltas.append((delta, path))
+        deltas.sort(key=lambda item: item[0]["since_seq"])
+
+        # 按记录ID累计各增量的变更，后面的增量覆盖前面的
+        upserts: Dict[int, dict] = {}
+        deleted: set = set()
+        seq = snapshot["until_seq"]
+        for delta, path in deltas:
+            if delta["since_seq"] != seq:
+                return False, f"合并失败: 缺少序号 {seq} 之后的增量导出"
+            with open(path, encoding="utf-8") as f:
+                for record in iter_json_array(f, "records"):
+                    upserts[record["record_id"]] = record
+                    deleted.discard(record["record_id"])
+            with open(path, encoding="utf-8") as f:
+                for record_id in iter_json_array(f, "deleted"):
+                    upserts.pop(record_id, None)
+                    deleted.add(record_id)
+            seq = delta["until_seq"]
+            snapshot["user"] = delta["user"]
+            snapshot["categories"] = delta["categories"]
+
+        header = {
+            "export_time": datetime.now().isoformat(),
+            "export_type": "base",
+            "destination": snapshot["destination"],
+            "since_seq": None,
+            "until_seq": seq,
+            "user": snapshot["user"],
+            "categories": snapshot["categories"],
+        }
+        changed = sorted(upserts.values(), key=_record_order, reverse=True)
+
+        with open(base_path, encoding="utf-8") as src:
+            unchanged = (
+                record
+                for record in iter_json_array(src, "records")
+                if record["record_id"] not in upserts
+                and record["record_id"] not in deleted
+            )
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                write_json_export(
+                    f,
+                    header,
+                    heapq.merge(unchanged, changed, key=_record_order, reverse=True),
+                )
+        os.replace(tmp_path, output_path)
+        return True, str(output_path)
+
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return False, f"合并失败: {str(e)}"
+
 
 class ExportModule:
     """数据导出模块"""
@@ -28,6 +327,33 @@ class ExportModule:
         self.state = state
         self.export_dir = Path.cwd() / "FinanceBookExports"
         self.export_dir.mkdir(parents=True, exist_ok=True)
+        # PDF报表的图表缓存目录
+        self.chart_cache_dir = self.export_dir / ".chart_cache"
+        # 后台任务的进度对象（models.export_job.ExportProgress），同步导出时为None
+        self.progress = None
+
+    @property
+    def cancelled(self) -> bool:
+        """后台导出是否已被取消"""
+        return self.progress is not None and self.progress.cancelled
+
+    @contextmanager
+    def _atomic_output(self, filepath: Path):
+        """
+        先写入同目录下的临时文件，完成后原子替换为目标文件
+
+        写入失败或被取消时删除临时文件，目标文件不会出现写了一半的内容。
+        """
+        tmp_path = filepath.with_name(f".{filepath.name}.part")
+        try:
+            yield tmp_path
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if self.cancelled:
+            tmp_path.unlink(missing_ok=True)
+        else:
+            os.replace(tmp_path, filepath)
 
     def export_to_json(self, filename: Optional[str] = None) -> tuple[bool, str]:
         """导出数据为JSON格式
@@ -52,67 +378,208 @@ class ExportModule:
 
             filepath = self.export_dir / filename
 
-            # 准备导出数据
-            export_data = {
-                "export_time": datetime.now().isoformat(),
-                "user": {
-                    "user_id": self.state.current_user.user_id,
-                    "username": self.state.current_user.username,
-                    "email": self.state.current_user.email,
-                },
-                "categories": [
-                    {
-                        "category_id": cat.category_id,
-                        "name": cat.name,
-                    }
-                    for cat in self.state.categories
-                ],
-                "records": [
-                    {
-                        "record_id": record.record_id,
-                        "amount": record.amount,
-                        "date": record.date.isoformat(),
-                        "record_type": record.record_type,
-                        "category_id": record.category_id,
-                        "category_name": (
-                            self.state.get_category_by_id(record.category_id).name
-                            if self.state.get_category_by_id(record.category_id)
-                            else "未知"
-                        ),
-                        "note": record.note,
-                        "created_at": (
-                            record.created_at.isoformat() if record.created_at else None
-                        ),
-                        "updated_at": (
-                            record.updated_at.isoformat() if record.updated_at else None
-                        ),
-                    }
-                    for record in self.state.records
-                ],
-                "summary": {
-                    "total_records": len(self.state.records),
-                    "total_income": sum(
-                        r.amount
-                        for r in self.state.records
-                        if r.record_type == "income"
-                    ),
-                    "total_expense": sum(
-                        r.amount
-                        for r in self.state.records
-                        if r.record_type == "expense"
-                    ),
-                },
-            }
+            # 边读边写：记录从数据库游标分批读取，汇总在写入时累计
+            with self._atomic_output(filepath) as tmp_path:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    self._write_json(f)
+
+            if self.cancelled:
+                return False, "导出已取消"
+            return True, str(filepath)
+
+        except Exception as e:
+            return False, f"导出失败: {str(e)}"
+
+    def _category_names(self) -> Dict[int, str]:
+        """分类ID到名称的映射，每次导出只构建一次"""
+        return {cat.category_id: cat.name for cat in self.state.categories}
+
+    def _iter_records(self) -> Iterator[Record]:
+        """流式读取当前用户的全部记录"""
+        return self._track(
+            self.state.db.iter_records(
+                self.state.current_user.user_id, batch_size=EXPORT_BATCH_SIZE
+            )
+        )
+
+    def _track(self, items: Iterable) -> Iterator:
+        """后台导出时逐条报告进度，取消后停止读取"""
+        if self.progress is None:
+            yield from items
+            return
+        for item in items:
+            if self.progress.cancelled:
+                return
+            yield item
+            self.progress.advance()
+
+    @staticmethod
+    def _record_to_dict(record: Record, category_names: Dict[int, str]) -> dict:
+        """记录转换为导出用的字典"""
+        return {
+            "record_id": record.record_id,
+            "amount": record.amount,
+            "date": record.date.isoformat(),
+            "record_type": record.record_type,
+            "category_id": record.category_id,
+            "category_name": category_names.get(record.category_id, "未知"),
+            "note": record.note,
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+            "updated_at": record.updated_at.isoformat() if record.updated_at else None,
+        }
+
+    def _write_json(
+        self,
+        f: TextIO,
+        extra: Optional[dict] = None,
+        changes: Optional[Iterable[Tuple[int, Optional[Record]]]] = None,
+    ):
+        """
+        逐条写出JSON，内存占用与记录数无关
+
+        文件结构与一次性 json.dump 相同，记录数组中每条记录占一行。
+
+        Args:
+            f: 输出文件
+            extra: 写在文件头部的附加字段（如增量导出的水位）
+            changes: 增量导出的变更流 (记录ID, 记录或None)；为None时导出全部记录，
+                否则只写出变更的记录，被删除的记录ID写入 deleted 数组
+        """
+        user = self.state.current_user
+        header = {
+            "export_time": datetime.now().isoformat(),
+            **(extra or {}),
+            "user": {
+                "user_id": user.user_id,
+                "username": user.username,
+                "email": user.email,
+            },
+            "categories": [
+                {"category_id": cat.category_id, "name": cat.name}
+                for cat in self.state.categories
+            ],
+        }
+        category_names = self._category_names()
+
+        deleted = []
+
+        def upserts():
+            for record_id, record in self._track(changes):
+                if record is None:
+                    deleted.append(record_id)
+                else:
+                    yield record
+
+        records = self._iter_records() if changes is None else upserts()
+        write_json_export(
+            f,
+            header,
+            (self._record_to_dict(record, category_names) for record in records),
+            None if changes is None else deleted,
+        )
 
-            # 写入文件
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+    def export_delta(
+        self, destination: str = "default", filename: Optional[str] = None
+    ) -> tuple[bool, str]:
+        """增量导出为JSON格式
+
+        每个导出目标第一次导出全部记录（export_type 为 "base"），之后只导出
+        自上次导出以来新增、修改和删除的记录（"delta"）。成功写出文件后才更新水位。
+
+        Args:
+            destination: 导出目标名称，不同目标分别记录水位
+            filename: 文件名(可选),默认使用类型、目标和时间戳
 
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        try:
+            if not self.state.current_user:
+                return False, "未登录用户"
+
+            db = self.state.db
+            user_id = self.state.current_user.user_id
+            since_seq = db.get_export_watermark(user_id, destination)
+            until_seq = db.start_change_log(user_id, destination)
+            export_type = "base" if since_seq is None else "delta"
+
+            # 生成文件名
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"finance_{export_type}_{destination}_{timestamp}.json"
+
+            if not filename.endswith(".json"):
+                filename += ".json"
+
+            filepath = self.export_dir / filename
+
+            extra = {
+                "export_type": export_type,
+                "destination": destination,
+                "since_seq": since_seq,
+                "until_seq": until_seq,
+            }
+            with self._atomic_output(filepath) as tmp_path:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    if since_seq is None:
+                        self._write_json(f, extra)
+                    else:
+                        changes = db.iter_record_changes(user_id, since_seq, until_seq)
+                        self._write_json(f, extra, changes)
+
+            if self.cancelled:
+                return False, "导出已取消"
+            if not db.save_export_watermark(user_id, destination, until_seq):
+                return False, "导出失败: 无法保存导出水位"
             return True, str(filepath)
 
         except Exception as e:
             return False, f"导出失败: {str(e)}"
 
+    def merge_delta_exports(self, destination: str = "default") -> tuple[bool, str]:
+        """将导出目录中某个导出目标最新的完整快照与其后的增量导出合并为新的完整快照
+
+        Args:
+            destination: 导出目标名称
+
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        try:
+            if not self.state.current_user:
+                return False, "未登录用户"
+
+            user_id = self.state.current_user.user_id
+            bases, deltas = [], []
+            for path in self.export_dir.glob("finance_*.json"):
+                with open(path, encoding="utf-8") as f:
+                    header = read_json_header(f)
+                if (
+                    header.get("destination") != destination
+                    or header.get("user", {}).get("user_id") != user_id
+                ):
+                    continue
+                if header.get("export_type") == "base":
+                    bases.append((header["until_seq"], path))
+                elif header.get("export_type") == "delta":
+                    deltas.append((header["since_seq"], path))
+            if not bases:
+                return False, "合并失败: 没有找到完整导出，请先进行增量导出"
+
+            until_seq, base_path = max(bases)
+            delta_paths = [path for since_seq, path in deltas if since_seq >= until_seq]
+            if not delta_paths:
+                return False, "合并失败: 最新的完整快照之后没有增量导出"
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filepath = (
+                self.export_dir / f"finance_base_{destination}_{timestamp}_merged.json"
+            )
+            return merge_json_exports(base_path, delta_paths, filepath)
+
+        except Exception as e:
+            return False, f"合并失败: {str(e)}"
+
     def export_to_excel(self, filename: Optional[str] = None) -> tuple[bool, str]:
         """导出数据为Excel格式
 
@@ -139,34 +606,59 @@ class ExportModule:
 
             filepath = self.export_dir / filename
 
-            # 创建工作簿
-            wb = openpyxl.Workbook()
+            # 只写模式：行写出后即序列化到临时文件，不在内存中保留单元格对象
+            wb = openpyxl.Workbook(write_only=True)
 
-            # 删除默认工作表
-            wb.remove(wb.active)
-
-            # 创建记录表
-            self._create_records_sheet(wb)
+            # 创建记录表（同时累计汇总数据）
+            totals = self._create_records_sheet(wb)
 
             # 创建分类表
             self._create_categories_sheet(wb)
 
             # 创建汇总表
-            self._create_summary_sheet(wb)
+            self._create_summary_sheet(wb, totals)
 
             # 保存文件
-            wb.save(filepath)
+            with self._atomic_output(filepath) as tmp_path:
+                wb.save(tmp_path)
 
+            if self.cancelled:
+                return False, "导出已取消"
             return True, str(filepath)
 
         except Exception as e:
             return False, f"导出失败: {str(e)}"
 
-    def _create_records_sheet(self, wb):
-        """创建记录工作表"""
-        ws = wb.create_sheet("记账记录")
+    @staticmethod
+    def _header_row(ws, headers, color: str) -> list:
+        """生成带样式的表头行（只写模式下通过 WriteOnlyCell 设置样式）"""
+        fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        font = Font(bold=True, color="FFFFFF")
+        alignment = Alignment(horizontal="center", vertical="center")
+        row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = fill
+            cell.font = font
+            cell.alignment = alignment
+            row.append(cell)
+        return row
+
+    @staticmethod
+    def _set_column_widths(ws, widths):
+        """设置列宽（只写模式下必须在写入数据前设置）"""
+        for i, width in enumerate(widths, 1):
+            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
 
-        # 设置表头
+    def _create_records_sheet(self, wb, max_rows: int = MAX_SHEET_ROWS) -> dict:
+        """
+        创建记录工作表
+
+        记录从数据库流式读取，超过单表行数上限时自动续写到新的工作表。
+
+        Returns:
+            dict: 记录数、总收入和总支出
+        """
         headers = [
             "记录ID",
             "日期",
@@ -177,30 +669,31 @@ class ExportModule:
             "创建时间",
             "更新时间",
         ]
-        ws.append(headers)
-
-        # 设置表头样式
-        header_fill = PatternFill(
-            start_color="4472C4", end_color="4472C4", fill_type="solid"
-        )
-        header_font = Font(bold=True, color="FFFFFF")
-
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # 填充数据
-        for record in self.state.records:
-            category = self.state.get_category_by_id(record.category_id)
-            category_name = category.name if category else "未知"
+        category_names = self._category_names()
+        totals = {"count": 0, "income": 0.0, "expense": 0.0}
+
+        def new_sheet():
+            index = len(wb.worksheets)
+            title = "记账记录" if index == 0 else f"记账记录{index + 1}"
+            sheet = wb.create_sheet(title)
+            self._set_column_widths(sheet, [10, 20, 10, 15, 12, 30, 20, 20])
+            sheet.append(self._header_row(sheet, headers, "4472C4"))
+            return sheet
+
+        ws = new_sheet()
+        rows_in_sheet = 1
+        for record in self._iter_records():
+            if rows_in_sheet >= max_rows:
+                ws = new_sheet()
+                rows_in_sheet = 1
 
             ws.append(
                 [
                     record.record_id,
-                    record.date.strftime("%Y-%m-%d"),
+                    # 写入日期时间单元格，保留时刻以便重新导入
+                    record.date,
                     "收入" if record.record_type == "income" else "支出",
-                    category_name,
+                    category_names.get(record.category_id, "未知"),
                     record.amount,
                     record.note or "",
                     (
@@ -215,30 +708,21 @@ class ExportModule:
                     ),
                 ]
             )
+            rows_in_sheet += 1
+            totals["count"] += 1
+            if record.record_type in ("income", "expense"):
+                totals[record.record_type] += record.amount
 
-        # 调整列宽
-        column_widths = [10, 12, 10, 15, 12, 30, 20, 20]
-        for i, width in enumerate(column_widths, 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
+        return totals
 
     def _create_categories_sheet(self, wb):
         """创建分类工作表"""
         ws = wb.create_sheet("分类列表")
+        self._set_column_widths(ws, [10, 15, 10, 15, 15])
 
         # 设置表头
         headers = ["分类ID", "分类名称", "类型", "图标", "颜色"]
-        ws.append(headers)
-
-        # 设置表头样式
-        header_fill = PatternFill(
-            start_color="70AD47", end_color="70AD47", fill_type="solid"
-        )
-        header_font = Font(bold=True, color="FFFFFF")
-
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+        ws.append(self._header_row(ws, headers, "70AD47"))
 
         # 填充数据
         for category in self.state.categories:
@@ -249,49 +733,271 @@ class ExportModule:
                 ]
             )
 
-        # 调整列宽
-        for i, width in enumerate([10, 15, 10, 15, 15], 1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
-
-    def _create_summary_sheet(self, wb):
+    def _create_summary_sheet(self, wb, totals: dict):
         """创建汇总工作表"""
         ws = wb.create_sheet("数据汇总", 0)  # 设为第一个工作表
+        ws.column_dimensions["A"].width = 15
+        ws.column_dimensions["B"].width = 30
+
+        title_font = Font(bold=True, size=12)
+
+        def title(text):
+            cell = WriteOnlyCell(ws, value=text)
+            cell.font = title_font
+            return [cell]
 
         # 用户信息
-        ws.append(["用户信息"])
+        ws.append(title("用户信息"))
         ws.append(["用户名", self.state.current_user.username])
         ws.append(["邮箱", self.state.current_user.email])
         ws.append([])
 
         # 统计信息
-        total_income = sum(
-            r.amount for r in self.state.records if r.record_type == "income"
-        )
-        total_expense = sum(
-            r.amount for r in self.state.records if r.record_type == "expense"
-        )
+        total_income = totals["income"]
+        total_expense = totals["expense"]
         net_savings = total_income - total_expense
 
-        ws.append(["财务统计"])
-        ws.append(["总记录数", len(self.state.records)])
+        ws.append(title("财务统计"))
+        ws.append(["总记录数", totals["count"]])
         ws.append(["总收入", f"¥{total_income:.2f}"])
         ws.append(["总支出", f"¥{total_expense:.2f}"])
         ws.append(["净储蓄", f"¥{net_savings:.2f}"])
         ws.append([])
 
         # 导出信息
-        ws.append(["导出信息"])
+        ws.append(title("导出信息"))
         ws.append(["导出时间", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
         ws.append(["数据版本", "1.0.0"])
 
-        # 设置样式
-        title_font = Font(bold=True, size=12)
-        for row in [1, 5, 11]:
-            ws[f"A{row}"].font = title_font
+    def export_to_csv(
+        self, filename: Optional[str] = None, compression: Optional[str] = None
+    ) -> tuple[bool, str]:
+        """导出记录为CSV格式
 
-        # 调整列宽
-        ws.column_dimensions["A"].width = 15
-        ws.column_dimensions["B"].width = 30
+        记录从数据库分批读取并逐批写出，列顺序固定为 CSV_COLUMNS。
+
+        Args:
+            filename: 文件名(可选),默认使用时间戳
+            compression: 压缩格式(可选): "gzip"、"bz2" 或 "xz"
+
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        if compression is not None and compression not in CSV_COMPRESSIONS:
+            return False, f"不支持的压缩格式: {compression}"
+
+        try:
+            if not self.state.current_user:
+                return False, "未登录用户"
+
+            # 生成文件名
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"finance_records_{timestamp}.csv"
+
+            suffix = ".csv" + (CSV_COMPRESSIONS[compression][1] if compression else "")
+            if filename.endswith(".csv"):
+                filename = filename[: -len(".csv")]
+            if not filename.endswith(suffix):
+                filename += suffix
+
+            filepath = self.export_dir / filename
+
+            with self._atomic_output(filepath) as tmp_path:
+                with open_csv(tmp_path, "w", compression) as f:
+                    self._write_csv(f)
+
+            if self.cancelled:
+                return False, "导出已取消"
+            return True, str(filepath)
+
+        except Exception as e:
+            return False, f"导出失败: {str(e)}"
+
+    def _write_csv(self, f: TextIO):
+        """按固定列顺序分批写出记录"""
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+
+        category_names = self._category_names()
+        batch = []
+        for record in self._iter_records():
+            row = self._record_to_dict(record, category_names)
+            batch.append([row[column] for column in CSV_COLUMNS])
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                writer.writerows(batch)
+                batch.clear()
+        writer.writerows(batch)
+
+    def export_to_parquet(self, filename: Optional[str] = None) -> tuple[bool, str]:
+        """导出记录为Parquet格式
+
+        记录从数据库流式读取，每 PARQUET_ROW_GROUP_SIZE 条写出一个行组。
+
+        Args:
+            filename: 文件名(可选),默认使用时间戳
+
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        if not PARQUET_AVAILABLE:
+            return False, "需要安装 pyarrow 库: pip install pyarrow"
+
+        try:
+            if not self.state.current_user:
+                return False, "未登录用户"
+
+            # 生成文件名
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"finance_records_{timestamp}.parquet"
+
+            if not filename.endswith(".parquet"):
+                filename += ".parquet"
+
+            filepath = self.export_dir / filename
+
+            schema = parquet_schema()
+            with self._atomic_output(filepath) as tmp_path:
+                with pq.ParquetWriter(tmp_path, schema) as writer:
+                    for columns in self._iter_parquet_batches():
+                        table = pa.Table.from_pydict(columns, schema=schema)
+                        writer.write_table(table)
+
+            if self.cancelled:
+                return False, "导出已取消"
+            return True, str(filepath)
+
+        except Exception as e:
+            return False, f"导出失败: {str(e)}"
+
+    def _iter_parquet_batches(self) -> Iterator[Dict[str, list]]:
+        """按行组大小分批生成列数据，没有记录时生成一个空批次"""
+        category_names = self._category_names()
+        columns = {name: [] for name in parquet_schema().names}
+        written = 0
+        for record in self._iter_records():
+            columns["record_id"].append(record.record_id)
+            columns["date"].append(record.date)
+            columns["record_type"].append(record.record_type)
+            columns["category_id"].append(record.category_id)
+            columns["category_name"].append(
+                category_names.get(record.category_id, "未知")
+            )
+            columns["amount_cents"].append(round(record.amount * 100))
+            columns["note"].append(record.note or "")
+            columns["created_at"].append(record.created_at)
+            columns["updated_at"].append(record.updated_at)
+            if len(columns["record_id"]) >= PARQUET_ROW_GROUP_SIZE:
+                written += len(columns["record_id"])
+                yield columns
+                columns = {name: [] for name in columns}
+        if columns["record_id"] or not written:
+            yield columns
+
+    def export_to_pdf(
+        self, period: str, filename: Optional[str] = None
+    ) -> tuple[bool, str]:
+        """导出月报或年报为PDF
+
+        包含收支摘要、支出分类饼图、收支趋势图和支出排行。图表在无界面的 Agg
+        画布上绘制，按 (用户, 期间, 数据版本) 缓存，数据未变时重复导出不再重绘。
+
+        Args:
+            period: "YYYY-MM"（月报）或 "YYYY"（年报）
+            filename: 文件名(可选),默认按期间命名
+
+        Returns:
+            (成功标志, 文件路径或错误信息)
+        """
+        if not (MATPLOTLIB_AVAILABLE and REPORTLAB_AVAILABLE):
+            return False, "需要安装 reportlab 和 matplotlib 库: pip install reportlab matplotlib"
+
+        try:
+            if not self.state.current_user:
+                return False, "未登录用户"
+            parse_period(period)
+
+            if not filename:
+                filename = f"finance_report_{period}.pdf"
+
+            if not filename.endswith(".pdf"):
+                filename += ".pdf"
+
+            filepath = self.export_dir / filename
+            user = self.state.current_user
+
+            with self._atomic_output(filepath) as tmp_path:
+                generate_pdf_report(
+                    self.state.db,
+                    user.user_id,
+                    period,
+                    tmp_path,
+                    ChartCache(self.chart_cache_dir),
+                    user.username,
+                )
+
+            if self.cancelled:
+                return False, "导出已取消"
+            return True, str(filepath)
+
+        except Exception as e:
+            return False, f"导出失败: {str(e)}"
+
+    def export_pdf_reports(
+        self, periods: List[str], max_workers: Optional[int] = None
+    ) -> List[tuple[bool, str]]:
+        """批量导出多个期间的PDF报表（如年终的12个月报和年报）
+
+        每个期间在进程池的独立进程中生成，绘图不受GIL限制；各进程共享磁盘上的图表缓存。
+
+        Args:
+            periods: 期间列表，格式同 export_to_pdf
+            max_workers: 最大进程数，默认为CPU核数
+
+        Returns:
+            每个期间的 (成功标志, 文件路径或错误信息)，顺序与 periods 相同
+        """
+        if not (MATPLOTLIB_AVAILABLE and REPORTLAB_AVAILABLE):
+            message = "需要安装 reportlab 和 matplotlib 库: pip install reportlab matplotlib"
+            return [(False, message) for _ in periods]
+        if not self.state.current_user:
+            return [(False, "未登录用户") for _ in periods]
+
+        user = self.state.current_user
+        db_path = os.path.abspath(self.state.db.db_path)
+        # 界面进程中有其他线程，使用 spawn 而不是 fork 创建子进程
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers, mp_context=context) as pool:
+            futures = [
+                pool.submit(
+                    build_report_file,
+                    db_path,
+                    user.user_id,
+                    period,
+                    str(self.export_dir / f"finance_report_{period}.pdf"),
+                    str(self.chart_cache_dir),
+                    user.username,
+                )
+                for period in periods
+            ]
+            return [future.result() for future in futures]
+
+    def export_year_reports(self, year: Optional[int] = None) -> tuple[bool, str]:
+        """并行导出某年的12个月报和年报
+
+        Args:
+            year: 年份，默认为今年
+
+        Returns:
+            (成功标志, 导出目录或第一个错误信息)
+        """
+        year = year or datetime.now().year
+        results = self.export_pdf_reports(periods_of_year(year))
+        failed = [message for success, message in results if not success]
+        if failed:
+            return False, failed[0]
+        return True, str(self.export_dir)
 
     def get_export_directory(self) -> str:
         """获取导出目录路径"""
@@ -0,0 +1,143 @@
+"""
+Background export jobs with progress reporting and cancellation
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from models.export import ExportModule
+from models.record_filter import FilterCriteria
+
+# 每写出这么多条记录通知一次进度
+PROGRESS_INTERVAL = 1000
+
+# 导出格式 -> (显示名称, 导出函数)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    "json": ("JSON", lambda module: module.export_to_json()),
+    "delta": ("增量 JSON", lambda module: module.export_delta()),
+    "merge": ("合并快照", lambda module: module.merge_delta_exports()),
+    "excel": ("Excel", lambda module: module.export_to_excel()),
+    "csv": ("CSV", lambda module: module.export_to_csv(compression="gzip")),
+    "parquet": ("Parquet", lambda module: module.export_to_parquet()),
+    "pdf": (
+        "PDF 报告",
+        lambda module: module.export_to_pdf(datetime.now().strftime("%Y-%m")),
+    ),
+    "pdf_year": ("全年 PDF 报告", lambda module: module.export_year_reports()),
+}
+# 逐条写出记录、可以报告进度的格式；其他格式的进度条显示为不确定
+STREAMED_FORMATS = {"json", "excel", "csv", "parquet"}
+
+
+@dataclass
+class ExportProgress:
+    total: int = 0
+    written: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    on_update: Optional[Callable[["ExportProgress"], None]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def fraction(self) -> float:
+        """完成比例（0~1）"""
+        if self.total <= 0:
+            return 0.0
+        return min(self.written / self.total, 1.0)
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """按目前的速度估算的剩余秒数，尚未开始写出时返回None"""
+        if self.written <= 0:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed / self.written * max(self.total - self.written, 0)
+
+    def advance(self, rows: int = 1):
+        """记录写出的行数，每 PROGRESS_INTERVAL 条通知一次"""
+        before = self.written
+        self.written += rows
+        if self.on_update and (
+            self.written // PROGRESS_INTERVAL != before // PROGRESS_INTERVAL
+            or self.written == self.total
+        ):
+            self.on_update(self)
+
+
+class ExportJob:
+    """
+    后台导出任务
+
+    在工作线程中执行导出，通过回调报告进度；取消后写出的临时文件会被删除，
+    目标文件保持不变。
+    """
+
+    def __init__(
+        self,
+        state,
+        export_format: str,
+        on_update: Optional[Callable[[ExportProgress], None]] = None,
+        on_done: Optional[Callable[["ExportJob"], None]] = None,
+    ):
+        self.state = state
+        self.export_format = export_format
+        self.label, self._run = EXPORT_FORMATS[export_format]
+        self.on_done = on_done
+        self.progress = ExportProgress(on_update=on_update)
+        self.result: Optional[tuple] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_callbacks(
+        self,
+        on_update: Optional[Callable[[ExportProgress], None]],
+        on_done: Optional[Callable[["ExportJob"], None]],
+    ):
+        """更换回调（设置页面重新创建后重新绑定）"""
+        self.progress.on_update = on_update
+        self.on_done = on_done
+
+    def start(self) -> threading.Thread:
+        """启动工作线程"""
+        self._thread = threading.Thread(
+            target=self._worker, name=f"export-{self.export_format}", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def cancel(self):
+        """请求取消，导出会在写出下一条记录前停止"""
+        self.progress.cancel_event.set()
+
+    def wait(self, timeout: Optional[float] = None):
+        """等待任务结束"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _worker(self):
+        """执行导出"""
+        try:
+            if self.state.current_user and self.export_format in STREAMED_FORMATS:
+                self.progress.total = self.state.db.count_records(
+                    self.state.current_user.user_id, FilterCriteria()
+                )
+            module = ExportModule(self.state)
+            module.progress = self.progress
+            self.result = self._run(module)
+        except Exception as e:
+            self.result = (False, f"导出失败: {str(e)}")
+
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                print(f"导出回调失败: {e}")
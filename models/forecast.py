@@ -0,0 +1,280 @@
+"""
+Forecast module for projecting income/expense from daily aggregates
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+HISTORY_DAYS = 90
+CHART_HORIZON_DAYS = 7
+CONFIDENCE_Z = 1.96
+SMOOTHING_ALPHA = 0.1
+
+
+@dataclass
+class Projection:
+    actual: float = 0.0  # 截至今天的实际金额
+    expected: float = 0.0  # 期末预测金额
+    lower: float = 0.0
+    upper: float = 0.0
+
+
+@dataclass
+class ForecastResult:
+    generated_on: date
+    horizon_dates: List[date] = field(default_factory=list)
+    # 按类型汇总的未来每日预测及置信区间
+    daily_expected: Dict[str, List[float]] = field(default_factory=dict)
+    daily_lower: Dict[str, List[float]] = field(default_factory=dict)
+    daily_upper: Dict[str, List[float]] = field(default_factory=dict)
+    # totals[record_type]["month" | "year"]
+    totals: Dict[str, Dict[str, Projection]] = field(default_factory=dict)
+    # by_category[(record_type, category_id)]["month" | "year"]
+    by_category: Dict[Tuple[str, int], Dict[str, Projection]] = field(
+        default_factory=dict
+    )
+
+
+def fit_linear_trend(series):
+    """
+    对矩阵的每一行同时做最小二乘线性回归
+
+    Args:
+        series: 形状为 (k, n) 的数组，每行是一条按天排列的序列
+
+    Returns:
+        (slope, intercept, residual_std)，均为长度 k 的数组
+    """
+    n = series.shape[1]
+    t = np.arange(n, dtype=float)
+    t_centered = t - t.mean()
+    denominator = float(t_centered @ t_centered) or 1.0
+
+    means = series.mean(axis=1)
+    slope = (series - means[:, None]) @ t_centered / denominator
+    intercept = means - slope * t.mean()
+
+    residuals = series - (intercept[:, None] + slope[:, None] * t)
+    dof = max(n - 2, 1)
+    residual_std = np.sqrt((residuals**2).sum(axis=1) / dof)
+    return slope, intercept, residual_std
+
+
+def exponential_smoothing(series, alpha: float = SMOOTHING_ALPHA):
+    """
+    对矩阵的每一行同时做简单指数平滑
+
+    Args:
+        series: 形状为 (k, n) 的数组
+        alpha (float): 平滑系数
+
+    Returns:
+        (level, residual_std)，均为长度 k 的数组
+    """
+    level = series[:, 0].copy()
+    squared_errors = np.zeros(series.shape[0])
+    for column in range(1, series.shape[1]):
+        error = series[:, column] - level
+        squared_errors += error**2
+        level += alpha * error
+
+    residual_std = np.sqrt(squared_errors / max(series.shape[1] - 1, 1))
+    return level, residual_std
+
+
+def predict_daily(series, horizon: int, method: str = "smoothing"):
+    """
+    预测每条序列未来 horizon 天的每日金额
+
+    Returns:
+        (expected, residual_std)，expected 形状为 (k, horizon)
+    """
+    steps = np.arange(1, horizon + 1, dtype=float)
+    if method == "linear":
+        slope, intercept, residual_std = fit_linear_trend(series)
+        last_t = series.shape[1] - 1
+        expected = intercept[:, None] + slope[:, None] * (last_t + steps)
+    else:
+        level, residual_std = exponential_smoothing(series)
+        expected = np.repeat(level[:, None], horizon, axis=1)
+
+    return np.clip(expected, 0, None), residual_std
+
+
+def build_forecast(
+    rows: List[Dict],
+    today: date,
+    method: str = "smoothing",
+    history_days: int = HISTORY_DAYS,
+) -> ForecastResult:
+    """
+    根据每日分类汇总数据构建预测结果
+
+    Args:
+        rows (List[Dict]): 含 day、record_type、category_id、total 的汇总行
+        today (date): 预测基准日（含当天的实际数据）
+        method (str): "smoothing" 或 "linear"
+        history_days (int): 用于拟合的历史天数
+
+    Returns:
+        ForecastResult: 预测结果
+    """
+    year_start = date(today.year, 1, 1)
+    month_start = today.replace(day=1)
+    window_start = min(year_start, today - timedelta(days=history_days - 1))
+    total_days = (today - window_start).days + 1
+
+    # 每个 (类型, 分类) 一行，另加每个类型的汇总行
+    keys: List[Tuple[str, Optional[int]]] = [("income", None), ("expense", None)]
+    key_index = {key: i for i, key in enumerate(keys)}
+    for row in rows:
+        key = (row["record_type"], row["category_id"])
+        if row["record_type"] in ("income", "expense") and key not in key_index:
+            key_index[key] = len(keys)
+            keys.append(key)
+
+    matrix = np.zeros((len(keys), total_days))
+    for row in rows:
+        if row["record_type"] not in ("income", "expense"):
+            continue
+        column = (date.fromisoformat(row["day"]) - window_start).days
+        if 0 <= column < total_days:
+            amount = float(row["total"] or 0)
+            matrix[key_index[(row["record_type"], row["category_id"])], column] += amount
+            matrix[key_index[(row["record_type"], None)], column] += amount
+
+    history = matrix[:, -history_days:]
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    remaining_month = (month_end - today).days
+    remaining_year = (date(today.year, 12, 31) - today).days
+    horizon = max(remaining_year, CHART_HORIZON_DAYS)
+
+    expected, residual_std = predict_daily(history, horizon, method)
+
+    month_actual = matrix[:, (month_start - window_start).days :].sum(axis=1)
+    year_actual = matrix[:, (year_start - window_start).days :].sum(axis=1)
+
+    def project(actual, days):
+        future = expected[:, :days].sum(axis=1)
+        margin = CONFIDENCE_Z * residual_std * np.sqrt(days)
+        return [
+            Projection(
+                actual=float(actual[i]),
+                expected=float(actual[i] + future[i]),
+                lower=float(actual[i] + max(future[i] - margin[i], 0.0)),
+                upper=float(actual[i] + future[i] + margin[i]),
+            )
+            for i in range(len(keys))
+        ]
+
+    month_projections = project(month_actual, remaining_month)
+    year_projections = project(year_actual, remaining_year)
+
+    result = ForecastResult(
+        generated_on=today,
+        horizon_dates=[today + timedelta(days=d) for d in range(1, CHART_HORIZON_DAYS + 1)],
+    )
+    for i, (record_type, category_id) in enumerate(keys):
+        projections = {"month": month_projections[i], "year": year_projections[i]}
+        if category_id is None:
+            daily = expected[i, :CHART_HORIZON_DAYS]
+            margin = CONFIDENCE_Z * residual_std[i]
+            result.totals[record_type] = projections
+            result.daily_expected[record_type] = daily.tolist()
+            result.daily_lower[record_type] = np.clip(daily - margin, 0, None).tolist()
+            result.daily_upper[record_type] = (daily + margin).tolist()
+        else:
+            result.by_category[(record_type, category_id)] = projections
+
+    return result
+
+
+class ForecastService:
+    """
+    预测服务
+
+    在后台线程中拟合模型，结果按 (user_id, data_version) 缓存，
+    打开统计页面时只读取缓存，不会等待模型计算。
+    """
+
+    def __init__(self, db, method: str = "smoothing"):
+        self.db = db
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast")
+        self._lock = Lock()
+        self._cache: Dict[Tuple[int, int], ForecastResult] = {}
+        self._pending: Dict[Tuple[int, int], List[Callable]] = {}
+
+    def get(self, user_id: int, data_version: int) -> Optional[ForecastResult]:
+        """读取缓存的预测结果"""
+        with self._lock:
+            return self._cache.get((user_id, data_version))
+
+    def request(
+        self,
+        user_id: int,
+        data_version: int,
+        callback: Optional[Callable[[ForecastResult], None]] = None,
+    ) -> Optional[ForecastResult]:
+        """
+        获取预测结果，未缓存时提交后台计算
+
+        Returns:
+            Optional[ForecastResult]: 已缓存的结果；未缓存时返回None，计算完成后调用callback
+        """
+        if not NUMPY_AVAILABLE:
+            return None
+
+        key = (user_id, data_version)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            if key in self._pending:
+                if callback:
+                    self._pending[key].append(callback)
+                return None
+            self._pending[key] = [callback] if callback else []
+
+        self._executor.submit(self._compute, key)
+        return None
+
+    def _compute(self, key: Tuple[int, int]):
+        """后台计算预测"""
+        user_id, _ = key
+        result = None
+        try:
+            today = datetime.now().date()
+            start = min(
+                date(today.year, 1, 1), today - timedelta(days=HISTORY_DAYS - 1)
+            )
+            rows = self.db.get_daily_category_totals(
+                user_id, start.isoformat(), today.isoformat()
+            )
+            result = build_forecast(rows, today, self.method)
+        except Exception as e:
+            print(f"预测计算失败: {e}")
+
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+            if result is not None:
+                # 同一用户只保留最新数据版本的结果
+                for cached_key in [k for k in self._cache if k[0] == user_id]:
+                    del self._cache[cached_key]
+                self._cache[key] = result
+
+        if result is not None:
+            for callback in callbacks:
+                try:
+                    callback(result)
+                except Exception as e:
+                    print(f"预测回调失败: {e}")
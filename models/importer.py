@@ -0,0 +1,494 @@
+"""
+ImportModule for importing records from exported files
+"""
+
+import csv
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from models.export import (
+    EXCEL_AVAILABLE,
+    PARQUET_AVAILABLE,
+    detect_compression,
+    iter_json_array,
+    open_csv,
+)
+from models.record import Record
+
+if EXCEL_AVAILABLE:
+    import openpyxl
+
+if PARQUET_AVAILABLE:
+    import pyarrow.parquet as pq
+
+# 每批校验和插入的记录数，每批一个事务
+IMPORT_BATCH_SIZE = 5000
+# 导入结果中保留的异常支出条数，以及提示中列出的条数
+MAX_REPORTED_ANOMALIES = 50
+SUMMARY_ANOMALIES = 3
+
+# Excel 导出的表头 -> 导入字段
+EXCEL_HEADERS = {
+    "日期": "date",
+    "类型": "record_type",
+    "分类": "category_name",
+    "金额": "amount",
+    "备注": "note",
+}
+EXCEL_RECORD_TYPES = {"收入": "income", "支出": "expense"}
+
+# 银行账单CSV的列名 -> 导入字段（按顺序取第一个存在的列）
+STATEMENT_COLUMNS = {
+    "date": ("date", "日期", "交易日期", "记账日期"),
+    "amount": ("amount", "金额", "交易金额"),
+    "record_type": ("record_type", "type", "类型", "收支"),
+    "note": ("note", "description", "摘要", "备注", "交易摘要"),
+    "category_name": ("category_name", "category", "分类"),
+}
+STATEMENT_RECORD_TYPES = {
+    "income": "income",
+    "expense": "expense",
+    "收入": "income",
+    "支出": "expense",
+}
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    skipped: int = 0  # 字段无效或分类不存在的行
+    error: Optional[str] = None
+    dry_run: bool = False
+    elapsed: float = 0.0
+    duplicates: int = 0  # 与已有记录内容指纹相同而跳过的行
+    conflicts: int = 0  # 同日同金额同类型但备注不同，疑似重复而未导入的行
+    anomalies: int = 0  # 相对分类历史金额异常的支出
+    anomaly_records: List[Record] = field(default_factory=list)  # 前几条异常支出
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def rows_per_second(self) -> float:
+        """每秒处理的行数（含跳过的行）"""
+        if self.elapsed <= 0:
+            return 0.0
+        processed = self.imported + self.skipped + self.duplicates + self.conflicts
+        return processed / self.elapsed
+
+    def summary(self) -> str:
+        """导入结果说明"""
+        if self.error:
+            return self.error
+        action = "校验通过" if self.dry_run else "成功导入"
+        text = f"{action} {self.imported} 条记录"
+        if self.skipped:
+            text += f"，跳过 {self.skipped} 条无效记录"
+        if self.duplicates:
+            text += f"，跳过 {self.duplicates} 条重复记录"
+        if self.conflicts:
+            text += f"，{self.conflicts} 条疑似重复未导入"
+        if self.anomalies:
+            samples = "、".join(
+                f"{record.date:%Y-%m-%d} ¥{record.amount:.2f}"
+                for record in self.anomaly_records[:SUMMARY_ANOMALIES]
+            )
+            more = " 等" if self.anomalies > SUMMARY_ANOMALIES else ""
+            text += f"，{self.anomalies} 条支出金额异常: {samples}{more}"
+        return text + f"（{self.rows_per_second:.0f} 行/秒）"
+
+
+class ImportModule:
+    """数据导入模块"""
+
+    def __init__(self, state):
+        """初始化导入模块
+
+        Args:
+            state: AppState对象,包含用户数据
+        """
+        self.state = state
+
+    def import_file(self, path, dry_run: bool = False) -> ImportReport:
+        """按文件后缀选择格式导入
+
+        支持 .json、.csv（可为 .gz/.bz2/.xz 压缩）、.xlsx 和 .parquet。
+        """
+        name = str(path).lower()
+        if name.endswith(".json"):
+            return self.import_from_json(path, dry_run)
+        if name.endswith(".xlsx"):
+            return self.import_from_excel(path, dry_run)
+        if name.endswith(".parquet"):
+            return self.import_from_parquet(path, dry_run)
+        if detect_compression(name) or name.endswith(".csv"):
+            return self.import_from_csv(path, dry_run)
+        return ImportReport(error=f"不支持的文件格式: {Path(path).name}")
+
+    def import_from_csv(self, path, dry_run: bool = False) -> ImportReport:
+        """从CSV文件导入记录
+
+        按后缀识别 gzip/bz2/xz 压缩，逐行解析并分批插入数据库。
+        分类优先按名称匹配（不同机器上的分类ID可能不同），其次按ID匹配。
+
+        Args:
+            path: CSV文件路径
+            dry_run: 只解析和校验，不写入数据库
+
+        Returns:
+            ImportReport: 导入结果
+        """
+        return self._run_import(path, self._iter_csv_rows, dry_run)
+
+    def import_from_json(self, path, dry_run: bool = False) -> ImportReport:
+        """从 export_to_json 导出的文件导入记录（增量解析 records 数组）"""
+        return self._run_import(path, self._iter_json_rows, dry_run)
+
+    def import_from_excel(self, path, dry_run: bool = False) -> ImportReport:
+        """从 export_to_excel 导出的文件导入记录（只读模式逐行读取记录表）"""
+        if not EXCEL_AVAILABLE:
+            return ImportReport(error="需要安装 openpyxl 库: pip install openpyxl")
+        return self._run_import(path, self._iter_excel_rows, dry_run)
+
+    def import_from_parquet(self, path, dry_run: bool = False) -> ImportReport:
+        """从 export_to_parquet 导出的文件导入记录
+
+        按批读取行组，只读取导入需要的列，金额由分换算为元。
+        """
+        if not PARQUET_AVAILABLE:
+            return ImportReport(error="需要安装 pyarrow 库: pip install pyarrow")
+        return self._run_import(path, self._iter_parquet_rows, dry_run)
+
+    def import_statement(
+        self, path, category_id: int, dry_run: bool = False
+    ) -> ImportReport:
+        """导入银行账单CSV并按内容指纹去重
+
+        识别常见的中英文列名；没有类型列时按金额正负区分收入和支出。
+        账单中没有分类（或分类不存在）的行计入 category_id 指定的分类。
+        与已有记录指纹相同的行跳过；同日同金额同类型而备注不同的行视为疑似重复，
+        计入 conflicts 而不导入。
+
+        Args:
+            path: 账单文件路径（可为 .gz/.bz2/.xz 压缩）
+            category_id: 默认分类ID
+            dry_run: 只解析和校验，不写入数据库
+
+        Returns:
+            ImportReport: 导入结果
+        """
+        return self._run_import(
+            path,
+            lambda p: self._iter_statement_rows(p, category_id),
+            dry_run,
+            dedupe=True,
+        )
+
+    def _run_import(
+        self,
+        path,
+        read_rows: Callable[[Path], Iterable[Dict]],
+        dry_run: bool,
+        dedupe: bool = False,
+    ) -> ImportReport:
+        """读取行、分批校验并写入，统计结果和耗时"""
+        if not self.state.current_user:
+            return ImportReport(error="未登录用户")
+
+        path = Path(path)
+        if not path.exists():
+            return ImportReport(error=f"文件不存在: {path}")
+
+        # 导入在后台线程运行，用户在开始时确定，之后每批核对是否仍已登录
+        user_id = self.state.current_user.user_id
+        report = ImportReport(dry_run=dry_run)
+        started = time.perf_counter()
+        try:
+            self._import_rows(read_rows(path), report, user_id, dedupe)
+        except Exception as e:
+            report.error = f"导入失败: {str(e)}"
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _is_current_user(self, user_id: int) -> bool:
+        """导入开始时的用户是否仍然登录"""
+        user = self.state.current_user
+        return user is not None and user.user_id == user_id
+
+    @staticmethod
+    def _iter_csv_rows(path: Path) -> Iterator[Dict]:
+        """逐行读取CSV文件"""
+        with open_csv(path, "r", detect_compression(path)) as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "amount" not in reader.fieldnames:
+                raise ValueError("文件格式不正确: 缺少 amount 列")
+            yield from reader
+
+    @staticmethod
+    def _iter_json_rows(path: Path) -> Iterator[Dict]:
+        """增量读取JSON导出文件中的记录"""
+        with open(path, encoding="utf-8") as f:
+            yield from iter_json_array(f, "records")
+
+    @staticmethod
+    def _iter_excel_rows(path: Path) -> Iterator[Dict]:
+        """逐行读取Excel导出文件中的记录表（超过行数上限时拆分的多个表）"""
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheets = [ws for ws in wb.worksheets if ws.title.startswith("记账记录")]
+            if not sheets:
+                raise ValueError("文件格式不正确: 没有记账记录工作表")
+            for ws in sheets:
+                rows = ws.iter_rows(values_only=True)
+                header = next(rows, ())
+                columns = {
+                    EXCEL_HEADERS[name]: i
+                    for i, name in enumerate(header)
+                    if name in EXCEL_HEADERS
+                }
+                for values in rows:
+                    row = {
+                        field: values[i] if i < len(values) else None
+                        for field, i in columns.items()
+                    }
+                    row["record_type"] = EXCEL_RECORD_TYPES.get(row.get("record_type"))
+                    # 未设置日期格式的单元格读出为Excel序列值
+                    if isinstance(row.get("date"), (int, float)):
+                        row["date"] = openpyxl.utils.datetime.from_excel(row["date"])
+                    yield row
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _iter_statement_rows(path: Path, category_id: int) -> Iterator[Dict]:
+        """逐行读取银行账单CSV，转换为与导出CSV行相同的字段"""
+        with open_csv(path, "r", detect_compression(path)) as f:
+            reader = csv.DictReader(f)
+            fieldnames = [name.strip() for name in reader.fieldnames or []]
+            reader.fieldnames = fieldnames
+            columns = {
+                field: next((name for name in aliases if name in fieldnames), None)
+                for field, aliases in STATEMENT_COLUMNS.items()
+            }
+            if not columns["date"] or not columns["amount"]:
+                raise ValueError("文件格式不正确: 缺少日期或金额列")
+
+            for raw in reader:
+                row = {
+                    field: (raw.get(name) or "").strip() if name else ""
+                    for field, name in columns.items()
+                }
+                row["date"] = row["date"].replace("/", "-")
+                try:
+                    amount = float(re.sub(r"[,\s¥￥$]", "", row["amount"]))
+                except ValueError:
+                    amount = None
+                record_type = STATEMENT_RECORD_TYPES.get(row["record_type"].lower())
+                if record_type is None and amount is not None:
+                    record_type = "expense" if amount < 0 else "income"
+                row["record_type"] = record_type
+                row["amount"] = abs(amount) if amount is not None else None
+                row["category_id"] = category_id
+                yield row
+
+    @staticmethod
+    def _iter_parquet_rows(path: Path) -> Iterator[Dict]:
+        """逐批读取Parquet文件，转换为与CSV行相同的字段"""
+        columns = [
+            "date",
+            "record_type",
+            "category_id",
+            "category_name",
+            "amount_cents",
+            "note",
+        ]
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(
+            batch_size=IMPORT_BATCH_SIZE, columns=columns
+        ):
+            for row in batch.to_pylist():
+                cents = row.pop("amount_cents")
+                row["amount"] = cents / 100 if cents is not None else None
+                yield row
+
+    def _import_rows(
+        self,
+        rows: Iterable[Dict],
+        report: ImportReport,
+        user_id: int,
+        dedupe: bool = False,
+    ):
+        """按批校验并写入，report 随之更新"""
+        # 分类查找表每次导入只构建一次
+        ids_by_name = {cat.name: cat.category_id for cat in self.state.categories}
+        known_ids = set(ids_by_name.values())
+        # 去重状态：指纹在导入前的已有次数、在本文件中出现的次数、本次写入的指纹
+        existing: Dict[str, int] = {}
+        seen: Dict[str, int] = {}
+        inserted_fingerprints: set = set()
+
+        for batch in self._batches(rows):
+            records = self._validate_batch(batch, user_id, ids_by_name, known_ids)
+            report.skipped += len(batch) - len(records)
+            if dedupe and records:
+                records = self._drop_duplicates(
+                    records, report, user_id, existing, seen, inserted_fingerprints
+                )
+            if not records:
+                continue
+            # 打分、写入和计入统计与页面线程的写入互斥，
+            # 中途退出或切换用户时停止，不把本批计入其他用户的统计
+            with self.state._lock:
+                if not self._is_current_user(user_id):
+                    raise RuntimeError("导入期间用户已退出登录，已中止")
+                # 先用计入本批之前的统计一次性为整批打分
+                self._flag_anomalies(records, report)
+                if report.dry_run:
+                    report.imported += len(records)
+                    continue
+                inserted = self.state.db.insert_records(records)
+                if inserted != len(records):
+                    raise RuntimeError("写入数据库失败")
+                # 增量计入预算、分类统计和内存记录，不重新读取全部历史
+                self.state.add_imported_records(records)
+            inserted_fingerprints.update(record.fingerprint for record in records)
+            report.imported += inserted
+
+    def _flag_anomalies(self, records: List[Record], report: ImportReport):
+        """记录一批中相对分类历史金额异常的支出"""
+        flags = self.state.anomaly_detector.flag_batch(records)
+        flagged = [record for record, flag in zip(records, flags, strict=True) if flag]
+        report.anomalies += len(flagged)
+        room = MAX_REPORTED_ANOMALIES - len(report.anomaly_records)
+        report.anomaly_records.extend(flagged[: max(room, 0)])
+
+    def _drop_duplicates(
+        self,
+        records: List[Record],
+        report: ImportReport,
+        user_id: int,
+        existing: Dict[str, int],
+        seen: Dict[str, int],
+        inserted_fingerprints: set,
+    ) -> List[Record]:
+        """去掉一批记录中的重复和疑似重复，report 随之更新
+
+        每批用一次指纹查询和一次日期区间查询完成比对。同一指纹在文件中第 k 次出现时，
+        若导入前已有不少于 k 条相同记录则视为重复，因此账单中确实发生多次的同样交易
+        不会被误删。
+        """
+        fingerprints = [record.fingerprint for record in records]
+
+        # 只查询之前批次没有查过的指纹，之后批次写入的记录不影响已缓存的次数
+        unknown = {fp for fp in fingerprints if fp not in existing}
+        if unknown:
+            existing.update(dict.fromkeys(unknown, 0))
+            existing.update(self.state.db.count_fingerprints(user_id, list(unknown)))
+
+        days = [record.date.strftime("%Y-%m-%d") for record in records]
+        # 同日同金额同类型的已有记录指纹（不含本次导入写入的记录）
+        loose: Dict[tuple, set] = {}
+        for row in self.state.db.get_record_keys(user_id, min(days), max(days)):
+            if row["fingerprint"] in inserted_fingerprints:
+                continue
+            key = (row["day"], round(row["amount"] * 100), row["record_type"])
+            loose.setdefault(key, set()).add(row["fingerprint"])
+
+        result = []
+        for record, fp, day in zip(records, fingerprints, days, strict=True):
+            seen[fp] = seen.get(fp, 0) + 1
+            similar = loose.get((day, round(record.amount * 100), record.record_type))
+            if seen[fp] <= existing[fp]:
+                report.duplicates += 1
+            elif similar and similar - {fp}:
+                report.conflicts += 1
+            else:
+                result.append(record)
+        return result
+
+    @staticmethod
+    def _batches(rows: Iterable) -> Iterator[List]:
+        """将行流切分为固定大小的批次"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @classmethod
+    def _validate_batch(
+        cls,
+        rows: List[Dict],
+        user_id: int,
+        ids_by_name: Dict[str, int],
+        known_ids: set,
+    ) -> List[Record]:
+        """校验一批行，返回有效的记录
+
+        同一批中重复出现的日期文本只解析一次（账单中同一天往往有多笔记录）。
+        """
+        dates: Dict = {}
+        records = []
+        for row in rows:
+            record = cls._parse_row(row, user_id, ids_by_name, known_ids, dates)
+            if record is not None:
+                records.append(record)
+        return records
+
+    @staticmethod
+    def _parse_row(
+        row: Dict,
+        user_id: int,
+        ids_by_name: Dict[str, int],
+        known_ids: set,
+        dates: Dict,
+    ) -> Optional[Record]:
+        """解析一行，字段无效时返回None"""
+        record_type = row.get("record_type")
+        if record_type not in ("income", "expense"):
+            return None
+
+        try:
+            amount = float(row.get("amount") or "")
+        except (ValueError, TypeError):
+            return None
+        if not 0 < amount < float("inf"):
+            return None
+
+        value = row.get("date")
+        if isinstance(value, datetime):
+            date = value
+        else:
+            date = dates.get(value)
+            if date is None:
+                try:
+                    date = datetime.fromisoformat(value or "")
+                except (ValueError, TypeError):
+                    return None
+                dates[value] = date
+
+        category_id = ids_by_name.get(row.get("category_name") or "")
+        if category_id is None:
+            try:
+                category_id = int(row.get("category_id") or "")
+            except (ValueError, TypeError):
+                return None
+            if category_id not in known_ids:
+                return None
+
+        return Record(
+            amount=amount,
+            date=date,
+            record_type=record_type,
+            note=row.get("note") or "",
+            category_id=category_id,
+            user_id=user_id,
+        )
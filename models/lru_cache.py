@@ -0,0 +1,47 @@
+"""
+Bounded LRU cache, used to reuse built card controls
+"""
+
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class LRUCache(Generic[T]):
+    """
+    容量有限的最近最少使用缓存
+
+    超出容量时淘汰最久未使用的条目。用于缓存记录卡片控件，
+    键中包含记录的更新时间，记录修改后自然失效。
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, T]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """读取缓存条目，不存在时调用factory创建并放入缓存"""
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+        self.misses += 1
+        value = factory()
+        self._items[key] = value
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        """清空缓存"""
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
@@ -2,11 +2,32 @@
 Record class in FinanceBook
 """
 
+import hashlib
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
 
+def normalize_note(note: Optional[str]) -> str:
+    """规范化备注：合并空白并忽略大小写"""
+    return " ".join((note or "").casefold().split())
+
+
+def content_fingerprint(date_value, amount, record_type: str, note: Optional[str]) -> str:
+    """
+    由日期（不含时间）、金额、类型和规范化备注计算内容指纹
+
+    date_value 可以是 datetime 或数据库中保存的日期文本，
+    数据库也以同名SQL函数调用它。
+    """
+    if hasattr(date_value, "strftime"):
+        day = date_value.strftime("%Y-%m-%d")
+    else:
+        day = str(date_value)[:10]
+    key = f"{day}|{float(amount):.2f}|{record_type}|{normalize_note(note)}"
+    return hashlib.sha1(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
 @dataclass
 class Record:
     record_id: Optional[int] = None
@@ -23,6 +44,11 @@ class Record:
         if self.date is None:
             self.date = datetime.now()
 
+    @property
+    def fingerprint(self) -> str:
+        """内容指纹，用于导入去重"""
+        return content_fingerprint(self.date, self.amount, self.record_type, self.note)
+
     def to_dict(self) -> dict:
         """转换为字典"""
         return {
@@ -0,0 +1,144 @@
+"""
+Record filter engine with incremental narrowing
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, FrozenSet, Hashable, List, Optional, Tuple
+
+from models.record import Record
+
+# 只记住不超过这么多条的完整结果，用于内存中细化
+MAX_REMEMBERED_RESULTS = 2000
+
+
+@dataclass(frozen=True)
+class FilterCriteria:
+    record_type: str = "all"  # 'all', 'income' or 'expense'
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    search_text: str = ""
+    category_ids: Optional[FrozenSet[int]] = None  # None 表示全部分类
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        """规范化后的搜索文本"""
+        return self.search_text.strip().lower()
+
+    def is_refinement_of(self, other: "FilterCriteria") -> bool:
+        """当前条件的结果是否必然是 other 结果的子集"""
+        if other.record_type != "all" and other.record_type != self.record_type:
+            return False
+        if other.start_date is not None and (
+            self.start_date is None or self.start_date < other.start_date
+        ):
+            return False
+        if other.end_date is not None and (
+            self.end_date is None or self.end_date > other.end_date
+        ):
+            return False
+        if other.category_ids is not None and (
+            self.category_ids is None or not self.category_ids <= other.category_ids
+        ):
+            return False
+        if other.min_amount is not None and (
+            self.min_amount is None or self.min_amount < other.min_amount
+        ):
+            return False
+        if other.max_amount is not None and (
+            self.max_amount is None or self.max_amount > other.max_amount
+        ):
+            return False
+        # 子串匹配：包含较长文本的记录一定包含其中的较短文本
+        return other.text in self.text
+
+    def matches_fields(self, record: Record) -> bool:
+        """按类型、分类、金额和日期范围判断记录是否符合条件"""
+        if self.record_type != "all" and record.record_type != self.record_type:
+            return False
+        if self.category_ids is not None and record.category_id not in self.category_ids:
+            return False
+        if self.min_amount is not None and record.amount < self.min_amount:
+            return False
+        if self.max_amount is not None and record.amount > self.max_amount:
+            return False
+        if self.start_date is None and self.end_date is None:
+            return True
+        record_date = record.date.date()
+        if self.start_date is not None and record_date < self.start_date:
+            return False
+        if self.end_date is not None and record_date > self.end_date:
+            return False
+        return True
+
+
+class RecordFilterEngine:
+    """
+    记录筛选引擎
+
+    筛选本身由数据库查询完成。上一次的结果已完整读入内存且数量不大时，
+    引擎会记住它：新条件是上一次的细化时（更长的搜索词、更窄的类型、
+    时间段、分类或金额范围），直接在内存中继续筛选，不再查询数据库。
+    """
+
+    def __init__(
+        self,
+        category_name: Callable[[int], str],
+        max_results: int = MAX_REMEMBERED_RESULTS,
+    ):
+        self.category_name = category_name
+        self.max_results = max_results
+        # (数据源标识, 条件, 结果) 作为整体替换，保证三者一致
+        self._last: Optional[Tuple[Hashable, FilterCriteria, List[Record]]] = None
+
+    def reset(self):
+        """清空记住的结果"""
+        self._last = None
+
+    def matches_text(self, record: Record, text: str) -> bool:
+        """在内存中按金额、备注和分类名称做子串匹配"""
+        return (
+            text in str(record.amount)
+            or text in (record.note or "").lower()
+            or text in self.category_name(record.category_id).lower()
+        )
+
+    def remember(
+        self, source_key: Hashable, criteria: FilterCriteria, records: List[Record]
+    ):
+        """记住一次完整的筛选结果，结果过多时不记住"""
+        if len(records) <= self.max_results:
+            self._last = (source_key, criteria, list(records))
+        else:
+            self._last = None
+
+    def narrow(
+        self, criteria: FilterCriteria, source_key: Hashable
+    ) -> Optional[List[Record]]:
+        """
+        尝试在上一次结果中细化
+
+        Args:
+            criteria (FilterCriteria): 新的筛选条件
+            source_key (Hashable): 数据源标识（如用户ID和数据版本），变化后不再复用旧结果
+
+        Returns:
+            Optional[List[Record]]: 细化后的结果（保持原顺序）；无法细化时返回None
+        """
+        last = self._last
+        if last is None or last[0] != source_key or not criteria.is_refinement_of(last[1]):
+            return None
+        if criteria == last[1]:
+            return list(last[2])
+
+        text = criteria.text
+        result = [
+            record
+            for record in last[2]
+            if criteria.matches_fields(record)
+            and (not text or self.matches_text(record, text))
+        ]
+        self._last = (source_key, criteria, result)
+        return list(result)
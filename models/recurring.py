@@ -0,0 +1,358 @@
+"""
+Recurring transaction detection and scheduling
+"""
+
+import calendar
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import pairwise
+from statistics import median
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models.record import Record
+
+# 周期名称及对应的大致天数范围
+FREQUENCIES = {
+    "weekly": (6, 8),
+    "monthly": (27, 32),
+    "yearly": (360, 370),
+}
+FREQUENCY_LABELS = {"weekly": "每周", "monthly": "每月", "yearly": "每年"}
+
+# 检测时的内存上限：每组只保留最近的日期，分组数也有上限
+MAX_DATES_PER_GROUP = 13
+MAX_GROUPS = 5000
+MIN_OCCURRENCES = 3
+# 补生成时每条规则最多生成的记录数
+MAX_CATCH_UP = 366
+
+
+def fingerprint_note(note: str) -> str:
+    """备注指纹：去掉数字、标点和多余空白并转小写"""
+    text = re.sub(r"[\d\W_]+", " ", (note or "").lower())
+    return " ".join(text.split())
+
+
+def to_date(value) -> date:
+    """将 datetime/date/字符串统一转换为 date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def advance_date(current: date, frequency: str, anchor_day: Optional[int] = None) -> date:
+    """计算下一次发生日期，按月/按年时保持锚定日（月末自动截断）"""
+    if frequency == "weekly":
+        return current + timedelta(days=7)
+
+    day = anchor_day or current.day
+    if frequency == "monthly":
+        year, month = (current.year + 1, 1) if current.month == 12 else (current.year, current.month + 1)
+    else:
+        year, month = current.year + 1, current.month
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+@dataclass
+class RecurringRule:
+    rule_id: Optional[int] = None
+    user_id: int = 0
+    category_id: int = 0
+    record_type: str = "expense"
+    amount: float = 0.0
+    note: str = ""
+    frequency: str = "monthly"  # 'weekly', 'monthly' or 'yearly'
+    anchor_day: Optional[int] = None
+    next_date: Optional[date] = None
+    is_active: bool = True
+    occurrences: int = 0  # 检测时找到的历史次数，不入库
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "rule_id": self.rule_id,
+            "user_id": self.user_id,
+            "category_id": self.category_id,
+            "record_type": self.record_type,
+            "amount": self.amount,
+            "note": self.note,
+            "frequency": self.frequency,
+            "anchor_day": self.anchor_day,
+            "next_date": self.next_date.isoformat() if self.next_date else None,
+            "is_active": self.is_active,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecurringRule":
+        """从字典创建规则对象"""
+        return cls(
+            rule_id=data.get("rule_id"),
+            user_id=data.get("user_id", 0),
+            category_id=data.get("category_id", 0),
+            record_type=data.get("record_type", "expense"),
+            amount=float(data.get("amount") or 0.0),
+            note=data.get("note") or "",
+            frequency=data.get("frequency", "monthly"),
+            anchor_day=data.get("anchor_day"),
+            next_date=to_date(data["next_date"]) if data.get("next_date") else None,
+            is_active=bool(data.get("is_active", True)),
+        )
+
+    @property
+    def key(self) -> Tuple:
+        """用于与检测结果去重的分组键"""
+        return (
+            self.category_id,
+            self.record_type,
+            fingerprint_note(self.note),
+            round(self.amount, 2),
+        )
+
+    def make_record(self, on_date: date) -> Record:
+        """生成某一天的记录"""
+        return Record(
+            amount=self.amount,
+            date=datetime.combine(on_date, datetime.min.time()),
+            record_type=self.record_type,
+            note=self.note,
+            category_id=self.category_id,
+            user_id=self.user_id,
+        )
+
+
+class RecurringDetector:
+    """
+    定期交易检测器
+
+    按日期升序流式扫描一次历史记录，按 (分类, 类型, 备注指纹, 金额) 分组，
+    每组只保留最近若干个日期，据此判断是否存在稳定周期。
+    """
+
+    def __init__(self, max_groups: int = MAX_GROUPS):
+        self.max_groups = max_groups
+
+    def detect(
+        self,
+        records: Iterable[Record],
+        today: Optional[date] = None,
+        existing_rules: Optional[List[RecurringRule]] = None,
+    ) -> List[RecurringRule]:
+        """
+        检测定期交易
+
+        Args:
+            records (Iterable[Record]): 按日期升序排列的记录流
+            today (Optional[date]): 基准日期
+            existing_rules (Optional[List[RecurringRule]]): 已有规则，检测结果中会排除
+
+        Returns:
+            List[RecurringRule]: 建议的规则（未保存）
+        """
+        today = today or datetime.now().date()
+        known = {rule.key for rule in existing_rules or []}
+        groups: Dict[Tuple, deque] = {}
+        counts: Dict[Tuple, int] = {}
+        samples: Dict[Tuple, Record] = {}
+
+        for record in records:
+            key = (
+                record.category_id,
+                record.record_type,
+                fingerprint_note(record.note),
+                round(record.amount, 2),
+            )
+            if key not in groups:
+                if len(groups) >= self.max_groups:
+                    continue
+                groups[key] = deque(maxlen=MAX_DATES_PER_GROUP)
+                counts[key] = 0
+            groups[key].append(to_date(record.date))
+            counts[key] += 1
+            samples[key] = record
+
+        proposals = []
+        for key, dates in groups.items():
+            if key in known or len(dates) < MIN_OCCURRENCES:
+                continue
+            frequency = self.classify_period(list(dates))
+            if not frequency:
+                continue
+
+            _, high = FREQUENCIES[frequency]
+            last_date = dates[-1]
+            # 最后一次发生距今超过 1.5 个周期，视为已停止
+            if (today - last_date).days > high * 1.5:
+                continue
+
+            sample = samples[key]
+            anchor_day = None if frequency == "weekly" else last_date.day
+            next_date = advance_date(last_date, frequency, anchor_day)
+            proposals.append(
+                RecurringRule(
+                    user_id=sample.user_id,
+                    category_id=sample.category_id,
+                    record_type=sample.record_type,
+                    amount=round(sample.amount, 2),
+                    note=sample.note,
+                    frequency=frequency,
+                    anchor_day=anchor_day,
+                    next_date=next_date,
+                    occurrences=counts[key],
+                )
+            )
+
+        proposals.sort(key=lambda rule: rule.occurrences, reverse=True)
+        return proposals
+
+    @staticmethod
+    def classify_period(dates: List[date]) -> Optional[str]:
+        """根据相邻日期间隔判断周期"""
+        gaps = [(b - a).days for a, b in pairwise(dates) if (b - a).days > 0]
+        if len(gaps) < MIN_OCCURRENCES - 1:
+            return None
+
+        typical = median(gaps)
+        for frequency, (low, high) in FREQUENCIES.items():
+            if low <= typical <= high:
+                regular = sum(1 for gap in gaps if low <= gap <= high)
+                if regular / len(gaps) >= 0.75:
+                    return frequency
+        return None
+
+    def detect_async(
+        self,
+        db,
+        user_id: int,
+        callback: Callable[[List[RecurringRule]], None],
+    ) -> threading.Thread:
+        """在后台线程中流式读取记录并检测，完成后调用callback"""
+
+        def worker():
+            try:
+                proposals = self.detect(
+                    db.iter_records(user_id, order_by="date ASC"),
+                    existing_rules=db.get_recurring_rules(user_id, active_only=False),
+                )
+            except Exception as e:
+                print(f"定期交易检测失败: {e}")
+                proposals = []
+            callback(proposals)
+
+        thread = threading.Thread(target=worker, name="recurring-detect", daemon=True)
+        thread.start()
+        return thread
+
+
+class RecurringScheduler:
+    """定期交易调度器：批量生成到期记录"""
+
+    def __init__(self, db, interval_seconds: float = 3600):
+        self.db = db
+        self.interval_seconds = interval_seconds
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # 每次 start()/stop() 递增，过期的定时回调据此放弃续期
+        self._generation = 0
+        self._timer_lock = threading.Lock()
+
+    @staticmethod
+    def collect_due(
+        rules: List[RecurringRule], today: date
+    ) -> Tuple[List[Record], Dict[int, date]]:
+        """
+        计算截至今天所有到期的记录
+
+        Returns:
+            (待插入的记录, 规则ID到新的下次日期的映射)
+        """
+        records = []
+        next_dates = {}
+        for rule in rules:
+            if not rule.is_active or rule.next_date is None:
+                continue
+            current = rule.next_date
+            generated = 0
+            while current <= today and generated < MAX_CATCH_UP:
+                records.append(rule.make_record(current))
+                current = advance_date(current, rule.frequency, rule.anchor_day)
+                generated += 1
+            if generated:
+                next_dates[rule.rule_id] = current
+        return records, next_dates
+
+    def run_due(
+        self,
+        user_id: int,
+        today: Optional[date] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> List[Record]:
+        """为用户生成所有到期记录（一次批量插入），is_cancelled 返回True时不生成"""
+        today = today or datetime.now().date()
+        with self._lock:
+            if is_cancelled and is_cancelled():
+                return []
+            rules = self.db.get_recurring_rules(user_id)
+            records, next_dates = self.collect_due(rules, today)
+            if not records:
+                return []
+            if not self.db.apply_recurring_schedule(records, next_dates):
+                return []
+            return records
+
+    def start(
+        self,
+        user_id: int,
+        on_generated: Optional[Callable[[int, List[Record]], None]] = None,
+    ):
+        """启动定时器，定期检查到期规则"""
+        with self._timer_lock:
+            self._cancel_timer()
+            self._generation += 1
+            self._arm(self._generation, user_id, on_generated)
+
+    def _arm(
+        self,
+        generation: int,
+        user_id: int,
+        on_generated: Optional[Callable[[int, List[Record]], None]],
+    ):
+        """安排下一次检查；调用方需持有 _timer_lock"""
+
+        def tick():
+            records = self.run_due(
+                user_id, is_cancelled=lambda: generation != self._generation
+            )
+            if records and on_generated:
+                on_generated(user_id, records)
+            # 执行期间调用过 stop() 或重新 start() 时不再续期，避免遗留定时器
+            with self._timer_lock:
+                if generation == self._generation:
+                    self._arm(generation, user_id, on_generated)
+
+        self._timer = threading.Timer(self.interval_seconds, tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def stop(self, wait: bool = False):
+        """停止定时器；正在执行的检查结束后也不会再续期
+
+        Args:
+            wait: 是否等待正在进行的生成写入完成
+        """
+        with self._timer_lock:
+            self._generation += 1
+            self._cancel_timer()
+        if wait:
+            # 生成在 _lock 内写入，停止后开始的检查会放弃生成
+            with self._lock:
+                pass
@@ -0,0 +1,449 @@
+"""
+PDF report generation with cached chart rendering
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from models.database import DatabaseManager
+from models.record import Record
+from models.record_filter import FilterCriteria
+
+try:
+    from matplotlib import rc_context
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.platypus import (
+        Image,
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+# 报表中列出的最大支出笔数
+TOP_TRANSACTIONS = 10
+# 饼图最多显示的分类数，其余合并为“其他”
+PIE_MAX_SLICES = 6
+CHART_DPI = 150
+# ReportLab 内置的中文字体，无需字体文件
+PDF_FONT = "STSong-Light"
+# 图表字体按顺序回退，保证各平台都能显示中文
+CHART_FONTS = [
+    "Microsoft YaHei",
+    "SimHei",
+    "PingFang SC",
+    "Noto Sans CJK SC",
+    "WenQuanYi Micro Hei",
+    "DejaVu Sans",
+]
+INCOME_COLOR = "#43A047"
+EXPENSE_COLOR = "#E53935"
+
+
+def parse_period(period: str) -> Tuple[date, date]:
+    """
+    解析报表期间
+
+    Args:
+        period (str): "YYYY-MM" 表示月报，"YYYY" 表示年报
+
+    Returns:
+        (开始日期, 结束日期)，均包含
+    """
+    try:
+        if len(period) == 4:
+            year = int(period)
+            return date(year, 1, 1), date(year, 12, 31)
+        if len(period) == 7 and period[4] == "-":
+            start = date(int(period[:4]), int(period[5:]), 1)
+            next_month = (start + timedelta(days=32)).replace(day=1)
+            return start, next_month - timedelta(days=1)
+    except ValueError:
+        pass
+    raise ValueError(f"无效的报表期间: {period}")
+
+
+def periods_of_year(year: int) -> List[str]:
+    """年终批量生成的期间：12个月报和1个年报"""
+    return [f"{year:04d}-{month:02d}" for month in range(1, 13)] + [f"{year:04d}"]
+
+
+@dataclass
+class ReportData:
+    period: str
+    start: date
+    end: date
+    income: float = 0.0
+    expense: float = 0.0
+    # 按金额降序的支出分类 (分类名称, 金额)
+    categories: List[Tuple[str, float]] = field(default_factory=list)
+    # 月报按天、年报按月的 (标签, 收入, 支出)
+    trend: List[Tuple[str, float, float]] = field(default_factory=list)
+    top: List[Tuple[Record, str]] = field(default_factory=list)
+
+    @property
+    def is_annual(self) -> bool:
+        return len(self.period) == 4
+
+    @property
+    def balance(self) -> float:
+        return self.income - self.expense
+
+    @property
+    def daily_expense(self) -> float:
+        """日均支出（期间包含今天时只按已过去的天数计算）"""
+        today = date.today()
+        end = min(self.end, today) if self.start <= today else self.end
+        return self.expense / ((end - self.start).days + 1)
+
+    @property
+    def data_version(self) -> str:
+        """图表数据的版本：由图表用到的汇总值计算，数据不变时版本不变"""
+        payload = json.dumps(
+            [self.categories, self.trend], ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha1(payload.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
+
+
+def collect_report_data(db, user_id: int, period: str) -> ReportData:
+    """
+    读取报表所需的汇总数据
+
+    收支合计、分类占比和趋势都由一次按天/类型/分类的汇总查询得到，
+    支出排行另用一次按金额排序的分页查询。
+    """
+    start, end = parse_period(period)
+    data = ReportData(period=period, start=start, end=end)
+    names = {cat.category_id: cat.name for cat in db.get_categories(active_only=False)}
+
+    if data.is_annual:
+        labels = [f"{month}月" for month in range(1, 13)]
+    else:
+        labels = [str(day) for day in range(1, end.day + 1)]
+    trend = {label: [0.0, 0.0] for label in labels}
+    by_category: Dict[str, float] = {}
+
+    for row in db.get_daily_category_totals(user_id, start.isoformat(), end.isoformat()):
+        total = float(row["total"] or 0)
+        day = date.fromisoformat(row["day"])
+        label = f"{day.month}月" if data.is_annual else str(day.day)
+        if row["record_type"] == "income":
+            data.income += total
+            trend[label][0] += total
+        elif row["record_type"] == "expense":
+            data.expense += total
+            trend[label][1] += total
+            name = names.get(row["category_id"], "未知")
+            by_category[name] = by_category.get(name, 0.0) + total
+
+    data.trend = [(label, round(i, 2), round(e, 2)) for label, (i, e) in trend.items()]
+    data.categories = sorted(
+        ((name, round(total, 2)) for name, total in by_category.items()),
+        key=lambda item: (-item[1], item[0]),
+    )
+    criteria = FilterCriteria(record_type="expense", start_date=start, end_date=end)
+    data.top = [
+        (record, names.get(record.category_id, "未知"))
+        for record in db.query_records(
+            user_id, criteria, limit=TOP_TRANSACTIONS, order_by="amount DESC"
+        )
+    ]
+    return data
+
+
+class ChartCache:
+    """
+    图表图片的磁盘缓存
+
+    键为 (用户, 期间, 数据版本)，数据变化后版本改变，旧图片在生成新图片时删除。
+    缓存在磁盘上，进程池中的各个进程可以共享。
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(
+        self,
+        user_id: int,
+        period: str,
+        data_version: str,
+        chart: str,
+        render: Callable[[Path], None],
+    ) -> Path:
+        """读取缓存的图片，不存在时调用 render 生成"""
+        path = self.directory / f"{user_id}_{period}_{data_version}_{chart}.png"
+        if path.exists():
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        for stale in self.directory.glob(f"{user_id}_{period}_*_{chart}.png"):
+            stale.unlink(missing_ok=True)
+        # 先写临时文件再改名，其他进程不会读到写了一半的图片
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.png")
+        try:
+            render(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return path
+
+
+def _save_figure(fig, path: Path):
+    """用 Agg 画布（无界面）保存图片"""
+    FigureCanvasAgg(fig)
+    fig.savefig(path, format="png", dpi=CHART_DPI)
+
+
+def render_category_pie(data: ReportData, path: Path):
+    """绘制支出分类饼图"""
+    with rc_context({"font.sans-serif": CHART_FONTS, "axes.unicode_minus": False}):
+        fig = Figure(figsize=(7, 2.6))
+        ax = fig.add_subplot()
+        slices = data.categories[:PIE_MAX_SLICES]
+        rest = sum(total for _, total in data.categories[PIE_MAX_SLICES:])
+        if rest > 0:
+            slices.append(("其他", rest))
+        if slices:
+            wedges, _, _ = ax.pie(
+                [total for _, total in slices],
+                autopct="%1.1f%%",
+                pctdistance=0.75,
+                startangle=90,
+                counterclock=False,
+            )
+            ax.legend(
+                wedges,
+                [f"{name}  ¥{total:,.2f}" for name, total in slices],
+                loc="center left",
+                bbox_to_anchor=(1, 0.5),
+                frameon=False,
+            )
+            ax.axis("equal")
+        else:
+            ax.text(0.5, 0.5, "本期没有支出", ha="center", va="center")
+            ax.axis("off")
+        ax.set_title("支出分类")
+        fig.tight_layout()
+        _save_figure(fig, path)
+
+
+def render_trend_chart(data: ReportData, path: Path):
+    """绘制收支趋势柱状图（月报按天，年报按月）"""
+    with rc_context({"font.sans-serif": CHART_FONTS, "axes.unicode_minus": False}):
+        fig = Figure(figsize=(7, 2.6))
+        ax = fig.add_subplot()
+        positions = range(len(data.trend))
+        width = 0.4
+        ax.bar(
+            [p - width / 2 for p in positions],
+            [income for _, income, _ in data.trend],
+            width,
+            label="收入",
+            color=INCOME_COLOR,
+        )
+        ax.bar(
+            [p + width / 2 for p in positions],
+            [expense for _, _, expense in data.trend],
+            width,
+            label="支出",
+            color=EXPENSE_COLOR,
+        )
+        step = 1 if data.is_annual else 5
+        ax.set_xticks(list(positions)[::step])
+        ax.set_xticklabels([label for label, _, _ in data.trend][::step])
+        ax.set_title("收支趋势")
+        # 上方留出图例的位置，避免遮挡柱子
+        ax.set_ylim(0, max([1.0] + [max(i, e) for _, i, e in data.trend]) * 1.25)
+        ax.legend(loc="upper right", ncol=2, frameon=False)
+        fig.tight_layout()
+        _save_figure(fig, path)
+
+
+def _register_pdf_font():
+    """注册中文字体（重复调用无副作用）"""
+    if PDF_FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT))
+
+
+def write_pdf_report(
+    data: ReportData,
+    filepath,
+    pie_path: Path,
+    trend_path: Path,
+    username: str = "",
+):
+    """将汇总数据和图表写入PDF：摘要卡片、分类饼图、趋势图和支出排行"""
+    _register_pdf_font()
+    title_style = ParagraphStyle("title", fontName=PDF_FONT, fontSize=18, leading=24)
+    text_style = ParagraphStyle("text", fontName=PDF_FONT, fontSize=10, leading=14)
+    heading_style = ParagraphStyle("heading", fontName=PDF_FONT, fontSize=13, leading=20)
+
+    if data.is_annual:
+        title = f"{data.start.year}年度财务报告"
+    else:
+        title = f"{data.start.year}年{data.start.month}月财务报告"
+    story = [
+        Paragraph(title, title_style),
+        Paragraph(
+            f"{username}  {data.start.isoformat()} 至 {data.end.isoformat()}", text_style
+        ),
+        Spacer(1, 6 * mm),
+    ]
+
+    cards = Table(
+        [
+            ["总收入", "总支出", "结余", "日均支出"],
+            [
+                f"¥{data.income:,.2f}",
+                f"¥{data.expense:,.2f}",
+                f"¥{data.balance:,.2f}",
+                f"¥{data.daily_expense:,.2f}",
+            ],
+        ],
+        colWidths=[42 * mm] * 4,
+    )
+    cards.setStyle(
+        TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, -1), PDF_FONT),
+                ("FONTSIZE", (0, 0), (-1, 0), 10),
+                ("FONTSIZE", (0, 1), (-1, 1), 14),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 1), (0, 1), colors.HexColor(INCOME_COLOR)),
+                ("TEXTCOLOR", (1, 1), (1, 1), colors.HexColor(EXPENSE_COLOR)),
+                ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor("#F5F5F5")),
+                ("BOX", (0, 0), (0, -1), 0.5, colors.lightgrey),
+                ("BOX", (1, 0), (1, -1), 0.5, colors.lightgrey),
+                ("BOX", (2, 0), (2, -1), 0.5, colors.lightgrey),
+                ("BOX", (3, 0), (3, -1), 0.5, colors.lightgrey),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("TOPPADDING", (0, 0), (-1, -1), 6),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ]
+        )
+    )
+    story += [cards, Spacer(1, 6 * mm)]
+
+    story += [
+        Image(str(pie_path), width=168 * mm, height=62.4 * mm),
+        Image(str(trend_path), width=168 * mm, height=62.4 * mm),
+        Spacer(1, 4 * mm),
+        Paragraph(f"支出排行（前 {TOP_TRANSACTIONS} 笔）", heading_style),
+    ]
+
+    rows = [["日期", "分类", "备注", "金额"]]
+    for record, category_name in data.top:
+        rows.append(
+            [
+                record.date.strftime("%Y-%m-%d"),
+                category_name,
+                Paragraph(record.note or "", text_style),
+                f"¥{record.amount:,.2f}",
+            ]
+        )
+    if len(rows) == 1:
+        rows.append(["", "", "本期没有支出", ""])
+    table = Table(rows, colWidths=[28 * mm, 30 * mm, 80 * mm, 30 * mm], repeatRows=1)
+    table.setStyle(
+        TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, -1), PDF_FONT),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4472C4")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("ALIGN", (3, 0), (3, -1), "RIGHT"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+            ]
+        )
+    )
+    story.append(table)
+
+    doc = SimpleDocTemplate(
+        str(filepath),
+        pagesize=A4,
+        title=title,
+        leftMargin=18 * mm,
+        rightMargin=18 * mm,
+        topMargin=16 * mm,
+        bottomMargin=16 * mm,
+    )
+    doc.build(story)
+
+
+def generate_pdf_report(
+    db,
+    user_id: int,
+    period: str,
+    filepath,
+    cache: ChartCache,
+    username: str = "",
+):
+    """生成一个期间的PDF报表，图表优先取自缓存"""
+    data = collect_report_data(db, user_id, period)
+    version = data.data_version
+    pie_path = cache.get_or_render(
+        user_id, period, version, "pie", lambda path: render_category_pie(data, path)
+    )
+    trend_path = cache.get_or_render(
+        user_id, period, version, "trend", lambda path: render_trend_chart(data, path)
+    )
+    write_pdf_report(data, filepath, pie_path, trend_path, username)
+
+
+def build_report_file(
+    db_path: str,
+    user_id: int,
+    period: str,
+    filepath: str,
+    cache_dir: str,
+    username: str = "",
+) -> tuple[bool, str]:
+    """
+    在独立进程中生成一个期间的报表（供进程池调用，参数均可序列化）
+
+    先写入临时文件，完成后原子替换为目标文件。
+
+    Returns:
+        (成功标志, 文件路径或错误信息)
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(f".{filepath.name}.part")
+    try:
+        # 数据库已由主进程初始化，工作进程只读取，不再执行建表和迁移
+        db = DatabaseManager(db_path, initialize=False)
+        generate_pdf_report(
+            db, user_id, period, tmp_path, ChartCache(cache_dir), username
+        )
+        os.replace(tmp_path, filepath)
+        return True, str(filepath)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        return False, f"{period} 报表生成失败: {str(e)}"
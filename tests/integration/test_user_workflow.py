@@ -14,6 +14,8 @@ from models.database import DatabaseManager
 from models.record import Record
 from models.user import User
 from models.category import Category
+from models.budget import Budget
+from models.recurring import RecurringRule
 from datetime import datetime, timedelta
 
 
@@ -390,6 +392,100 @@ class TestStateManagement:
         assert len(state.records) == 1
         assert state.records[0].record_id == record2.record_id
 
+    def test_single_writes_update_records_in_place(self, integrated_system):
+        """测试单条增删改只同步变更的记录，不重新读取全部历史"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="in_place_user",
+            password_hash="hash",
+            email="in_place@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+        category_id = state.categories[0].category_id
+
+        full_reads = []
+        get_records = db.get_records
+        db.get_records = lambda *args, **kwargs: full_reads.append(args) or get_records(*args, **kwargs)
+
+        older = Record(
+            amount=10.00,
+            date=datetime.now() - timedelta(days=2),
+            record_type="expense",
+            category_id=category_id,
+            user_id=user.user_id
+        )
+        newer = Record(
+            amount=20.00,
+            date=datetime.now(),
+            record_type="expense",
+            category_id=category_id,
+            user_id=user.user_id
+        )
+        assert state.add_record(older)
+        assert state.add_record(newer)
+        assert [r.record_id for r in state.records] == [newer.record_id, older.record_id]
+        assert state.records[0].created_at is not None
+
+        older.amount = 15.00
+        version = state.data_version
+        assert state.update_record(older)
+        assert state.data_version == version + 1
+        assert [r.amount for r in state.records] == [20.00, 15.00]
+
+        assert state.delete_record(newer.record_id)
+        assert [r.record_id for r in state.records] == [older.record_id]
+        assert full_reads == []
+
+    def test_recurring_sync_keeps_date_order(self, integrated_system):
+        """测试定期交易生成和乱序写入后内存记录仍按日期降序，且不重新读取全部历史"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="ordered_user",
+            password_hash="hash",
+            email="ordered@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+        category_id = state.categories[0].category_id
+
+        full_reads = []
+        get_records = db.get_records
+        db.get_records = lambda *args, **kwargs: full_reads.append(args) or get_records(*args, **kwargs)
+
+        now = datetime.now()
+        for days in (3, 30, 1, 12, 7):
+            assert state.add_record(Record(
+                amount=float(days),
+                date=now - timedelta(days=days),
+                record_type="expense",
+                category_id=category_id,
+                user_id=user.user_id
+            ))
+        rule = RecurringRule(
+            category_id=category_id,
+            record_type="expense",
+            amount=5.00,
+            frequency="weekly",
+            next_date=(now - timedelta(days=20)).date(),
+        )
+        assert state.save_recurring_rule(rule)
+        middle = state.records[len(state.records) // 2]
+        middle.amount = 99.00
+        assert state.update_record(middle)
+
+        assert full_reads == []
+        assert [r.date for r in state.records] == sorted(
+            (r.date for r in state.records), reverse=True
+        )
+        assert sorted(r.record_id for r in state.records) == sorted(
+            r.record_id for r in get_records(user.user_id)
+        )
+
 
 class TestUserSessionManagement:
     """集成测试7：用户会话管理"""
@@ -451,4 +547,242 @@ class TestUserSessionManagement:
         # 切换回用户1
         state.set_current_user(user1)
         assert len(state.records) == 1
-        assert state.records[0].amount == 100.00
\ No newline at end of file
+        assert state.records[0].amount == 100.00
+
+
+class TestBudgetTracking:
+    """集成测试8：预算消耗增量跟踪"""
+
+    def test_budget_consumption_follows_writes(self, integrated_system):
+        """测试记录增删改时预算累计值同步更新"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="budget_user",
+            password_hash="hash",
+            email="budget@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+
+        food_id = state.categories[0].category_id
+        other_id = state.categories[1].category_id
+
+        assert state.save_budget(Budget(user_id=user.user_id, amount=100.00))
+        assert state.save_budget(
+            Budget(user_id=user.user_id, category_id=food_id, amount=50.00)
+        )
+
+        expense = Record(
+            amount=40.00,
+            date=datetime.now(),
+            record_type="expense",
+            note="Lunch",
+            category_id=food_id,
+            user_id=user.user_id
+        )
+        assert state.add_record(expense)
+        assert state.budget_alerts == []
+
+        # 修改金额后分类预算超支
+        expense.amount = 60.00
+        assert state.update_record(expense)
+        alerts = state.budget_alerts
+        assert len(alerts) == 1
+        assert alerts[0].budget.category_id == food_id
+
+        # 改到其他分类后分类预算恢复，总预算不变
+        expense.category_id = other_id
+        assert state.update_record(expense)
+        statuses = {s.budget.category_id: s for s in state.get_budget_statuses()}
+        assert statuses[food_id].spent == 0
+        assert statuses[None].spent == 60.00
+
+        # 收入和上月支出不计入预算
+        state.add_record(Record(
+            amount=500.00,
+            date=datetime.now(),
+            record_type="income",
+            category_id=food_id,
+            user_id=user.user_id
+        ))
+        state.add_record(Record(
+            amount=500.00,
+            date=datetime.now() - timedelta(days=40),
+            record_type="expense",
+            category_id=food_id,
+            user_id=user.user_id
+        ))
+        statuses = {s.budget.category_id: s for s in state.get_budget_statuses()}
+        assert statuses[None].spent == 60.00
+
+        assert state.delete_record(expense.record_id)
+        statuses = {s.budget.category_id: s for s in state.get_budget_statuses()}
+        assert statuses[None].spent == 0
+
+        # 重新登录时由数据库汇总得到相同结果
+        state.set_current_user(user)
+        statuses = {s.budget.category_id: s for s in state.get_budget_statuses()}
+        assert statuses[None].spent == 0
+
+
+class TestExpenseAnomalyDetection:
+    """集成测试9：新增支出的异常提示"""
+
+    def test_unusual_expense_flag_survives_restart(self, integrated_system):
+        """测试异常判断及统计持久化"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="anomaly_user",
+            password_hash="hash",
+            email="anomaly@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+        category_id = state.categories[0].category_id
+
+        for amount in [30.00, 32.00, 28.00, 31.00, 29.00]:
+            state.add_record(Record(
+                amount=amount,
+                date=datetime.now(),
+                record_type="expense",
+                category_id=category_id,
+                user_id=user.user_id
+            ))
+            assert state.last_anomaly is None
+
+        # 模拟重启：新的 AppState 从数据库读取统计
+        restarted = AppState(db, state.page)
+        restarted.set_current_user(user)
+        assert restarted.anomaly_detector.stats[category_id].count == 5
+
+        big = Record(
+            amount=300.00,
+            date=datetime.now(),
+            record_type="expense",
+            category_id=category_id,
+            user_id=user.user_id
+        )
+        assert restarted.add_record(big)
+        assert restarted.last_anomaly is not None
+        assert restarted.last_anomaly.mean == pytest.approx(30.00)
+
+        # 删除后统计回退
+        restarted.delete_record(big.record_id)
+        assert restarted.anomaly_detector.stats[category_id].count == 5
+
+    def test_login_catch_up_counted_once(self, integrated_system):
+        """测试登录时补生成的定期交易只计入一次统计"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="catch_up_user",
+            password_hash="hash",
+            email="catch_up@test.com"
+        )
+        db.save_user(user)
+        category_id = db.get_categories()[0].category_id
+        assert db.save_recurring_rule(RecurringRule(
+            user_id=user.user_id,
+            category_id=category_id,
+            amount=20.00,
+            frequency="weekly",
+            next_date=datetime.now().date() - timedelta(days=21)
+        ))
+
+        # 首次登录时统计为空，需要从数据库播种
+        state.set_current_user(user)
+        assert len(state.records) == 4
+        assert state.anomaly_detector.stats[category_id].count == 4
+        assert db.get_category_stats(user.user_id)[category_id]["count"] == 4
+
+    def test_timer_results_follow_current_user(self, integrated_system):
+        """测试定时生成的记录交给页面线程处理，用户已切换时忽略"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+        state.page.run_thread = lambda handler, *args: handler(*args)
+        state.page.route = "/records"
+
+        user = User(
+            username="timer_user",
+            password_hash="hash",
+            email="timer@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+        record = Record(
+            amount=20.00,
+            date=datetime.now(),
+            record_type="expense",
+            category_id=state.categories[0].category_id,
+            user_id=user.user_id
+        )
+        assert db.insert_records([record]) == 1
+
+        # 其他用户的定时结果不计入当前用户
+        state.on_recurring_generated(user.user_id + 1, [record])
+        assert state.records == []
+        state.page.go.assert_not_called()
+
+        state.on_recurring_generated(user.user_id, [record])
+        assert len(state.records) == 1
+        state.page.go.assert_called_once_with("/records")
+        state.clear_user_data()
+
+
+class TestBulkOperations:
+    """集成测试10：批量修改和删除记录"""
+
+    def test_bulk_update_and_delete(self, integrated_system):
+        """测试批量操作一次完成，并增量同步内存记录和预算"""
+        db = integrated_system['db']
+        state = integrated_system['state']
+
+        user = User(
+            username="bulk_user",
+            password_hash="hash",
+            email="bulk@test.com"
+        )
+        db.save_user(user)
+        state.set_current_user(user)
+
+        food_id = state.categories[0].category_id
+        other_id = state.categories[1].category_id
+        assert state.save_budget(
+            Budget(user_id=user.user_id, category_id=food_id, amount=100.00)
+        )
+
+        records = [
+            Record(
+                amount=30.00,
+                date=datetime.now(),
+                record_type="expense",
+                category_id=other_id,
+                user_id=user.user_id
+            )
+            for _ in range(4)
+        ]
+        assert db.insert_records(records) == 4
+        state.load_user_data()
+        state.load_budgets()
+        ids = [r.record_id for r in state.records]
+
+        version = state.data_version
+        assert state.update_records(ids, category_id=food_id) == 4
+        assert state.data_version == version + 1
+        assert all(r.category_id == food_id for r in state.records)
+        assert [s.budget.category_id for s in state.budget_alerts] == [food_id]
+
+        assert state.delete_records(ids[:2]) == 2
+        assert len(state.records) == 2
+        assert len(db.get_records(user.user_id)) == 2
+        assert state.budget_alerts == []
+        statuses = {s.budget.category_id: s for s in state.get_budget_statuses()}
+        assert statuses[food_id].spent == 60.00
+
+        # 不允许修改的字段不会执行
+        assert db.update_records(ids, user_id=999) == 0
@@ -0,0 +1,71 @@
+# tests/unit/test_anomaly.py
+"""
+AnomalyDetector 单元测试
+"""
+
+import statistics
+from unittest.mock import Mock
+
+import pytest
+
+from models.anomaly import AnomalyDetector, RunningStats
+from models.record import Record
+
+
+class TestRunningStats:
+    """测试 Welford 运行统计"""
+
+    def test_add_and_remove_match_batch_statistics(self):
+        """测试1：增量增删与一次性计算结果一致"""
+        values = [12.5, 30.0, 8.0, 45.5, 22.0, 18.0]
+        stats = RunningStats()
+        for value in values:
+            stats.add(value)
+        assert stats.mean == pytest.approx(statistics.mean(values))
+        assert stats.std == pytest.approx(statistics.stdev(values))
+
+        stats.remove(45.5)
+        remaining = [12.5, 30.0, 8.0, 22.0, 18.0]
+        assert stats.count == 5
+        assert stats.mean == pytest.approx(statistics.mean(remaining))
+        assert stats.std == pytest.approx(statistics.stdev(remaining))
+
+
+class TestAnomalyDetector:
+    """测试异常判断"""
+
+    @pytest.fixture
+    def detector(self):
+        db = Mock()
+        db.get_category_stats.return_value = {}
+        db.seed_category_stats.return_value = {}
+        detector = AnomalyDetector(db)
+        detector.load(user_id=1)
+        for amount in [20.0, 22.0, 18.0, 21.0, 19.0, 20.0]:
+            detector.observe(Record(amount=amount, record_type="expense", category_id=3))
+        return detector
+
+    def test_check_flags_outlier(self, detector):
+        """测试2：单笔判断与持久化"""
+        assert detector.check(Record(amount=21.0, record_type="expense", category_id=3)) is None
+        result = detector.check(Record(amount=200.0, record_type="expense", category_id=3))
+        assert result is not None
+        assert result.mean == pytest.approx(20.0)
+        # 收入和无历史的分类不判断
+        assert detector.check(Record(amount=200.0, record_type="income", category_id=3)) is None
+        assert detector.check(Record(amount=200.0, record_type="expense", category_id=9)) is None
+        assert detector.db.save_category_stats.call_count == 6
+
+    def test_batch_matches_single_checks(self, detector):
+        """测试3：批量打分与逐条判断一致"""
+        records = [
+            Record(amount=21.0, record_type="expense", category_id=3),
+            Record(amount=200.0, record_type="expense", category_id=3),
+            Record(amount=200.0, record_type="income", category_id=3),
+            Record(amount=200.0, record_type="expense", category_id=9),
+        ]
+        scores = detector.score_batch(records)
+        assert scores[0] == pytest.approx(detector.stats[3].zscore(21.0))
+        assert scores[2] is None
+        assert scores[3] is None
+        assert detector.flag_batch(records) == [False, True, False, False]
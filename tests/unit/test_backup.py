@@ -0,0 +1,192 @@
+# tests/unit/test_backup.py
+"""
+BackupModule 单元测试
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from models.app_state import AppState
+from models.backup import (
+    DATABASE_NAME,
+    MANIFEST_NAME,
+    BackupModule,
+    read_manifest,
+)
+from models.category import Category
+from models.database import DatabaseManager
+from models.record import Record
+from models.user import User
+
+
+@pytest.fixture
+def backup_state(tmp_path, monkeypatch):
+    """已登录并带有若干记录的应用状态，备份目录位于临时目录"""
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "finance_book.db"))
+    user = User(username="backup", password_hash="hash", email="b@example.com")
+    db.save_user(user)
+    category = Category(name="住房")
+    db.save_category(category)
+    db.insert_records(
+        [
+            Record(
+                amount=100.0 * day,
+                date=datetime(2024, 5, day),
+                record_type="expense",
+                category_id=category.category_id,
+                user_id=user.user_id,
+                note=f"房租{day}",
+            )
+            for day in range(1, 21)
+        ]
+    )
+    state = AppState(db, Mock())
+    state.current_user = user
+    return state
+
+
+def record_amounts(state):
+    return sorted(
+        r.amount for r in state.db.get_all_records(state.current_user.user_id)
+    )
+
+
+class TestBackupRestore:
+    """测试备份与恢复"""
+
+    def test_round_trip(self, backup_state):
+        """测试1：备份包含清单和校验和，恢复后数据回到备份时的状态"""
+        module = BackupModule(backup_state)
+        stages = set()
+        success, path = module.create_backup(
+            on_progress=lambda stage, done, total: stages.add(stage)
+        )
+        assert success, path
+        assert stages == {"copy", "compress"}
+        assert module.list_backups()[0].name == path.rsplit("/", 1)[-1]
+
+        manifest = read_manifest(path)
+        assert manifest["counts"]["records"] == 20
+        with zipfile.ZipFile(path) as archive:
+            assert archive.getinfo(DATABASE_NAME).compress_type == zipfile.ZIP_DEFLATED
+            assert archive.getinfo(DATABASE_NAME).file_size == manifest["database"]["size"]
+
+        before = record_amounts(backup_state)
+        ids = [r.record_id for r in backup_state.db.get_all_records(backup_state.current_user.user_id)]
+        backup_state.db.delete_records(ids[:15])
+        assert len(record_amounts(backup_state)) == 5
+
+        success, message = module.restore_backup(path)
+        assert success, message
+        assert "20 条记录" in message
+        assert record_amounts(backup_state) == before
+        # 恢复后全文搜索等触发器维护的数据仍然可用
+        assert backup_state.db.search_record_ids(backup_state.current_user.user_id, "房租1")
+
+    def test_corrupted_archive_is_rejected(self, backup_state, tmp_path):
+        """测试2：数据校验和不符或不是备份文件时拒绝恢复，当前数据库不变"""
+        module = BackupModule(backup_state)
+        success, path = module.create_backup("good")
+        assert success
+
+        tampered = tmp_path / "tampered.zip"
+        with zipfile.ZipFile(path) as src, zipfile.ZipFile(tampered, "w") as dst:
+            dst.writestr(MANIFEST_NAME, src.read(MANIFEST_NAME))
+            data = bytearray(src.read(DATABASE_NAME))
+            data[-1] ^= 0xFF
+            dst.writestr(DATABASE_NAME, bytes(data))
+
+        not_backup = tmp_path / "other.zip"
+        with zipfile.ZipFile(not_backup, "w") as archive:
+            archive.writestr(MANIFEST_NAME, json.dumps({"format": "other"}))
+
+        ids = [r.record_id for r in backup_state.db.get_all_records(backup_state.current_user.user_id)]
+        backup_state.db.delete_records(ids[:5])
+        for bad in [tampered, not_backup, tmp_path / "missing.zip"]:
+            success, message = module.restore_backup(bad)
+            assert not success
+            assert message.startswith("恢复失败")
+            assert len(record_amounts(backup_state)) == 15
+        assert not list(tmp_path.glob(".*.restore"))
+
+    def test_cancel_leaves_no_file(self, backup_state, monkeypatch):
+        """测试3：取消后不留下备份文件和临时文件"""
+        monkeypatch.setattr("models.backup.BACKUP_PAGES_PER_STEP", 1)
+        module = BackupModule(backup_state)
+        success, message = module.create_backup(
+            "cancelled", on_progress=lambda stage, done, total: module.cancel()
+        )
+        assert (success, message) == (False, "备份已取消")
+        assert list(module.backup_dir.iterdir()) == []
+
+    def test_writes_during_backup(self, backup_state, monkeypatch):
+        """测试4：持续写入时分步复制仍能完成，备份为开始复制时的一致快照"""
+        monkeypatch.setattr("models.backup.BACKUP_PAGES_PER_STEP", 1)
+        uid = backup_state.current_user.user_id
+        category_id = backup_state.db.get_all_records(uid)[0].category_id
+        writes = []
+        copying = threading.Event()
+        copied = threading.Event()
+
+        def writer():
+            # 另一个线程在复制期间不断写入（每次写入都是新连接）
+            copying.wait(5)
+            while not copied.is_set() and len(writes) < 50:
+                writes.append(
+                    backup_state.db.save_record(
+                        Record(
+                            amount=1.0,
+                            date=datetime(2024, 6, 1),
+                            record_type="income",
+                            category_id=category_id,
+                            user_id=uid,
+                        )
+                    )
+                )
+
+        def on_progress(stage, done, total):
+            if stage == "copy":
+                copying.set()
+                time.sleep(0.002)
+            else:
+                copied.set()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        success, path = BackupModule(backup_state).create_backup(on_progress=on_progress)
+        copied.set()
+        thread.join(10)
+        assert success, path
+        # 写入等待复制结束后成功，没有让复制从头重来
+        assert writes and all(writes)
+        assert read_manifest(path)["counts"]["records"] == 20
+        assert len(backup_state.db.get_all_records(uid)) == 20 + len(writes)
+
+        with zipfile.ZipFile(path) as archive:
+            snapshot = backup_state.db.db_path + ".check"
+            with open(snapshot, "wb") as f:
+                f.write(archive.read(DATABASE_NAME))
+        conn = sqlite3.connect(snapshot)
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT COUNT(*) FROM records").fetchone()[0] == 20
+        conn.close()
+
+    def test_background_work_stopped_before_restore(self, backup_state):
+        """测试5：恢复前退出登录、停止定时生成并等待导出结束"""
+        backup_state.recurring_scheduler.start(backup_state.current_user.user_id)
+        job = Mock(running=True)
+        backup_state.export_job = job
+
+        backup_state.stop_background_work()
+        assert backup_state.current_user is None
+        assert backup_state.recurring_scheduler._timer is None
+        job.cancel.assert_called_once()
+        job.wait.assert_called_once()
@@ -7,13 +7,16 @@ DatabaseManager 单元测试
 import os
 import sqlite3
 import tempfile
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 
+from models.budget import Budget
 from models.category import Category
 from models.database import DatabaseManager
 from models.record import Record
+from models.record_filter import FilterCriteria
+from models.recurring import RecurringRule
 from models.user import User
 
 
@@ -385,4 +388,483 @@ class TestEdgeCases:
             start_date=f"{today} 00:00:00",
             end_date=f"{today} 23:59:59"
         )
-        assert len(records) >= 1
\ No newline at end of file
+        assert len(records) >= 1
+
+
+class TestDailyTotals:
+    """测试每日汇总统计"""
+
+    def test_daily_totals_by_year(self, db_manager, sample_user, sample_category):
+        """测试17：按年获取每日收支汇总数组"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        entries = [
+            (datetime(2024, 1, 1, 9, 0), "expense", 10.0),
+            (datetime(2024, 1, 1, 18, 0), "expense", 5.5),
+            ("2024-12-31 12:00:00", "income", 100.0),
+            (datetime(2023, 12, 31, 12, 0), "expense", 99.0),
+        ]
+        for record_date, record_type, amount in entries:
+            db_manager.save_record(
+                Record(
+                    amount=amount,
+                    date=record_date,
+                    record_type=record_type,
+                    category_id=sample_category.category_id,
+                    user_id=sample_user.user_id,
+                )
+            )
+
+        totals = db_manager.get_daily_totals(sample_user.user_id, 2024)
+        assert len(totals["expense"]) == 366  # 闰年
+        assert totals["expense"][0] == 15.5
+        assert totals["income"][365] == 100.0
+        assert sum(totals["expense"]) == 15.5
+
+        empty = db_manager.get_daily_totals(sample_user.user_id, 2025)
+        assert len(empty["income"]) == 365
+        assert sum(empty["income"]) == 0
+
+
+class TestBudgetOperations:
+    """测试预算相关操作"""
+
+    def test_budget_crud_and_monthly_expense(self, db_manager, sample_user, sample_category):
+        """测试18：预算保存、覆盖、删除及月度分类支出汇总"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        overall = Budget(user_id=sample_user.user_id, amount=1000.0)
+        food = Budget(
+            user_id=sample_user.user_id,
+            category_id=sample_category.category_id,
+            amount=200.0,
+        )
+        assert db_manager.save_budget(overall)
+        assert db_manager.save_budget(food)
+
+        # 同一分类再次保存会覆盖原预算
+        replacement = Budget(
+            user_id=sample_user.user_id,
+            category_id=sample_category.category_id,
+            amount=300.0,
+        )
+        assert db_manager.save_budget(replacement)
+        assert replacement.budget_id == food.budget_id
+
+        budgets = db_manager.get_budgets(sample_user.user_id)
+        assert len(budgets) == 2
+        assert budgets[0].is_overall
+        assert budgets[1].amount == 300.0
+
+        for record_date, amount in [
+            (datetime(2024, 3, 5), 40.0),
+            (datetime(2024, 3, 31, 23, 0), 10.0),
+            (datetime(2024, 4, 1), 99.0),
+        ]:
+            db_manager.save_record(
+                Record(
+                    amount=amount,
+                    date=record_date,
+                    record_type="expense",
+                    category_id=sample_category.category_id,
+                    user_id=sample_user.user_id,
+                )
+            )
+
+        spent = db_manager.get_monthly_expense_by_category(sample_user.user_id, 2024, 3)
+        assert spent == {sample_category.category_id: 50.0}
+
+        assert db_manager.delete_budget(overall.budget_id)
+        assert len(db_manager.get_budgets(sample_user.user_id)) == 1
+        assert db_manager.delete_budget(overall.budget_id) is False
+
+
+class TestCategoryStats:
+    """测试分类支出运行统计"""
+
+    def test_seed_and_save_category_stats(self, db_manager, sample_user, sample_category):
+        """测试19：由历史记录初始化统计并覆盖保存"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        for amount in [10.0, 20.0, 30.0]:
+            db_manager.save_record(
+                Record(
+                    amount=amount,
+                    date=datetime.now(),
+                    record_type="expense",
+                    category_id=sample_category.category_id,
+                    user_id=sample_user.user_id,
+                )
+            )
+
+        assert db_manager.get_category_stats(sample_user.user_id) == {}
+        stats = db_manager.seed_category_stats(sample_user.user_id)
+        row = stats[sample_category.category_id]
+        assert row["count"] == 3
+        assert row["mean"] == pytest.approx(20.0)
+        assert row["m2"] == pytest.approx(200.0)
+
+        assert db_manager.save_category_stats(
+            sample_user.user_id, sample_category.category_id, 4, 25.0, 500.0
+        )
+        row = db_manager.get_category_stats(sample_user.user_id)[sample_category.category_id]
+        assert (row["count"], row["mean"], row["m2"]) == (4, 25.0, 500.0)
+
+
+class TestRecurringRules:
+    """测试定期交易规则与批量写入"""
+
+    def test_apply_recurring_schedule(self, db_manager, sample_user, sample_category):
+        """测试20：批量插入到期记录并推进下次日期，流式读取顺序正确"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        rule = RecurringRule(
+            user_id=sample_user.user_id,
+            category_id=sample_category.category_id,
+            amount=99.0,
+            note="会员",
+            frequency="monthly",
+            anchor_day=10,
+            next_date=datetime(2024, 1, 10).date(),
+        )
+        assert db_manager.save_recurring_rule(rule)
+        assert rule.rule_id is not None
+
+        records = [rule.make_record(datetime(2024, m, 10).date()) for m in (1, 2)]
+        assert db_manager.apply_recurring_schedule(
+            records, {rule.rule_id: datetime(2024, 3, 10).date()}
+        )
+
+        saved = db_manager.get_recurring_rules(sample_user.user_id)
+        assert len(saved) == 1
+        assert saved[0].next_date == datetime(2024, 3, 10).date()
+
+        streamed = list(
+            db_manager.iter_records(sample_user.user_id, batch_size=1, order_by="date ASC")
+        )
+        assert [r.date.month for r in streamed] == [1, 2]
+        assert db_manager.insert_records([]) == 0
+
+        assert db_manager.delete_recurring_rule(rule.rule_id)
+        assert db_manager.get_recurring_rules(sample_user.user_id, active_only=False) == []
+
+
+class TestRecordSearch:
+    """测试记录全文搜索"""
+
+    def test_search_record_ids(self, db_manager, sample_user, sample_category):
+        """测试21：索引随记录增删改同步，短查询退化为 LIKE，结果可分页"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        notes = ["星巴克咖啡", "瑞幸咖啡", "地铁", "100%_off"]
+        records = []
+        for note in notes:
+            record = Record(
+                amount=12.5,
+                date=datetime.now(),
+                record_type="expense",
+                note=note,
+                category_id=sample_category.category_id,
+                user_id=sample_user.user_id,
+            )
+            db_manager.save_record(record)
+            records.append(record)
+
+        uid = sample_user.user_id
+        assert db_manager.fts_available
+        assert sorted(db_manager.search_record_ids(uid, "星巴克")) == [records[0].record_id]
+        assert len(db_manager.search_record_ids(uid, "咖啡")) == 2
+        assert len(db_manager.search_record_ids(uid, "foo")) == 4  # 分类名称
+        assert len(db_manager.search_record_ids(uid, "12.5")) == 4  # 金额
+        assert db_manager.search_record_ids(uid, "%_") == [records[3].record_id]
+        assert db_manager.search_record_ids(uid, "咖啡", limit=1, offset=1) != []
+        assert db_manager.search_record_ids(uid, "咖啡", limit=1, offset=2) == []
+        assert db_manager.search_record_ids(uid + 1, "咖啡") == []
+
+        records[1].note = "午饭"
+        db_manager.save_record(records[1])
+        db_manager.delete_record(records[0].record_id)
+        assert db_manager.search_record_ids(uid, "咖啡") == []
+        assert db_manager.search_record_ids(uid, "午饭") == [records[1].record_id]
+
+
+class TestRecordQuery:
+    """测试记录筛选查询"""
+
+    def test_query_and_count_records(self, db_manager, sample_user, sample_category):
+        """测试22：类型、日期、分类、金额和文本条件下推到 SQL 并分页"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        for day, amount, record_type, note in [
+            (1, 10.0, "expense", "咖啡"),
+            (2, 20.0, "expense", "午饭"),
+            (3, 30.0, "income", "红包"),
+            (4, 40.0, "expense", "咖啡豆"),
+        ]:
+            db_manager.save_record(
+                Record(
+                    amount=amount,
+                    date=datetime(2024, 5, day, 12, 0),
+                    record_type=record_type,
+                    note=note,
+                    category_id=sample_category.category_id,
+                    user_id=sample_user.user_id,
+                )
+            )
+
+        uid = sample_user.user_id
+        everything = FilterCriteria()
+        assert db_manager.count_records(uid, everything) == 4
+        assert [r.amount for r in db_manager.query_records(uid, everything)] == [
+            40.0, 30.0, 20.0, 10.0
+        ]
+        assert [
+            r.amount for r in db_manager.query_records(uid, everything, limit=2, offset=1)
+        ] == [30.0, 20.0]
+        assert [
+            r.amount for r in db_manager.query_records(uid, everything, order_by="amount ASC")
+        ] == [10.0, 20.0, 30.0, 40.0]
+        # 不在白名单中的排序方式退回默认排序
+        assert db_manager.query_records(uid, everything, order_by="amount; DROP TABLE records")
+
+        criteria = FilterCriteria(
+            record_type="expense",
+            start_date=datetime(2024, 5, 2).date(),
+            end_date=datetime(2024, 5, 4).date(),
+        )
+        assert db_manager.count_records(uid, criteria) == 2
+        assert db_manager.count_records(uid, FilterCriteria(search_text="咖啡")) == 2
+        assert db_manager.count_records(uid, FilterCriteria(search_text="咖啡豆")) == 1
+        assert db_manager.count_records(uid, FilterCriteria(min_amount=15, max_amount=35)) == 2
+        assert db_manager.count_records(
+            uid, FilterCriteria(category_ids=frozenset({sample_category.category_id}))
+        ) == 4
+        assert db_manager.count_records(uid, FilterCriteria(category_ids=frozenset())) == 0
+        assert sorted(db_manager.query_record_ids(uid, criteria)) == sorted(
+            r.record_id for r in db_manager.query_records(uid, criteria)
+        )
+
+
+class TestDashboardSnapshot:
+    """测试仪表板数据快照"""
+
+    def test_get_dashboard_snapshot(self, db_manager, sample_user, sample_category):
+        """测试23：余额、月度对比和最近交易（附分类名称）一次返回"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        for day, amount, record_type in [
+            (datetime(2024, 4, 10), 100.0, "expense"),
+            (datetime(2024, 5, 2), 150.0, "expense"),
+            (datetime(2024, 5, 3), 1000.0, "income"),
+            (datetime(2024, 3, 1), 500.0, "income"),
+        ]:
+            db_manager.save_record(
+                Record(
+                    amount=amount,
+                    date=day,
+                    record_type=record_type,
+                    category_id=sample_category.category_id,
+                    user_id=sample_user.user_id,
+                )
+            )
+
+        snapshot = db_manager.get_dashboard_snapshot(
+            sample_user.user_id, recent_limit=2, today=datetime(2024, 5, 20).date()
+        )
+        assert snapshot["income"] == 1500.0
+        assert snapshot["expense"] == 250.0
+        assert snapshot["balance"] == 1250.0
+        assert snapshot["current_month"] == {"income": 1000.0, "expense": 150.0}
+        assert snapshot["last_month"] == {"income": 0.0, "expense": 100.0}
+        assert [item["record"].amount for item in snapshot["recent"]] == [1000.0, 150.0]
+        assert snapshot["recent"][0]["category_name"] == "Food"
+
+        empty = db_manager.get_dashboard_snapshot(999)
+        assert empty["balance"] == 0.0 and empty["recent"] == []
+
+
+class TestRunningBalance:
+    """测试逐笔余额"""
+
+    def test_get_running_balances(self, db_manager, sample_user, sample_category):
+        """测试24：任意一页记录的余额与从头累计的结果一致"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+
+        ids = []
+        for day, amount, record_type in [
+            (1, 100.0, "income"),
+            (2, 30.0, "expense"),
+            (2, 20.0, "expense"),
+            (4, 50.0, "income"),
+        ]:
+            record = Record(
+                amount=amount,
+                date=datetime(2024, 5, day),
+                record_type=record_type,
+                category_id=sample_category.category_id,
+                user_id=sample_user.user_id,
+            )
+            db_manager.save_record(record)
+            ids.append(record.record_id)
+
+        uid = sample_user.user_id
+        assert db_manager.get_running_balances(uid, ids) == {
+            ids[0]: 100.0, ids[1]: 70.0, ids[2]: 50.0, ids[3]: 100.0
+        }
+        # 只请求中间一页时，之前的记录汇总为起始余额
+        assert db_manager.get_running_balances(uid, [ids[2], ids[1]]) == {
+            ids[1]: 70.0, ids[2]: 50.0
+        }
+        assert db_manager.get_running_balances(uid, []) == {}
+
+
+class TestBalanceCheckpoints:
+    """测试余额检查点"""
+
+    def test_balance_as_of_follows_writes(self, db_manager, sample_user, sample_category):
+        """测试25：补录、修改和删除早期记录后，按日期查询的余额与逐条累计一致"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+        uid = sample_user.user_id
+
+        def add(when, amount, record_type):
+            record = Record(
+                amount=amount,
+                date=when,
+                record_type=record_type,
+                category_id=sample_category.category_id,
+                user_id=uid,
+            )
+            db_manager.save_record(record)
+            return record
+
+        def brute_force(as_of):
+            income = expense = 0.0
+            for record in db_manager.get_all_records(uid):
+                if record.date.date() <= as_of:
+                    if record.record_type == "income":
+                        income += record.amount
+                    else:
+                        expense += record.amount
+            return {"income": income, "expense": expense, "balance": income - expense}
+
+        add(datetime(2024, 1, 5), 1000.0, "income")
+        add(datetime(2024, 2, 10), 200.0, "expense")
+        last = add(datetime(2024, 4, 1, 9, 30), 50.0, "expense")
+
+        days = [date(2023, 12, 31), date(2024, 1, 31), date(2024, 3, 15), date(2024, 4, 1)]
+        for day in days:
+            assert db_manager.get_balance_as_of(uid, day) == brute_force(day)
+
+        # 检查点已建立后，补录、修改和删除只修正之后的检查点
+        backdated = add(datetime(2024, 1, 20), 300.0, "expense")
+        backdated.amount = 120.0
+        backdated.date = datetime(2024, 3, 1)
+        db_manager.update_record(backdated)
+        db_manager.delete_record(last.record_id)
+        for day in days:
+            assert db_manager.get_balance_as_of(uid, day) == brute_force(day)
+
+        ids = [record.record_id for record in db_manager.get_all_records(uid)]
+        balances = db_manager.get_running_balances(uid, ids)
+        assert balances[backdated.record_id] == 1000.0 - 200.0 - 120.0
+
+    def test_balance_reads_do_not_write(self, db_manager, temp_db, sample_user, sample_category):
+        """测试25b：检查点由写入维护，查询没有检查点的月份时用最近的检查点加部分区间，不写入"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+        uid = sample_user.user_id
+        for when, amount, record_type in [
+            (datetime(2023, 11, 3), 500.0, "income"),
+            (datetime(2024, 1, 5), 1000.0, "income"),
+            (datetime(2024, 1, 9), 80.0, "expense"),
+            (datetime(2024, 6, 2), 30.0, "expense"),
+        ]:
+            db_manager.save_record(Record(
+                amount=amount,
+                date=when,
+                record_type=record_type,
+                category_id=sample_category.category_id,
+                user_id=uid,
+            ))
+
+        def checkpoints():
+            with sqlite3.connect(temp_db) as conn:
+                return conn.execute(
+                    "SELECT month, income, expense FROM balance_checkpoints "
+                    "WHERE user_id = ? ORDER BY month",
+                    (uid,),
+                ).fetchall()
+
+        # 每个有记录的月份在写入第一条记录时建立检查点
+        assert checkpoints() == [
+            ("2023-11", 0.0, 0.0),
+            ("2024-01", 500.0, 0.0),
+            ("2024-06", 1500.0, 80.0),
+        ]
+        before = checkpoints()
+        reader = DatabaseManager(temp_db, initialize=False)
+        assert reader.get_balance_as_of(uid, date(2024, 3, 31)) == {
+            "income": 1500.0, "expense": 80.0, "balance": 1420.0
+        }
+        assert reader.get_balance_as_of(uid, date(2030, 1, 1))["balance"] == 1390.0
+        assert checkpoints() == before
+
+        # 没有检查点的旧数据库在初始化时一次性建立
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("DELETE FROM balance_checkpoints")
+        DatabaseManager(temp_db)
+        assert checkpoints()[:2] == [("2023-12", 500.0, 0.0), ("2024-01", 500.0, 0.0)]
+        assert reader.get_balance_as_of(uid, date(2024, 3, 31))["balance"] == 1420.0
+
+
+class TestRecordFingerprints:
+    """测试记录内容指纹"""
+
+    def test_fingerprints_follow_writes(self, db_manager, temp_db, sample_user, sample_category):
+        """测试26：旧数据库回填指纹，批量修改后重新计算，可按批统计次数"""
+        db_manager.save_user(sample_user)
+        db_manager.save_category(sample_category)
+        uid = sample_user.user_id
+        records = [
+            Record(
+                amount=12.5,
+                date=datetime(2024, 5, 1, hour),
+                record_type="expense",
+                note=note,
+                category_id=sample_category.category_id,
+                user_id=uid,
+            )
+            for hour, note in [(8, "Coffee"), (18, "  coffee "), (9, "Lunch")]
+        ]
+        db_manager.insert_records(records)
+        coffee, lunch = records[0].fingerprint, records[2].fingerprint
+        assert records[1].fingerprint == coffee != lunch
+
+        # 模拟没有指纹列的旧数据库
+        conn = sqlite3.connect(temp_db)
+        conn.execute("DROP INDEX idx_records_user_fingerprint")
+        conn.execute("ALTER TABLE records DROP COLUMN fingerprint")
+        conn.commit()
+        conn.close()
+        db_manager = DatabaseManager(temp_db)
+
+        assert db_manager.count_fingerprints(uid, [coffee, lunch, "missing"]) == {
+            coffee: 2,
+            lunch: 1,
+        }
+        ids = [r.record_id for r in db_manager.get_all_records(uid) if r.note == "Lunch"]
+        db_manager.update_records(ids, note="coffee")
+        assert db_manager.count_fingerprints(uid, [coffee, lunch]) == {coffee: 3}
+
+        keys = db_manager.get_record_keys(uid, "2024-05-01", "2024-05-01")
+        assert len(keys) == 3 and keys[0]["day"] == "2024-05-01"
+        assert db_manager.get_record_keys(uid, "2024-05-02", "2024-05-31") == []
@@ -0,0 +1,423 @@
+# tests/unit/test_export.py
+"""
+ExportModule 单元测试
+"""
+
+import json
+import sqlite3
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from models.app_state import AppState
+from models.category import Category
+from models.database import DatabaseManager
+from models import export_job
+from models.export import ExportModule, merge_json_exports
+from models.export_job import ExportJob
+from models.record import Record
+from models.report import (
+    ChartCache,
+    ReportData,
+    build_report_file,
+    collect_report_data,
+    generate_pdf_report,
+    parse_period,
+    periods_of_year,
+)
+from models.user import User
+
+
+@pytest.fixture
+def export_state(tmp_path, monkeypatch):
+    """已登录并带有若干记录的应用状态，导出目录位于临时目录"""
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "test.db"))
+    user = User(username="exporter", password_hash="hash", email="e@example.com")
+    db.save_user(user)
+    category = Category(name="餐饮")
+    db.save_category(category)
+
+    records = [
+        Record(
+            amount=amount,
+            date=datetime(2024, 3, day),
+            record_type=record_type,
+            category_id=category.category_id,
+            user_id=user.user_id,
+            note=note,
+        )
+        for day, amount, record_type, note in [
+            (1, 5000.0, "income", "工资"),
+            (2, 35.5, "expense", '午饭 "套餐"'),
+            (3, 12.0, "expense", ""),
+        ]
+    ]
+    db.insert_records(records)
+
+    state = AppState(db, Mock())
+    state.current_user = user
+    state.categories = db.get_categories()
+    return state
+
+
+class TestJsonExport:
+    """测试JSON导出"""
+
+    def test_streamed_json_matches_records(self, export_state):
+        """测试1：流式写出的文件是合法JSON，汇总与记录一致"""
+        module = ExportModule(export_state)
+        success, path = module.export_to_json("data")
+        assert success
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        assert data["user"]["username"] == "exporter"
+        assert [r["amount"] for r in data["records"]] == [12.0, 35.5, 5000.0]
+        assert data["records"][1]["note"] == '午饭 "套餐"'
+        assert {r["category_name"] for r in data["records"]} == {"餐饮"}
+        assert data["summary"] == {
+            "total_records": 3,
+            "total_income": 5000.0,
+            "total_expense": 47.5,
+        }
+
+    def test_empty_export(self, export_state):
+        """测试2：没有记录时仍输出合法JSON"""
+        export_state.db.delete_records(
+            [r.record_id for r in export_state.db.get_all_records(export_state.current_user.user_id)]
+        )
+        success, path = ExportModule(export_state).export_to_json("empty.json")
+        assert success
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        assert data["records"] == []
+        assert data["summary"]["total_records"] == 0
+
+
+class TestExcelExport:
+    """测试Excel导出"""
+
+    def test_write_only_workbook(self, export_state):
+        """测试3：只写模式导出的工作簿包含样式化表头和正确的汇总"""
+        openpyxl = pytest.importorskip("openpyxl")
+        success, path = ExportModule(export_state).export_to_excel("data")
+        assert success
+
+        wb = openpyxl.load_workbook(path)
+        assert wb.sheetnames == ["数据汇总", "记账记录", "分类列表"]
+        records = wb["记账记录"]
+        assert records["A1"].value == "记录ID"
+        assert records["A1"].font.bold
+        assert [row[4] for row in records.iter_rows(min_row=2, values_only=True)] == [
+            12.0, 35.5, 5000.0
+        ]
+        summary = {row[0]: row[1] for row in wb["数据汇总"].iter_rows(values_only=True) if row}
+        assert summary["总记录数"] == 3
+        assert summary["总支出"] == "¥47.50"
+
+    def test_split_sheets_at_row_limit(self, export_state):
+        """测试4：超过单表行数上限时续写到新的工作表，每个表都有表头"""
+        openpyxl = pytest.importorskip("openpyxl")
+        module = ExportModule(export_state)
+        wb = openpyxl.Workbook(write_only=True)
+        totals = module._create_records_sheet(wb, max_rows=3)
+        assert totals["count"] == 3
+        assert [ws.title for ws in wb.worksheets] == ["记账记录", "记账记录2"]
+
+        path = module.export_dir / "split.xlsx"
+        wb.save(path)
+        saved = openpyxl.load_workbook(path)
+        assert saved["记账记录"].max_row == 3
+        assert [row[0] for row in saved["记账记录2"].iter_rows(values_only=True)] == [
+            "记录ID", 1
+        ]
+
+
+class TestExportJob:
+    """测试后台导出任务"""
+
+    def test_job_reports_progress(self, export_state, monkeypatch):
+        """测试5：后台导出完成后报告全部进度并生成文件"""
+        monkeypatch.setattr(export_job, "PROGRESS_INTERVAL", 2)
+        updates = []
+        done = []
+        job = ExportJob(
+            export_state,
+            "json",
+            on_update=lambda progress: updates.append(progress.written),
+            on_done=done.append,
+        )
+        job.start()
+        job.wait(10)
+
+        assert done == [job]
+        success, path = job.result
+        assert success
+        assert (job.progress.written, job.progress.total) == (3, 3)
+        assert updates == [2, 3]
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["summary"]["total_records"] == 3
+
+    def test_cancel_leaves_no_file(self, export_state, monkeypatch):
+        """测试6：取消后返回取消信息，不留下目标文件和临时文件"""
+        monkeypatch.setattr(export_job, "PROGRESS_INTERVAL", 1)
+        job = ExportJob(export_state, "csv")
+        job.progress.on_update = lambda progress: job.cancel()
+        job.start()
+        job.wait(10)
+
+        assert job.result == (False, "导出已取消")
+        assert job.progress.written == 1
+        assert list(ExportModule(export_state).export_dir.iterdir()) == []
+
+    def test_failed_export_removes_temp_file(self, export_state, monkeypatch):
+        """测试7：写入失败时删除临时文件"""
+        module = ExportModule(export_state)
+
+        def fail(f):
+            f.write("partial")
+            raise OSError("disk full")
+
+        monkeypatch.setattr(module, "_write_csv", fail)
+        success, message = module.export_to_csv("broken")
+        assert not success
+        assert "disk full" in message
+        assert list(module.export_dir.iterdir()) == []
+
+
+class TestDeltaExport:
+    """测试增量导出与合并"""
+
+    @staticmethod
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def record_keys(data):
+        return [
+            (r["record_id"], r["amount"], r["note"], r["date"]) for r in data["records"]
+        ]
+
+    def test_delta_export_and_merge(self, export_state, tmp_path):
+        """测试8：增量导出只包含变更和墓碑，合并后与完整导出一致"""
+        db = export_state.db
+        uid = export_state.current_user.user_id
+        module = ExportModule(export_state)
+
+        success, base_path = module.export_delta("nas", "base")
+        assert success
+        base = self.load(base_path)
+        assert (base["export_type"], base["since_seq"]) == ("base", None)
+        assert base["summary"]["total_records"] == 3
+
+        first, second, third = sorted(db.get_all_records(uid), key=lambda r: r.record_id)
+        first.amount = 4800.0
+        db.update_record(first)
+        db.delete_record(second.record_id)
+        db.save_record(
+            Record(
+                amount=8.0,
+                date=datetime(2024, 3, 5),
+                record_type="expense",
+                category_id=third.category_id,
+                user_id=uid,
+                note="咖啡",
+            )
+        )
+
+        success, delta1_path = module.export_delta("nas", "delta1")
+        delta1 = self.load(delta1_path)
+        assert delta1["export_type"] == "delta"
+        assert delta1["since_seq"] == base["until_seq"]
+        assert sorted(r["amount"] for r in delta1["records"]) == [8.0, 4800.0]
+        assert delta1["deleted"] == [second.record_id]
+
+        # 其他导出目标的水位互不影响
+        success, other_path = module.export_delta("usb", "other")
+        assert self.load(other_path)["export_type"] == "base"
+
+        # 新增后又删除的记录只留下墓碑
+        db.delete_record(third.record_id)
+        success, delta2_path = module.export_delta("nas", "delta2")
+        delta2 = self.load(delta2_path)
+        assert delta2["records"] == []
+        assert delta2["deleted"] == [third.record_id]
+
+        success, merged_path = merge_json_exports(
+            base_path, [delta2_path, delta1_path], tmp_path / "merged.json"
+        )
+        assert success
+        success, full_path = module.export_to_json("full")
+        merged = self.load(merged_path)
+        assert self.record_keys(merged) == self.record_keys(self.load(full_path))
+        assert merged["until_seq"] == delta2["until_seq"]
+        assert merged["summary"]["total_records"] == 2
+
+        # 缺少中间的增量文件时拒绝合并
+        success, message = merge_json_exports(
+            base_path, [delta2_path], tmp_path / "broken.json"
+        )
+        assert not success
+        assert "缺少序号" in message
+
+    def test_change_log_pruned_after_all_destinations_export(self, export_state):
+        """测试9：所有导出目标都导出后清理变更日志"""
+        db = export_state.db
+        uid = export_state.current_user.user_id
+        module = ExportModule(export_state)
+        module.export_delta("nas", "base")
+        record = db.get_all_records(uid)[0]
+        record.note = "改过"
+        db.update_record(record)
+
+        with sqlite3.connect(db.db_path) as conn:
+            count = "SELECT COUNT(*) FROM record_changes"
+            assert conn.execute(count).fetchone()[0] == 1
+            module.export_delta("nas", "delta")
+            assert conn.execute(count).fetchone()[0] == 0
+
+    def test_merge_job_streams_base_file(self, export_state, monkeypatch):
+        """测试10：合并任务找到最新快照和其后的增量，逐条读取而不整体加载文件"""
+        db = export_state.db
+        uid = export_state.current_user.user_id
+
+        def run(export_format):
+            job = ExportJob(export_state, export_format)
+            job.start()
+            job.wait(10)
+            return job.result
+
+        success, base_path = run("delta")
+        assert success
+        record = db.get_all_records(uid)[0]
+        record.note = "改过"
+        db.update_record(record)
+        assert run("delta")[0]
+
+        with monkeypatch.context() as m:
+            m.setattr(json, "load", Mock(side_effect=AssertionError("json.load")))
+            success, merged_path = run("merge")
+        assert success, merged_path
+        assert merged_path != base_path
+
+        merged = self.load(merged_path)
+        assert (merged["export_type"], merged["since_seq"]) == ("base", None)
+        success, full_path = ExportModule(export_state).export_to_json("full")
+        assert self.record_keys(merged) == self.record_keys(self.load(full_path))
+
+        # 合并结果成为新的基础快照，之后没有增量时无需合并
+        success, message = run("merge")
+        assert not success
+        assert "没有增量导出" in message
+
+
+class TestPdfReport:
+    """测试PDF报表"""
+
+    def test_period_parsing(self):
+        """测试11：月报和年报期间解析，无效期间报错"""
+        assert parse_period("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+        assert parse_period("2024") == (date(2024, 1, 1), date(2024, 12, 31))
+        assert periods_of_year(2024)[-2:] == ["2024-12", "2024"]
+        for period in ["2024-13", "24-01", "abcd"]:
+            with pytest.raises(ValueError):
+                parse_period(period)
+
+    def test_report_data_and_chart_cache(self, export_state, tmp_path):
+        """测试12：报表汇总正确，数据不变时图表取自缓存，数据变化后重新绘制"""
+        pytest.importorskip("matplotlib")
+        pytest.importorskip("reportlab")
+        db, user = export_state.db, export_state.current_user
+        data = collect_report_data(db, user.user_id, "2024-03")
+        assert (data.income, data.expense) == (5000.0, 47.5)
+        assert data.categories == [("餐饮", 47.5)]
+        assert len(data.trend) == 31 and data.trend[1] == ("2", 0.0, 35.5)
+        assert [record.amount for record, _ in data.top] == [35.5, 12.0]
+
+        module = ExportModule(export_state)
+        success, path = module.export_to_pdf("2024-03")
+        assert success, path
+        with open(path, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+
+        cache = ChartCache(module.chart_cache_dir)
+        generate_pdf_report(db, user.user_id, "2024-03", tmp_path / "again.pdf", cache)
+        assert (cache.hits, cache.misses) == (2, 0)
+
+        db.save_record(
+            Record(
+                amount=8.0,
+                date=datetime(2024, 3, 9),
+                record_type="expense",
+                category_id=export_state.categories[0].category_id,
+                user_id=user.user_id,
+            )
+        )
+        generate_pdf_report(db, user.user_id, "2024-03", tmp_path / "again.pdf", cache)
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert len(list(module.chart_cache_dir.glob("*.png"))) == 2
+
+    def test_batch_reports_in_process_pool(self, export_state):
+        """测试13：多个期间在进程池中并行生成"""
+        pytest.importorskip("matplotlib")
+        pytest.importorskip("reportlab")
+        results = ExportModule(export_state).export_pdf_reports(
+            ["2024-03", "2024", "2024-99"], max_workers=2
+        )
+        assert [success for success, _ in results] == [True, True, False]
+        assert results[1][1].endswith("finance_report_2024.pdf")
+
+    def test_report_worker_skips_database_init(self, export_state, tmp_path, monkeypatch):
+        """测试14：报表工作进程只读取数据库，不执行建表和迁移"""
+        pytest.importorskip("matplotlib")
+        pytest.importorskip("reportlab")
+
+        def fail_init(self):
+            raise AssertionError("工作进程不应初始化数据库")
+
+        monkeypatch.setattr(DatabaseManager, "init_database", fail_init)
+        success, path = build_report_file(
+            export_state.db.db_path,
+            export_state.current_user.user_id,
+            "2024-03",
+            str(tmp_path / "report.pdf"),
+            str(tmp_path / "charts"),
+        )
+        assert success, path
+
+    def test_daily_expense_counts_elapsed_days(self):
+        """测试15：期间包含今天时日均支出只按已过去的天数计算"""
+        today = date.today()
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        current = ReportData(period=f"{today:%Y-%m}", start=start, end=end, expense=100.0)
+        assert current.daily_expense == pytest.approx(100.0 / today.day)
+
+        past = ReportData(
+            period="2024-02", start=date(2024, 2, 1), end=date(2024, 2, 29), expense=290.0
+        )
+        assert past.daily_expense == pytest.approx(10.0)
+
+    def test_year_reports_job(self, export_state, monkeypatch):
+        """测试16：全年报表任务批量生成12个月报和年报，任一失败时报告错误"""
+        periods = []
+
+        def fake_reports(module, requested, max_workers=None):
+            periods.extend(requested)
+            return [(period != "2024-05", f"{period} 结果") for period in requested]
+
+        monkeypatch.setattr(ExportModule, "export_pdf_reports", fake_reports)
+        job = ExportJob(export_state, "pdf_year")
+        job.start()
+        job.wait(10)
+
+        assert len(periods) == 13
+        assert periods[-1] == str(date.today().year)
+        assert job.result == (True, str(ExportModule(export_state).export_dir))
+        assert ExportModule(export_state).export_year_reports(2024) == (
+            False, "2024-05 结果"
+        )
@@ -0,0 +1,68 @@
+# tests/unit/test_forecast.py
+"""
+Forecast 单元测试
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from models.forecast import build_forecast, exponential_smoothing, fit_linear_trend
+
+
+def make_rows(today, days, record_type, category_id, amount):
+    """生成连续每天固定金额的汇总行"""
+    return [
+        {
+            "day": (today - timedelta(days=i)).isoformat(),
+            "record_type": record_type,
+            "category_id": category_id,
+            "total": amount,
+        }
+        for i in range(days)
+    ]
+
+
+class TestForecastModels:
+    """测试向量化拟合"""
+
+    def test_linear_trend_per_row(self):
+        """测试1：逐行线性回归"""
+        t = np.arange(10, dtype=float)
+        series = np.vstack([2 * t + 1, np.full(10, 5.0)])
+        slope, intercept, residual_std = fit_linear_trend(series)
+        assert slope == pytest.approx([2.0, 0.0])
+        assert intercept == pytest.approx([1.0, 5.0])
+        assert residual_std == pytest.approx([0.0, 0.0], abs=1e-9)
+
+    def test_exponential_smoothing_constant_series(self):
+        """测试2：常数序列的平滑水平等于常数"""
+        level, residual_std = exponential_smoothing(np.full((3, 30), 7.0))
+        assert level == pytest.approx([7.0, 7.0, 7.0])
+        assert residual_std == pytest.approx([0.0, 0.0, 0.0])
+
+
+class TestBuildForecast:
+    """测试预测结果"""
+
+    def test_constant_spending_projection(self):
+        """测试3：每天固定支出时月末/年末预测等于线性外推"""
+        today = date(2024, 6, 10)
+        rows = make_rows(today, 200, "expense", 1, 10.0)
+        rows += make_rows(today, 200, "expense", 2, 5.0)
+
+        result = build_forecast(rows, today)
+
+        month = result.totals["expense"]["month"]
+        assert month.actual == pytest.approx(150.0)
+        assert month.expected == pytest.approx(15.0 * 30)
+        assert month.lower <= month.expected <= month.upper
+
+        year = result.by_category[("expense", 1)]["year"]
+        assert year.expected == pytest.approx(10.0 * 366)
+
+        assert result.totals["income"]["month"].expected == 0
+        assert len(result.daily_expected["expense"]) == len(result.horizon_dates)
+        assert result.daily_expected["expense"][0] == pytest.approx(15.0)
@@ -0,0 +1,332 @@
+# tests/unit/test_importer.py
+"""
+ImportModule 单元测试
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from models.app_state import AppState
+from models.category import Category
+from models.database import DatabaseManager
+from models.export import CSV_COLUMNS, ExportModule, open_csv
+from models.importer import ImportModule, iter_json_array
+from models.record import Record
+from models.user import User
+
+
+def make_state(db_path, username):
+    """创建已登录用户的应用状态"""
+    db = DatabaseManager(str(db_path))
+    user = User(username=username, password_hash="hash", email=f"{username}@example.com")
+    db.save_user(user)
+    state = AppState(db, Mock())
+    state.current_user = user
+    state.categories = db.get_categories()
+    return state
+
+
+@pytest.fixture
+def source_state(tmp_path, monkeypatch):
+    """带有若干记录的源数据库"""
+    monkeypatch.chdir(tmp_path)
+    state = make_state(tmp_path / "source.db", "source")
+    category = Category(name="交通")
+    state.db.save_category(category)
+    state.categories = state.db.get_categories()
+    state.db.insert_records(
+        [
+            Record(
+                amount=10.0 + day,
+                date=datetime(2024, 6, day, 8, 30),
+                record_type="expense" if day % 2 else "income",
+                category_id=category.category_id,
+                user_id=state.current_user.user_id,
+                note=f"第{day}笔, 含逗号\n和换行",
+            )
+            for day in range(1, 8)
+        ]
+    )
+    return state
+
+
+class TestCsvRoundTrip:
+    """测试CSV导出与导入"""
+
+    @pytest.mark.parametrize("compression", [None, "gzip", "bz2", "xz"])
+    def test_round_trip(self, source_state, tmp_path, compression):
+        """测试1：导出的CSV（可压缩）导入到另一个数据库后记录一致"""
+        success, path = ExportModule(source_state).export_to_csv("records", compression)
+        assert success
+
+        with open_csv(path, "r", compression) as f:
+            assert next(csv.reader(f)) == CSV_COLUMNS
+
+        target = make_state(tmp_path / "target.db", "target")
+        # 目标库中的分类ID不同，按名称匹配
+        target.db.save_category(Category(name="占位"))
+        target.db.save_category(Category(name="交通"))
+        target.categories = target.db.get_categories()
+
+        report = ImportModule(target).import_from_csv(path)
+        assert report.success
+        assert (report.imported, report.skipped) == (7, 0)
+
+        def snapshot(state):
+            names = {c.category_id: c.name for c in state.categories}
+            return sorted(
+                (r.date, r.amount, r.record_type, r.note, names[r.category_id])
+                for r in state.db.get_all_records(state.current_user.user_id)
+            )
+
+        assert snapshot(target) == snapshot(source_state)
+        assert len(target.records) == 7
+
+    def test_invalid_rows_are_skipped(self, source_state, tmp_path):
+        """测试2：金额、日期、类型或分类无效的行被跳过"""
+        path = tmp_path / "bad.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerow(["", "2024-01-01", "expense", "", "交通", "5", "", "", ""])
+            writer.writerow(["", "2024-01-02", "expense", "", "交通", "abc", "", "", ""])
+            writer.writerow(["", "not a date", "expense", "", "交通", "5", "", "", ""])
+            writer.writerow(["", "2024-01-03", "transfer", "", "交通", "5", "", "", ""])
+            writer.writerow(["", "2024-01-04", "income", "99999", "不存在", "5", "", "", ""])
+
+        report = ImportModule(source_state).import_from_csv(path)
+        assert (report.imported, report.skipped) == (1, 4)
+        assert "跳过 4 条" in report.summary()
+
+    def test_missing_file(self, source_state, tmp_path):
+        """测试3：文件不存在时返回错误"""
+        report = ImportModule(source_state).import_from_csv(tmp_path / "missing.csv")
+        assert not report.success
+
+
+class TestParquetRoundTrip:
+    """测试Parquet导出与导入"""
+
+    def test_round_trip(self, source_state, tmp_path):
+        """测试4：列类型正确，导入后金额和分类一致"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        success, path = ExportModule(source_state).export_to_parquet("records")
+        assert success
+
+        table = pq.read_table(path)
+        assert table.schema.field("amount_cents").type == pa.int64()
+        assert pa.types.is_dictionary(table.schema.field("category_name").type)
+        assert sorted(table.column("amount_cents").to_pylist()) == [
+            1100, 1200, 1300, 1400, 1500, 1600, 1700
+        ]
+
+        target = make_state(tmp_path / "target.db", "target")
+        target.db.save_category(Category(name="交通"))
+        target.categories = target.db.get_categories()
+        report = ImportModule(target).import_from_parquet(path)
+        assert (report.imported, report.skipped) == (7, 0)
+        amounts = sorted(
+            r.amount for r in target.db.get_all_records(target.current_user.user_id)
+        )
+        assert amounts == [11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0]
+
+
+class TestImportFormats:
+    """测试JSON/Excel导入和试运行"""
+
+    @staticmethod
+    def target_state(tmp_path):
+        target = make_state(tmp_path / "target.db", "target")
+        target.db.save_category(Category(name="交通"))
+        target.categories = target.db.get_categories()
+        return target
+
+    def test_iter_json_array_across_chunks(self):
+        """测试5：元素跨越读取块边界时仍能逐个解析"""
+        text = json.dumps(
+            {
+                "user": {"username": "records"},
+                "records": [{"note": "a ] , {", "amount": i} for i in range(50)],
+                "summary": {},
+            },
+            indent=2,
+        )
+        items = list(iter_json_array(io.StringIO(text), "records", chunk_size=7))
+        assert [item["amount"] for item in items] == list(range(50))
+        assert items[0]["note"] == "a ] , {"
+
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO('{"records": [{"a": 1},'), "records", 7))
+
+    @pytest.mark.parametrize("export_name", ["json", "excel"])
+    def test_round_trip(self, source_state, tmp_path, export_name):
+        """测试6：JSON和Excel导出文件可以按后缀导入，日期保留时刻"""
+        if export_name == "excel":
+            pytest.importorskip("openpyxl")
+        export = getattr(ExportModule(source_state), f"export_to_{export_name}")
+        success, path = export("records")
+        assert success
+
+        target = self.target_state(tmp_path)
+        report = ImportModule(target).import_file(path)
+        assert report.success, report.error
+        assert (report.imported, report.skipped) == (7, 0)
+        assert report.rows_per_second > 0
+        assert sorted(r.amount for r in target.records) == [
+            11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0
+        ]
+        assert sorted(r.date for r in target.records) == sorted(
+            r.date for r in source_state.db.get_all_records(source_state.current_user.user_id)
+        )
+
+    def test_dry_run_does_not_write(self, source_state, tmp_path):
+        """测试7：试运行只校验，不写入数据库"""
+        success, path = ExportModule(source_state).export_to_csv("records", "gzip")
+        target = self.target_state(tmp_path)
+        report = ImportModule(target).import_file(path, dry_run=True)
+        assert (report.imported, report.skipped) == (7, 0)
+        assert report.summary().startswith("校验通过 7 条记录")
+        assert target.db.get_all_records(target.current_user.user_id) == []
+
+    def test_unsupported_format(self, source_state, tmp_path):
+        """测试8：不支持的文件格式返回错误"""
+        path = tmp_path / "records.txt"
+        path.write_text("")
+        assert not ImportModule(source_state).import_file(path).success
+
+
+class TestStatementImport:
+    """测试银行账单导入去重"""
+
+    @staticmethod
+    def write_statement(path, rows):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["交易日期", "交易金额", "摘要"])
+            writer.writerows(rows)
+
+    def test_overlapping_statements(self, source_state, tmp_path):
+        """测试9：重叠的账单只导入新交易，同一天的相同交易按次数保留"""
+        category_id = source_state.categories[0].category_id
+        importer = ImportModule(source_state)
+        first = tmp_path / "march.csv"
+        self.write_statement(
+            first,
+            [
+                ["2024/03/01", "-25.00", "地铁"],
+                ["2024/03/01", "-25.00", "地铁"],
+                ["2024/03/02", "1,200.00", "工资"],
+            ],
+        )
+        report = importer.import_statement(first, category_id)
+        assert (report.imported, report.duplicates, report.conflicts) == (3, 0, 0)
+        records = source_state.db.get_all_records(source_state.current_user.user_id)
+        salary = [r for r in records if r.note == "工资"]
+        assert salary[0].record_type == "income" and salary[0].amount == 1200.0
+
+        second = tmp_path / "march_again.csv"
+        self.write_statement(
+            second,
+            [
+                ["2024-03-01", "-25", "  地铁 "],
+                ["2024-03-01", "-25", "地铁"],
+                ["2024-03-01", "-25", "地铁"],
+                ["2024-03-02", "1200", "奖金"],
+                ["2024-03-03", "-8", "咖啡"],
+            ],
+        )
+        report = importer.import_statement(second, category_id, dry_run=True)
+        assert (report.imported, report.duplicates, report.conflicts) == (2, 2, 1)
+        assert "跳过 2 条重复记录" in report.summary()
+
+        report = importer.import_statement(second, category_id)
+        assert (report.imported, report.duplicates, report.conflicts) == (2, 2, 1)
+        report = importer.import_statement(second, category_id)
+        assert (report.imported, report.duplicates, report.conflicts) == (0, 4, 1)
+
+    def test_missing_columns(self, source_state, tmp_path):
+        """测试10：缺少日期或金额列时返回错误"""
+        path = tmp_path / "statement.csv"
+        path.write_text("摘要\n地铁\n", encoding="utf-8")
+        report = ImportModule(source_state).import_statement(path, 1)
+        assert not report.success
+
+    def test_unusual_expenses_flagged(self, source_state, tmp_path):
+        """测试11：导入时按分类历史一次性为整批打分，异常支出列入结果"""
+        category_id = source_state.categories[0].category_id
+        source_state.anomaly_detector.load(source_state.current_user.user_id)
+        importer = ImportModule(source_state)
+        history = tmp_path / "history.csv"
+        self.write_statement(
+            history,
+            [[f"2024/04/{day:02d}", f"-{20 + day % 3}.00", "午餐"] for day in range(1, 11)],
+        )
+        report = importer.import_statement(history, category_id)
+        assert (report.imported, report.anomalies) == (10, 0)
+
+        statement = tmp_path / "may.csv"
+        self.write_statement(
+            statement,
+            [
+                ["2024/05/01", "-21.00", "午餐"],
+                ["2024/05/02", "-480.00", "聚餐"],
+                ["2024/05/03", "3000.00", "工资"],
+            ],
+        )
+        report = importer.import_statement(statement, category_id, dry_run=True)
+        assert report.anomalies == 1
+        assert [r.amount for r in report.anomaly_records] == [480.0]
+        assert "1 条支出金额异常: 2024-05-02 ¥480.00" in report.summary()
+
+    def test_logout_during_import_stops(self, source_state, tmp_path, monkeypatch):
+        """测试12：导入中途退出登录时中止，不报属性错误也不改动统计"""
+        monkeypatch.setattr("models.importer.IMPORT_BATCH_SIZE", 2)
+        category_id = source_state.categories[0].category_id
+        source_state.anomaly_detector.load(source_state.current_user.user_id)
+        path = tmp_path / "statement.csv"
+        self.write_statement(
+            path, [[f"2024/07/{day:02d}", "-30.00", f"第{day}笔"] for day in range(1, 7)]
+        )
+
+        insert_records = source_state.db.insert_records
+
+        def insert_then_logout(records):
+            inserted = insert_records(records)
+            source_state.clear_user_data()
+            return inserted
+
+        monkeypatch.setattr(source_state.db, "insert_records", insert_then_logout)
+        report = ImportModule(source_state).import_statement(path, category_id)
+        assert not report.success
+        assert "退出登录" in report.error
+        # 只写入了退出前的第一批
+        assert report.imported == 2
+        assert source_state.anomaly_detector.stats == {}
+
+    def test_import_updates_loaded_records_in_place(self, source_state, tmp_path, monkeypatch):
+        """测试13：导入后内存记录增量更新并保持日期降序，不重新读取全部历史"""
+        monkeypatch.setattr("models.importer.IMPORT_BATCH_SIZE", 2)
+        category_id = source_state.categories[0].category_id
+        source_state.records = source_state.db.get_records(source_state.current_user.user_id)
+        path = tmp_path / "statement.csv"
+        self.write_statement(
+            path, [[f"2024/06/{day:02d}", "-30.00", f"第{day}笔"] for day in (5, 1, 9, 3)]
+        )
+
+        get_records = Mock(side_effect=source_state.db.get_records)
+        monkeypatch.setattr(source_state.db, "get_records", get_records)
+        report = ImportModule(source_state).import_statement(path, category_id)
+        assert report.success
+        get_records.assert_not_called()
+
+        loaded = [(r.record_id, r.date) for r in source_state.records]
+        assert loaded == sorted(loaded, key=lambda item: item[1], reverse=True)
+        stored = source_state.db.get_all_records(source_state.current_user.user_id)
+        assert sorted(loaded) == sorted((r.record_id, r.date) for r in stored)
@@ -0,0 +1,27 @@
+# tests/unit/test_lru_cache.py
+"""
+LRUCache 单元测试
+"""
+
+from models.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    """测试有界 LRU 缓存"""
+
+    def test_reuse_and_eviction(self):
+        """测试1：命中时复用对象，超出容量时淘汰最久未使用的条目"""
+        cache = LRUCache(maxsize=2)
+        first = cache.get_or_create((1, "v1"), object)
+        assert cache.get_or_create((1, "v1"), object) is first
+        cache.get_or_create((2, "v1"), object)
+        cache.get_or_create((1, "v1"), object)  # 访问后变为最近使用
+        cache.get_or_create((3, "v1"), object)
+
+        assert (1, "v1") in cache
+        assert (2, "v1") not in cache
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (2, 3)
+
+        # 记录更新后键变化，会重新构建
+        assert cache.get_or_create((1, "v2"), object) is not first
@@ -0,0 +1,78 @@
+# tests/unit/test_record_filter.py
+"""
+RecordFilterEngine 单元测试
+"""
+
+from datetime import date, datetime
+
+from models.record import Record
+from models.record_filter import FilterCriteria, RecordFilterEngine
+
+
+def make_records():
+    notes = ["coffee", "coffee beans", "cola", "salary"]
+    return [
+        Record(
+            record_id=i + 1,
+            amount=10.0 + i,
+            date=datetime(2024, 5, i + 1),
+            record_type="income" if note == "salary" else "expense",
+            note=note,
+            category_id=1,
+        )
+        for i, note in enumerate(notes)
+    ]
+
+
+class TestFilterCriteria:
+    """测试条件细化判断"""
+
+    def test_is_refinement_of(self):
+        """测试1：更长的搜索词、更窄的类型和时间段属于细化"""
+        base = FilterCriteria(search_text="cof")
+        assert FilterCriteria(search_text="coffee").is_refinement_of(base)
+        assert FilterCriteria(record_type="expense", search_text="cof").is_refinement_of(base)
+        assert not FilterCriteria(search_text="co").is_refinement_of(base)
+
+        month = FilterCriteria(start_date=date(2024, 5, 1), end_date=date(2024, 5, 31))
+        today = FilterCriteria(start_date=date(2024, 5, 20), end_date=date(2024, 5, 20))
+        assert today.is_refinement_of(month)
+        assert not month.is_refinement_of(today)
+        assert not FilterCriteria().is_refinement_of(month)
+
+
+class TestRecordFilterEngine:
+    """测试增量筛选"""
+
+    def test_refinement_filters_remembered_results(self):
+        """测试2：细化只在记住的结果中筛选，放宽或数据变化时交回数据库"""
+        records = make_records()
+        engine = RecordFilterEngine(lambda category_id: "Food")
+        key = (1, 1)
+
+        engine.remember(key, FilterCriteria(search_text="co"), records[:3])
+        result = engine.narrow(FilterCriteria(search_text="coffee"), key)
+        assert [r.note for r in result] == ["coffee", "coffee beans"]
+        result = engine.narrow(
+            FilterCriteria(record_type="expense", search_text="coffee b"), key
+        )
+        assert [r.note for r in result] == ["coffee beans"]
+        result = engine.narrow(
+            FilterCriteria(record_type="expense", search_text="coffee b", max_amount=10.0),
+            key,
+        )
+        assert result == []
+
+        assert engine.narrow(FilterCriteria(search_text="cof"), key) is None
+        assert engine.narrow(FilterCriteria(search_text="coffee beans"), (1, 2)) is None
+
+        # 分类名称在内存细化时同样参与匹配
+        engine.remember(key, FilterCriteria(), records)
+        assert len(engine.narrow(FilterCriteria(search_text="food"), key)) == 4
+
+    def test_large_results_are_not_remembered(self):
+        """测试3：结果超过上限时不记住，之后的细化仍交给数据库"""
+        records = make_records()
+        engine = RecordFilterEngine(lambda category_id: "", max_results=3)
+        engine.remember(1, FilterCriteria(), records)
+        assert engine.narrow(FilterCriteria(record_type="expense"), 1) is None
@@ -0,0 +1,238 @@
+# tests/unit/test_records_view.py
+"""
+RecordsView 虚拟列表与搜索防抖单元测试
+"""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from models.category import Category
+from models.record import Record
+from models.user import User
+from views.records import (
+    RECORD_ITEM_EXTENT,
+    RECORDS_OVERSCAN,
+    RECORDS_PAGE_SIZE,
+    RECORDS_VIEWPORT_HEIGHT,
+    RecordsView,
+)
+
+# 超过筛选引擎记住的上限，走分页读取
+TOTAL = 3000
+
+
+class StubDB:
+    """按条件返回固定结果的数据库桩，记录分页查询"""
+
+    def __init__(self, records):
+        self.records = records
+        self.queries = 0
+        self.page_queries = []
+
+    def count_records(self, user_id, criteria):
+        return len(self.matching(criteria))
+
+    def query_records(self, user_id, criteria, limit=None, offset=0):
+        self.queries += 1
+        records = self.matching(criteria)
+        if limit is None:
+            return records
+        self.page_queries.append(offset)
+        return records[offset : offset + limit]
+
+    def query_record_ids(self, user_id, criteria):
+        return [r.record_id for r in self.matching(criteria)]
+
+    def get_running_balances(self, user_id, record_ids):
+        return {record_id: 0.0 for record_id in record_ids}
+
+    def matching(self, criteria):
+        return [r for r in self.records if criteria.search_text in r.note]
+
+
+@pytest.fixture
+def records():
+    start = datetime(2024, 1, 1)
+    return [
+        Record(
+            record_id=i + 1,
+            amount=10.0,
+            date=start - timedelta(hours=i),
+            record_type="expense",
+            note=f"note {i}",
+            category_id=1,
+            user_id=1,
+        )
+        for i in range(TOTAL)
+    ]
+
+
+@pytest.fixture
+def view(records):
+    """使用桩数据库和模拟页面的记录视图"""
+    state = Mock()
+    state.db = StubDB(records)
+    state.current_user = User(user_id=1, username="u", password_hash="h", email="e")
+    state.data_version = 0
+    state.get_category_by_id.return_value = None
+    state.page = Mock()
+    state.page.theme_mode = None
+    state.page.run_thread = Mock(side_effect=lambda handler, *args: handler(*args))
+    records_view = RecordsView(state, Mock())
+    records_view.records_list.update = Mock()
+    return records_view
+
+
+def scroll(view, pixels):
+    view.on_records_scroll(Mock(pixels=pixels, viewport_dimension=RECORDS_VIEWPORT_HEIGHT))
+
+
+class TestRecordsWindow:
+    """测试卡片窗口随滚动移动"""
+
+    def test_first_screen(self, view):
+        """测试1：首屏只构建可见行和下方预留行，其余行由占位容器撑开"""
+        visible = RECORDS_VIEWPORT_HEIGHT // RECORD_ITEM_EXTENT
+        assert (view.window_start, view.window_end) == (0, visible + RECORDS_OVERSCAN)
+        assert len(view.records_list.controls) == view.window_end + 2
+        assert view.top_spacer.height == 0
+        assert view.bottom_spacer.height == (TOTAL - view.window_end) * RECORD_ITEM_EXTENT
+        # 结果较多时只读取了第一页
+        assert sorted(view.record_pages) == [0]
+
+    def test_visible_rows_clamped(self, view):
+        """测试2：可见行区间限制在结果范围内"""
+        assert view.get_visible_rows(0, 560) == (0, 7)
+        assert view.get_visible_rows(100, 560) == (1, 9)
+        assert view.get_visible_rows(TOTAL * RECORD_ITEM_EXTENT, 560) == (TOTAL, TOTAL)
+
+    def test_small_scroll_keeps_window(self, view):
+        """测试3：可见行离窗口边缘较远时不重建"""
+        controls = list(view.records_list.controls)
+        scroll(view, RECORD_ITEM_EXTENT)
+        assert view.records_list.controls == controls
+        view.records_list.update.assert_not_called()
+
+    def test_window_size_independent_of_scroll_depth(self, view, records):
+        """测试4：滚动到底部时卡片数和已保留的数据页数不随记录数增长"""
+        for pixels in range(0, TOTAL * RECORD_ITEM_EXTENT, 300):
+            scroll(view, pixels)
+            assert view.window_end - view.window_start <= 2 * RECORDS_OVERSCAN + 9
+            assert len(view.record_pages) <= 2
+            expected = records[view.window_start : view.window_end]
+            assert view.window_records == expected
+            assert (
+                view.top_spacer.height + view.bottom_spacer.height
+                == (TOTAL - len(expected)) * RECORD_ITEM_EXTENT
+            )
+
+        assert view.window_end == TOTAL
+        assert view.bottom_spacer.height == 0
+        # 每页只从数据库读取一次
+        assert sorted(view.state.db.page_queries) == list(
+            range(0, TOTAL, RECORDS_PAGE_SIZE)
+        )
+
+    def test_scroll_back_reloads_dropped_page(self, view, records):
+        """测试5：滚回已释放的区域时重新读取对应的页"""
+        scroll(view, (TOTAL - 10) * RECORD_ITEM_EXTENT)
+        assert 0 not in view.record_pages
+        scroll(view, 0)
+        assert view.window_start == 0
+        assert view.window_records == records[: view.window_end]
+        assert view.state.db.page_queries.count(0) == 2
+
+    def test_small_result_kept_in_memory(self, view):
+        """测试6：结果不多时一次读完，滚动不再查询数据库"""
+        view.search_text = "note 1"
+        view.load_records()
+        assert view.fully_loaded
+        queries = len(view.state.db.page_queries)
+        scroll(view, view.total_count * RECORD_ITEM_EXTENT)
+        assert view.window_end == view.total_count
+        assert len(view.state.db.page_queries) == queries
+
+    def test_select_all_reads_ids_only(self, view, records):
+        """测试7：结果未全部加载时全选只查询ID，不读取完整记录"""
+        view.refresh_selection = Mock()
+        queries = view.state.db.queries
+        view.select_all_records(None)
+        assert view.selected_ids == {r.record_id for r in records}
+        assert view.state.db.queries == queries
+
+
+class TestRecordCardCache:
+    """测试记录卡片复用"""
+
+    def test_card_rebuilt_when_label_inputs_change(self, view, records, monkeypatch):
+        """测试8：分类名或相对日期文字变化后重建卡片"""
+        record = records[0]
+        card = view.get_record_card(record, 1.0)
+        assert view.get_record_card(record, 1.0) is card
+
+        view.state.get_category_by_id.return_value = Category(category_id=1, name="餐饮")
+        renamed = view.get_record_card(record, 1.0)
+        assert renamed is not card
+        assert view.get_record_card(record, 1.0) is renamed
+
+        # 跨过午夜后“今天”变为“昨天”
+        monkeypatch.setattr(RecordsView, "get_date_label", staticmethod(lambda value: "昨天"))
+        assert view.get_record_card(record, 1.0) is not renamed
+
+
+class TestSearchDebounce:
+    """测试搜索防抖与过期结果丢弃"""
+
+    def test_stale_generation_not_rendered(self, view):
+        """测试9：搜索版本号已变化时结果不渲染"""
+        view.search_text = "note 7"
+        stale = view.cancel_pending_search()
+        view.cancel_pending_search()
+        view.run_search(stale)
+        assert view.total_count == TOTAL
+
+        view.run_search(view.search_generation)
+        assert view.total_count == len(view.state.db.matching(view.get_filter_criteria()))
+
+    def test_cancelled_during_count(self, view):
+        """测试10：计数后发现版本号变化时中止查询"""
+        count_records = view.state.db.count_records
+
+        def count_then_type(user_id, criteria):
+            view.cancel_pending_search()
+            return count_records(user_id, criteria)
+
+        view.state.db.count_records = count_then_type
+        view.search_text = "note 12"
+        generation = view.search_generation
+        queries = view.state.db.queries
+        view.run_search(generation)
+        assert view.total_count == TOTAL
+        assert view.state.db.queries == queries
+
+    def test_rapid_typing_renders_last_query_once(self, view, monkeypatch):
+        """测试11：连续输入只在停顿后执行最后一次查询"""
+        monkeypatch.setattr("views.records.SEARCH_DEBOUNCE_SECONDS", 0.05)
+        searched = []
+        get_filtered_records = view.get_filtered_records
+
+        def record_search(is_cancelled=None):
+            searched.append(view.search_text)
+            return get_filtered_records(is_cancelled)
+
+        view.get_filtered_records = record_search
+        for text in ["n", "no", "note 99"]:
+            view.on_search_change(Mock(control=Mock(value=text)))
+        deadline = time.time() + 2
+        while not searched and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        assert searched == ["note 99"]
+        # 防抖到期后经页面线程执行搜索
+        view.page.run_thread.assert_called_once_with(view.run_search, view.search_generation)
+        assert view.total_count == len(view.state.db.matching(view.get_filter_criteria()))
+
@@ -0,0 +1,104 @@
+# tests/unit/test_recurring.py
+"""
+RecurringDetector / RecurringScheduler 单元测试
+"""
+
+import time
+from datetime import date, datetime
+
+from models.record import Record
+from models.recurring import (
+    RecurringDetector,
+    RecurringRule,
+    RecurringScheduler,
+    advance_date,
+)
+
+
+def make_record(on_date, amount=3000.0, note="房租 3月", category_id=2):
+    return Record(
+        amount=amount,
+        date=datetime.combine(on_date, datetime.min.time()),
+        record_type="expense",
+        note=note,
+        category_id=category_id,
+        user_id=1,
+    )
+
+
+class TestRecurringDetector:
+    """测试定期交易检测"""
+
+    def test_detects_monthly_rule(self):
+        """测试1：按月出现的相同支出被识别，随机支出被忽略"""
+        records = [
+            make_record(date(2024, month, 5), note=f"房租 {month}月")
+            for month in range(1, 7)
+        ]
+        records += [
+            make_record(date(2024, 1, d), amount=a, note="午饭", category_id=1)
+            for d, a in [(3, 20.0), (9, 20.0), (27, 20.0)]
+        ]
+        records.sort(key=lambda r: r.date)
+
+        proposals = RecurringDetector().detect(records, today=date(2024, 6, 20))
+        assert len(proposals) == 1
+        rule = proposals[0]
+        assert rule.frequency == "monthly"
+        assert rule.occurrences == 6
+        assert rule.next_date == date(2024, 7, 5)
+
+        # 已有规则和早已停止的交易不再提示
+        assert RecurringDetector().detect(records, today=date(2024, 6, 20), existing_rules=[rule]) == []
+        assert RecurringDetector().detect(records, today=date(2025, 1, 1)) == []
+
+    def test_advance_date_clamps_month_end(self):
+        """测试2：锚定日在短月份自动截断"""
+        assert advance_date(date(2024, 1, 31), "monthly", 31) == date(2024, 2, 29)
+        assert advance_date(date(2024, 2, 29), "monthly", 31) == date(2024, 3, 31)
+        assert advance_date(date(2024, 2, 29), "yearly") == date(2025, 2, 28)
+
+
+class TestRecurringScheduler:
+    """测试到期记录生成"""
+
+    def test_collect_due_catches_up(self):
+        """测试3：补生成所有错过的记录并推进下次日期"""
+        rules = [
+            RecurringRule(rule_id=1, amount=50.0, frequency="weekly", next_date=date(2024, 3, 1)),
+            RecurringRule(rule_id=2, amount=9.0, frequency="monthly", next_date=date(2024, 4, 1)),
+            RecurringRule(rule_id=3, amount=9.0, next_date=date(2024, 1, 1), is_active=False),
+        ]
+        records, next_dates = RecurringScheduler.collect_due(rules, date(2024, 3, 20))
+        assert [r.date.date() for r in records] == [
+            date(2024, 3, 1),
+            date(2024, 3, 8),
+            date(2024, 3, 15),
+        ]
+        assert next_dates == {1: date(2024, 3, 22)}
+
+    def test_stop_during_tick_does_not_rearm(self):
+        """测试4：检查执行期间调用 stop() 后不再续期，也不会遗留定时器"""
+        calls = []
+
+        class StubDB:
+            def get_recurring_rules(self, user_id):
+                calls.append(user_id)
+                # 模拟检查执行期间用户退出
+                scheduler.stop()
+                return [RecurringRule(rule_id=1, amount=5.0, next_date=date(2024, 1, 1))]
+
+            def apply_recurring_schedule(self, records, next_dates):
+                return True
+
+        generated = []
+        scheduler = RecurringScheduler(StubDB(), interval_seconds=0.01)
+        scheduler.start(7, lambda user_id, records: generated.append(user_id))
+        deadline = time.time() + 2
+        while not calls and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        assert calls == [7]
+        assert generated == [7]
+        assert scheduler._timer is None
@@ -357,7 +357,22 @@ class AddRecordView(ft.View):
             )
 
             if self.state.add_record(record):
-                self.show_snackbar("记录保存成功", "success")
+                warnings = []
+                exceeded = self.get_exceeded_budget_names(record)
+                if exceeded:
+                    warnings.append(f"已超出预算：{'、'.join(exceeded)}")
+                anomaly = self.state.last_anomaly
+                if anomaly:
+                    category = self.state.get_category_by_id(anomaly.category_id)
+                    category_name = category.name if category else "该分类"
+                    warnings.append(
+                        f"该笔支出明显高于{category_name}的平常水平（平均 ¥{anomaly.mean:.2f}）"
+                    )
+
+                if warnings:
+                    self.show_snackbar(f"记录保存成功，但{'；'.join(warnings)}", "error")
+                else:
+                    self.show_snackbar("记录保存成功", "success")
                 self.go("/dashboard")
             else:
                 self.show_snackbar("保存失败", "error")
@@ -367,6 +382,20 @@ class AddRecordView(ft.View):
         except Exception as ex:
             self.show_snackbar(f"保存失败: {ex}", "error")
 
+    def get_exceeded_budget_names(self, record: Record) -> list:
+        """获取与该记录相关的超支预算名称"""
+        if record.record_type != "expense":
+            return []
+
+        names = []
+        for status in self.state.budget_alerts:
+            if status.budget.is_overall:
+                names.append("月度总预算")
+            elif status.budget.category_id == record.category_id:
+                category = self.state.get_category_by_id(record.category_id)
+                names.append(category.name if category else "未知分类")
+        return names
+
     def handle_logout(self, e):
         """处理登出"""
         self.state.clear_user_data()
@@ -3,10 +3,11 @@ Dashboard for ui
 """
 
 from datetime import datetime
+from typing import Optional
 
 import flet as ft
 
-from components.cards import create_stat_card
+from components.cards import create_budget_list, create_stat_card
 from components.sidebar import Sidebar
 
 
@@ -18,8 +19,16 @@ class DashboardView(ft.View):
         self.state = state
         self.go = go
         self.page = state.page
+        # 仪表板数据快照，一次读事务获取，整个页面只从它渲染
+        self.snapshot = self.load_snapshot()
         self.controls = [self.create_dashboard_layout()]
 
+    def load_snapshot(self) -> Optional[dict]:
+        """加载仪表板数据快照"""
+        if not self.state.current_user:
+            return None
+        return self.state.db.get_dashboard_snapshot(self.state.current_user.user_id)
+
     def create_dashboard_layout(self):
         """创建仪表板布局"""
         # 获取真实统计数据
@@ -159,6 +168,30 @@ class DashboardView(ft.View):
                                     ),
                                     border=ft.border.all(1, ft.Colors.GREY_200),
                                 ),
+                                # 本月预算
+                                ft.Container(
+                                    content=ft.Column(
+                                        [
+                                            ft.Text(
+                                                "本月预算",
+                                                size=16,
+                                                weight=ft.FontWeight.W_600,
+                                            ),
+                                            ft.Container(height=12),
+                                            create_budget_list(
+                                                self.state.get_budget_statuses(),
+                                                self.state,
+                                            ),
+                                        ]
+                                    ),
+                                    bgcolor=ft.Colors.WHITE,
+                                    border_radius=16,
+                                    padding=ft.padding.all(20),
+                                    margin=ft.margin.symmetric(
+                                        horizontal=20, vertical=10
+                                    ),
+                                    border=ft.border.all(1, ft.Colors.GREY_200),
+                                ),
                                 # 最近交易 - 显示真实数据
                                 ft.Container(
                                     content=ft.Column(
@@ -250,21 +283,15 @@ class DashboardView(ft.View):
 
     def get_user_dashboard_stats(self) -> dict:
         """获取用户仪表板统计数据"""
-        if not self.state.current_user:
+        if not self.snapshot:
             return self.get_empty_stats()
 
         try:
-            # 从数据库获取用户余额数据
-            balance_data = self.state.db.get_user_balance(
-                self.state.current_user.user_id
-            )
-
-            total_income = balance_data.get("income", 0)
-            total_expenses = balance_data.get("expense", 0)
-            current_balance = total_income - total_expenses
+            total_income = self.snapshot["income"]
+            total_expenses = self.snapshot["expense"]
+            current_balance = self.snapshot["balance"]
 
-            # 计算变化率（简化版本，实际应该对比上期数据）
-            # 这里使用模拟数据，实际应该从数据库获取上期数据进行对比
+            # 本月与上月对比的变化率
             income_change = self.calculate_change_percentage("income")
             expense_change = self.calculate_change_percentage("expense")
             balance_change = income_change - expense_change
@@ -293,49 +320,10 @@ class DashboardView(ft.View):
         }
 
     def calculate_change_percentage(self, record_type: str) -> float:
-        """计算变化百分比（简化版）"""
+        """计算本月相对上月的变化百分比"""
         try:
-            # 获取当前月和上月的数据
-            from datetime import datetime, timedelta
-
-            now = datetime.now()
-            current_month_start = now.replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-
-            # 获取当前月数据
-            current_records = self.state.db.query(
-                """SELECT SUM(amount) as total FROM records 
-                   WHERE user_id = ? AND record_type = ? AND date >= ?""",
-                (
-                    self.state.current_user.user_id,
-                    record_type,
-                    current_month_start.strftime("%Y-%m-%d"),
-                ),
-            )
-            current_total = (
-                current_records[0]["total"]
-                if current_records and current_records[0]["total"]
-                else 0
-            )
-
-            # 获取上月数据
-            last_records = self.state.db.query(
-                """SELECT SUM(amount) as total FROM records 
-                   WHERE user_id = ? AND record_type = ? AND date >= ? AND date < ?""",
-                (
-                    self.state.current_user.user_id,
-                    record_type,
-                    last_month_start.strftime("%Y-%m-%d"),
-                    current_month_start.strftime("%Y-%m-%d"),
-                ),
-            )
-            last_total = (
-                last_records[0]["total"]
-                if last_records and last_records[0]["total"]
-                else 0
-            )
+            current_total = self.snapshot["current_month"][record_type]
+            last_total = self.snapshot["last_month"][record_type]
 
             # 计算变化百分比
             if last_total == 0:
@@ -350,19 +338,17 @@ class DashboardView(ft.View):
     def create_recent_transactions_list(self):
         """创建最近交易列表"""
         try:
-            if not self.state.current_user:
+            if not self.snapshot:
                 return ft.Container(
                     content=ft.Text("请先登录", text_align=ft.TextAlign.CENTER),
                     alignment=ft.alignment.center,
                     height=200,
                 )
 
-            # 获取最近5条记录
-            records = self.state.db.get_records(
-                self.state.current_user.user_id, limit=5, order_by="date DESC"
-            )
+            # 最近5条记录（已附带分类名称）
+            recent = self.snapshot["recent"]
 
-            if not records:
+            if not recent:
                 return ft.Container(
                     content=ft.Column(
                         [
@@ -389,76 +375,20 @@ class DashboardView(ft.View):
                     height=200,
                 )
 
-            # 创建交易列表
+            # 创建交易列表（复用未修改记录的条目控件）
+            theme = self.page.theme_mode if self.page else None
             transaction_items = []
-            for record in records:
-                # 获取分类信息
-                category = self.state.db.get_category(record.category_id)
-                category_name = category.name if category else "未知分类"
-
-                # 创建交易项
-                transaction_item = ft.Container(
-                    content=ft.Row(
-                        [
-                            # 图标
-                            ft.Container(
-                                content=ft.Icon(
-                                    (
-                                        ft.Icons.ARROW_UPWARD
-                                        if record.record_type == "income"
-                                        else ft.Icons.ARROW_DOWNWARD
-                                    ),
-                                    color=ft.Colors.WHITE,
-                                    size=20,
-                                ),
-                                bgcolor=(
-                                    ft.Colors.GREEN
-                                    if record.record_type == "income"
-                                    else ft.Colors.RED
-                                ),
-                                border_radius=20,
-                                width=40,
-                                height=40,
-                                alignment=ft.alignment.center,
-                            ),
-                            # 交易信息
-                            ft.Column(
-                                [
-                                    ft.Text(
-                                        record.note or category_name,
-                                        size=14,
-                                        weight=ft.FontWeight.W_500,
-                                        color=ft.Colors.GREY_900,
-                                    ),
-                                    ft.Text(
-                                        f"{category_name} • {record.date.strftime('%m月%d日')}",
-                                        size=12,
-                                        color=ft.Colors.GREY_600,
-                                    ),
-                                ],
-                                spacing=2,
-                                expand=True,
-                            ),
-                            # 金额
-                            ft.Text(
-                                f"{'+'if record.record_type == 'income' else '-'}¥{record.amount:.2f}",
-                                size=14,
-                                weight=ft.FontWeight.BOLD,
-                                color=(
-                                    ft.Colors.GREEN
-                                    if record.record_type == "income"
-                                    else ft.Colors.RED
-                                ),
-                            ),
-                        ],
-                        spacing=12,
-                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    ),
-                    padding=ft.padding.symmetric(vertical=8, horizontal=4),
-                    border_radius=8,
-                    ink=True,
+            for item in recent:
+                record, category_name = item["record"], item["category_name"]
+                key = (record.record_id, record.updated_at, theme, category_name)
+                transaction_items.append(
+                    self.state.transaction_item_cache.get_or_create(
+                        key,
+                        lambda record=record, name=category_name: self.create_transaction_item(
+                            record, name
+                        ),
+                    )
                 )
-                transaction_items.append(transaction_item)
 
             return ft.Column(
                 controls=transaction_items,
@@ -474,6 +404,70 @@ class DashboardView(ft.View):
                 height=200,
             )
 
+    def create_transaction_item(self, record, category_name: str) -> ft.Container:
+        """创建最近交易条目"""
+        return ft.Container(
+            content=ft.Row(
+                [
+                    # 图标
+                    ft.Container(
+                        content=ft.Icon(
+                            (
+                                ft.Icons.ARROW_UPWARD
+                                if record.record_type == "income"
+                                else ft.Icons.ARROW_DOWNWARD
+                            ),
+                            color=ft.Colors.WHITE,
+                            size=20,
+                        ),
+                        bgcolor=(
+                            ft.Colors.GREEN
+                            if record.record_type == "income"
+                            else ft.Colors.RED
+                        ),
+                        border_radius=20,
+                        width=40,
+                        height=40,
+                        alignment=ft.alignment.center,
+                    ),
+                    # 交易信息
+                    ft.Column(
+                        [
+                            ft.Text(
+                                record.note or category_name,
+                                size=14,
+                                weight=ft.FontWeight.W_500,
+                                color=ft.Colors.GREY_900,
+                            ),
+                            ft.Text(
+                                f"{category_name} • {record.date.strftime('%m月%d日')}",
+                                size=12,
+                                color=ft.Colors.GREY_600,
+                            ),
+                        ],
+                        spacing=2,
+                        expand=True,
+                    ),
+                    # 金额
+                    ft.Text(
+                        f"{'+'if record.record_type == 'income' else '-'}¥{record.amount:.2f}",
+                        size=14,
+                        weight=ft.FontWeight.BOLD,
+                        color=(
+                            ft.Colors.GREEN
+                            if record.record_type == "income"
+                            else ft.Colors.RED
+                        ),
+                    ),
+                ],
+                spacing=12,
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            padding=ft.padding.symmetric(vertical=8, horizontal=4),
+            border_radius=8,
+            ink=True,
+        )
+
     def handle_logout(self, e):
         """处理登出"""
 
@@ -2,13 +2,29 @@
 RecordsView for ui
 """
 
+import math
+import threading
 from datetime import datetime, timedelta
-from typing import List
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import flet as ft
 
 from components.sidebar import Sidebar
+from models.lru_cache import LRUCache
 from models.record import Record
+from models.record_filter import FilterCriteria, RecordFilterEngine
+
+# 虚拟列表参数：固定行高、可视区高度以及可视区上下各预先构建的行数
+RECORD_ITEM_EXTENT = 80
+RECORDS_VIEWPORT_HEIGHT = 560
+RECORDS_OVERSCAN = 10
+# 缓存的记录卡片数量上限
+RECORD_CARD_CACHE_SIZE = 512
+
+# 搜索防抖延迟（秒）
+SEARCH_DEBOUNCE_SECONDS = 0.3
+# 结果较多时每次从数据库读取的条数
+RECORDS_PAGE_SIZE = 200
 
 
 class RecordsView(ft.View):
@@ -25,6 +41,32 @@ class RecordsView(ft.View):
         self.current_period = "all"
         self.search_text = ""
 
+        # 虚拟列表状态：筛选条件、结果总数及按页保存的已读取结果。
+        # 结果较多时只保留窗口所在的页；窗口为已构建卡片的区间 [start, end)，
+        # 窗口外的行由上下两个占位容器按行高撑开
+        self.loaded_criteria = FilterCriteria()
+        self.total_count = 0
+        self.fully_loaded = True
+        self.record_pages: Dict[int, List[Record]] = {}
+        self.window_start = 0
+        self.window_end = 0
+        self.window_records: List[Record] = []
+        self.top_spacer = ft.Container(height=0)
+        self.bottom_spacer = ft.Container(height=0)
+
+        # 搜索状态：每次新查询递增版本号，旧版本的结果一律丢弃
+        self.search_generation = 0
+        self.search_timer: Optional[threading.Timer] = None
+        self.render_lock = threading.Lock()
+        # 筛选引擎由页面事件线程和搜索任务共用
+        self.filter_engine = RecordFilterEngine(self.get_category_name)
+        self.filter_lock = threading.Lock()
+        # 多选状态
+        self.selection_mode = False
+        self.selected_ids: Set[int] = set()
+        # 已构建的记录卡片，重新筛选时复用未修改记录的卡片
+        self.card_cache: LRUCache[ft.Container] = LRUCache(RECORD_CARD_CACHE_SIZE)
+
         # 筛选组件引用
         self.search_field = None
         self.filter_dropdown = None
@@ -73,9 +115,53 @@ class RecordsView(ft.View):
             on_change=self.on_date_change,
         )
 
-        # 记录列表
-        self.records_list = ft.Column(
-            [], spacing=8, expand=True, scroll=ft.ScrollMode.AUTO
+        # 批量操作栏，多选模式下显示
+        self.selected_count_text = ft.Text("已选择 0 条", size=14, color=ft.Colors.GREY_700)
+        self.bulk_bar = ft.Container(
+            content=ft.Row(
+                [
+                    self.selected_count_text,
+                    ft.Row(
+                        [
+                            ft.TextButton("全选", on_click=self.select_all_records),
+                            ft.TextButton(
+                                "修改分类",
+                                icon=ft.Icons.CATEGORY,
+                                on_click=self.show_bulk_category_dialog,
+                            ),
+                            ft.TextButton(
+                                "修改类型",
+                                icon=ft.Icons.SWAP_VERT,
+                                on_click=self.show_bulk_type_dialog,
+                            ),
+                            ft.TextButton(
+                                "删除",
+                                icon=ft.Icons.DELETE,
+                                style=ft.ButtonStyle(color=ft.Colors.RED),
+                                on_click=self.confirm_bulk_delete,
+                            ),
+                            ft.TextButton("取消", on_click=self.toggle_selection_mode),
+                        ],
+                        spacing=4,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            bgcolor=ft.Colors.BLUE_50,
+            border_radius=8,
+            padding=ft.padding.symmetric(horizontal=12, vertical=4),
+            margin=ft.margin.only(bottom=8),
+            visible=False,
+        )
+
+        # 记录列表：固定行高的虚拟列表，只构建可视区附近的卡片
+        self.records_count_text = ft.Text("", size=14, color=ft.Colors.GREY_600)
+        self.records_list = ft.ListView(
+            [],
+            spacing=0,
+            height=RECORDS_VIEWPORT_HEIGHT,
+            on_scroll_interval=50,
+            on_scroll=self.on_records_scroll,
         )
 
         # 加载记录
@@ -104,6 +190,16 @@ class RecordsView(ft.View):
                                                     ),
                                                     ft.Row(
                                                         [
+                                                            ft.OutlinedButton(
+                                                                text="多选",
+                                                                icon=ft.Icons.CHECKLIST,
+                                                                style=ft.ButtonStyle(
+                                                                    shape=ft.RoundedRectangleBorder(
+                                                                        radius=8
+                                                                    ),
+                                                                ),
+                                                                on_click=self.toggle_selection_mode,
+                                                            ),
                                                             ft.ElevatedButton(
                                                                 text="导出",
                                                                 icon=ft.Icons.DOWNLOAD,
@@ -175,15 +271,12 @@ class RecordsView(ft.View):
                                                         size=16,
                                                         weight=ft.FontWeight.W_600,
                                                     ),
-                                                    ft.Text(
-                                                        f"{len(self.get_filtered_records())} 条记录",
-                                                        size=14,
-                                                        color=ft.Colors.GREY_600,
-                                                    ),
+                                                    self.records_count_text,
                                                 ],
                                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                             ),
                                             ft.Container(height=16),
+                                            self.bulk_bar,
                                             self.records_list,
                                         ]
                                     ),
@@ -235,62 +328,64 @@ class RecordsView(ft.View):
             padding=ft.padding.symmetric(horizontal=30, vertical=20),
         )
 
-    def get_user_records(self) -> List[Record]:
-        """获取用户记录"""
-        if self.state.current_user:
-            return self.state.records.copy()
-        return []
-
-    def get_filtered_records(self) -> List[Record]:
-        """获取筛选后的记录"""
-        all_records = self.get_user_records()
-        if not all_records:
-            return []
-
-        filtered_records = all_records.copy()
-
-        # 1. 按记录类型筛选
-        if self.current_filter != "all":
-            filtered_records = [
-                record
-                for record in filtered_records
-                if record.record_type == self.current_filter
-            ]
-
-        # 2. 按时间段筛选
-        if self.current_period != "all":
-            date_range = self.get_date_range(self.current_period)
-            if date_range:
-                start_date, end_date = date_range
-                filtered_records = [
-                    record
-                    for record in filtered_records
-                    if start_date <= record.date.date() <= end_date
-                ]
-
-        # 3. 按搜索关键词筛选
-        if self.search_text.strip():
-            search_lower = self.search_text.lower().strip()
-            res = []
-
-            for record in filtered_records:
-                # 获取分类名称
-                category = self.state.get_category_by_id(record.category_id)
-                category_name = category.name if category else ""
+    def get_filter_criteria(self) -> FilterCriteria:
+        """根据筛选控件的状态生成筛选条件"""
+        start_date, end_date = self.get_date_range(self.current_period) or (None, None)
+        return FilterCriteria(
+            record_type=self.current_filter,
+            start_date=start_date,
+            end_date=end_date,
+            search_text=self.search_text,
+        )
 
-                # 搜索条件：金额、备注、分类名称
-                if (
-                    search_lower in str(record.amount)
-                    or search_lower in record.note.lower()
-                    or search_lower in category_name.lower()
-                ):
-                    res.append(record)
+    def get_filtered_records(
+        self, is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[Tuple[FilterCriteria, List[Record], int]]:
+        """获取筛选后的记录
+
+        筛选、排序和分页由数据库完成。结果不多时一次读完并交给筛选引擎记住，
+        之后的细化条件直接在内存中筛选；结果较多时只读取第一页。
+
+        Args:
+            is_cancelled: 返回True时中止计算，此时本方法返回None
+
+        Returns:
+            (筛选条件, 已读取的记录, 记录总数)
+        """
+        criteria = self.get_filter_criteria()
+        if not self.state.current_user:
+            return criteria, [], 0
+
+        user_id = self.state.current_user.user_id
+        source_key = (user_id, self.state.data_version)
+        with self.filter_lock:
+            narrowed = self.filter_engine.narrow(criteria, source_key)
+        if narrowed is not None:
+            return criteria, narrowed, len(narrowed)
+
+        total = self.state.db.count_records(user_id, criteria)
+        if is_cancelled and is_cancelled():
+            return None
+
+        if total <= self.filter_engine.max_results:
+            records = self.state.db.query_records(user_id, criteria)
+            with self.filter_lock:
+                self.filter_engine.remember(source_key, criteria, records)
+        else:
+            records = self.state.db.query_records(
+                user_id, criteria, limit=RECORDS_PAGE_SIZE
+            )
+            with self.filter_lock:
+                self.filter_engine.reset()
 
-            filtered_records = res
+        if is_cancelled and is_cancelled():
+            return None
+        return criteria, records, total
 
-        # 按日期降序排序
-        filtered_records.sort(key=lambda x: x.date, reverse=True)
-        return filtered_records
+    def get_category_name(self, category_id: int) -> str:
+        """获取分类名称，未知分类返回空字符串"""
+        category = self.state.get_category_by_id(category_id)
+        return category.name if category else ""
 
     def get_date_range(self, period: str):
         """获取日期范围"""
@@ -311,12 +406,31 @@ class RecordsView(ft.View):
         return None
 
     def load_records(self):
-        """加载记录列表"""
-        filtered_records = self.get_filtered_records()
+        """加载记录列表（同步执行，并取消尚未完成的搜索）"""
+        self.cancel_pending_search()
+        self.show_records(*self.get_filtered_records())
+
+    def show_records(self, criteria: FilterCriteria, records: List[Record], total: int):
+        """渲染筛选结果"""
+        with self.render_lock:
+            self.render_records(criteria, records, total)
+
+    def render_records(self, criteria: FilterCriteria, records: List[Record], total: int):
+        """重建虚拟列表的首屏内容"""
+        self.loaded_criteria = criteria
+        self.total_count = total
+        self.fully_loaded = len(records) >= total
+        self.record_pages = {
+            offset // RECORDS_PAGE_SIZE: records[offset : offset + RECORDS_PAGE_SIZE]
+            for offset in range(0, len(records), RECORDS_PAGE_SIZE)
+        }
+        self.window_start = self.window_end = 0
+        self.window_records = []
 
         self.records_list.controls.clear()
+        self.records_count_text.value = f"{self.total_count} 条记录"
 
-        if not filtered_records:
+        if not records:
             # 显示无记录消息
             empty_message = self.get_empty_message()
             self.records_list.controls.append(
@@ -341,14 +455,88 @@ class RecordsView(ft.View):
                 )
             )
         else:
-            # 显示记录卡片
-            for record in filtered_records:
-                record_card = self.create_record_card(record)
-                self.records_list.controls.append(record_card)
+            # 只构建首屏及预留的卡片，其余行由占位容器撑开，滚动时移动窗口
+            self.records_list.controls.extend([self.top_spacer, self.bottom_spacer])
+            self.render_window(*self.get_visible_rows(0, RECORDS_VIEWPORT_HEIGHT), force=True)
 
         if self.page:
             self.page.update()
 
+    def get_visible_rows(self, pixels: float, viewport: float) -> Tuple[int, int]:
+        """滚动位置对应的可见行区间 [first, last)"""
+        first = min(self.total_count, max(0, int(pixels // RECORD_ITEM_EXTENT)))
+        last = min(self.total_count, math.ceil((pixels + viewport) / RECORD_ITEM_EXTENT))
+        return first, max(first, last)
+
+    def window_needs_shift(self, first: int, last: int) -> bool:
+        """可见行距离窗口边缘不足一半预留行数时需要移动窗口"""
+        margin = RECORDS_OVERSCAN // 2
+        return (self.window_start > 0 and first - margin < self.window_start) or (
+            self.window_end < self.total_count and last + margin > self.window_end
+        )
+
+    def render_window(self, first: int, last: int, force: bool = False) -> bool:
+        """
+        将卡片窗口移动到可见行 [first, last) 上下各 RECORDS_OVERSCAN 行，
+        窗口外的卡片和数据页随即释放，返回是否重建了窗口
+        """
+        if not force and not self.window_needs_shift(first, last):
+            return False
+        start = max(0, first - RECORDS_OVERSCAN)
+        end = min(self.total_count, last + RECORDS_OVERSCAN)
+        records = self.get_records_range(start, end)
+        end = start + len(records)
+
+        # 只为窗口内的记录计算余额（窗口函数，范围限于窗口的日期区间）
+        balances = self.state.db.get_running_balances(
+            self.state.current_user.user_id, [record.record_id for record in records]
+        )
+        cards = [self.get_record_card(record, balances.get(record.record_id)) for record in records]
+        self.window_start, self.window_end = start, end
+        self.window_records = records
+        self.top_spacer.height = start * RECORD_ITEM_EXTENT
+        self.bottom_spacer.height = (self.total_count - end) * RECORD_ITEM_EXTENT
+        self.records_list.controls = [self.top_spacer, *cards, self.bottom_spacer]
+        return True
+
+    def get_records_range(self, start: int, end: int) -> List[Record]:
+        """返回第 start 到 end 条筛选结果，缺少的页从数据库读取"""
+        if end <= start:
+            return []
+        first_page = start // RECORDS_PAGE_SIZE
+        last_page = (end - 1) // RECORDS_PAGE_SIZE
+        for page_number in range(first_page, last_page + 1):
+            if page_number not in self.record_pages:
+                self.record_pages[page_number] = self.state.db.query_records(
+                    self.state.current_user.user_id,
+                    self.loaded_criteria,
+                    limit=RECORDS_PAGE_SIZE,
+                    offset=page_number * RECORDS_PAGE_SIZE,
+                )
+        if not self.fully_loaded:
+            # 结果较多时只保留窗口所在的页
+            for page_number in list(self.record_pages):
+                if not first_page <= page_number <= last_page:
+                    del self.record_pages[page_number]
+
+        records = [
+            record
+            for page_number in range(first_page, last_page + 1)
+            for record in self.record_pages[page_number]
+        ]
+        offset = first_page * RECORDS_PAGE_SIZE
+        return records[start - offset : end - offset]
+
+    def on_records_scroll(self, e: ft.OnScrollEvent):
+        """滚动时可见行接近窗口边缘则移动窗口"""
+        if not self.total_count:
+            return
+        viewport = e.viewport_dimension or RECORDS_VIEWPORT_HEIGHT
+        first, last = self.get_visible_rows(e.pixels or 0, viewport)
+        with self.render_lock:
+            if self.render_window(first, last):
+                self.records_list.update()
+
     def get_empty_message(self) -> str:
         """根据当前筛选条件返回相应的空数据提示"""
         if self.search_text.strip():
@@ -376,21 +564,53 @@ class RecordsView(ft.View):
         else:
             return "暂无记录，点击右上角添加第一笔记录吧！"
 
-    def create_record_card(self, record: Record) -> ft.Container:
-        """创建记录卡片"""
+    def get_record_card(self, record: Record, balance: Optional[float] = None) -> ft.Container:
+        """获取记录卡片，按 (记录ID, 更新时间, 主题, 余额, 分类名, 日期文字) 复用已构建的控件"""
+        theme = self.page.theme_mode if self.page else None
         category = self.state.get_category_by_id(record.category_id)
         category_name = category.name if category else "未知分类"
-
-        # 格式化日期显示
-        date_str = record.date.strftime("%m/%d")
-        if record.date.date() == datetime.now().date():
-            date_str = "今天"
-        elif record.date.date() == datetime.now().date() - timedelta(days=1):
-            date_str = "昨天"
+        date_str = self.get_date_label(record.date)
+        key = (record.record_id, record.updated_at, theme, balance, category_name, date_str)
+        card = self.card_cache.get_or_create(
+            key, lambda: self.create_record_card(record, balance, category_name, date_str)
+        )
+        # 复用的卡片需要同步当前的多选状态
+        checkbox = card.data
+        checkbox.visible = self.selection_mode
+        checkbox.value = record.record_id in self.selected_ids
+        return card
+
+    @staticmethod
+    def get_date_label(record_date: datetime) -> str:
+        """格式化日期显示：今天、昨天或月/日"""
+        today = datetime.now().date()
+        if record_date.date() == today:
+            return "今天"
+        elif record_date.date() == today - timedelta(days=1):
+            return "昨天"
+        return record_date.strftime("%m/%d")
+
+    def create_record_card(
+        self,
+        record: Record,
+        balance: Optional[float],
+        category_name: str,
+        date_str: str,
+    ) -> ft.Container:
+        """创建记录卡片，balance 为该笔交易后的账户余额"""
+        checkbox = ft.Checkbox(
+            value=False,
+            visible=False,
+            on_change=lambda e, record_id=record.record_id: self.on_record_selected(
+                record_id, e.control.value
+            ),
+        )
 
         return ft.Container(
             content=ft.Row(
                 [
+                    # 多选框
+                    checkbox,
                     # 收入/支出图标
                     ft.Container(
                         content=ft.Icon(
@@ -454,6 +674,14 @@ class RecordsView(ft.View):
                         if record.note.strip()
                         else ft.Container(width=120)
                     ),
+                    # 交易后余额
+                    ft.Text(
+                        f"余额 ¥{balance:.2f}" if balance is not None else "",
+                        size=12,
+                        color=ft.Colors.GREY_500,
+                        width=110,
+                        text_align=ft.TextAlign.RIGHT,
+                    ),
                     # 日期
                     ft.Text(
                         date_str,
@@ -495,7 +723,10 @@ class RecordsView(ft.View):
             padding=ft.padding.all(16),
             margin=ft.margin.symmetric(vertical=2),
             border=ft.border.all(1, ft.Colors.GREY_100),
+            # 固定高度，加上下外边距正好占一行，窗口外的行可按行高占位
+            height=RECORD_ITEM_EXTENT - 4,
             on_hover=self.on_record_hover,
+            data=checkbox,
         )
 
     def on_record_hover(self, e):
@@ -510,9 +741,41 @@ class RecordsView(ft.View):
 
     # 事件处理方法
     def on_search_change(self, e):
-        """搜索文本变化"""
+        """搜索文本变化：防抖后在后台线程中筛选"""
         self.search_text = e.control.value
-        self.load_records()
+        generation = self.cancel_pending_search()
+        # 定时器线程没有页面上下文，到期后交给页面的工作线程执行搜索和渲染
+        self.search_timer = threading.Timer(
+            SEARCH_DEBOUNCE_SECONDS, self.page.run_thread, (self.run_search, generation)
+        )
+        self.search_timer.daemon = True
+        self.search_timer.start()
+
+    def cancel_pending_search(self) -> int:
+        """取消等待中和进行中的搜索，返回新的版本号"""
+        self.search_generation += 1
+        if self.search_timer:
+            self.search_timer.cancel()
+            self.search_timer = None
+        return self.search_generation
+
+    def run_search(self, generation: int):
+        """在页面线程中执行搜索，只渲染最新一次查询的结果"""
+
+        def is_cancelled():
+            return generation != self.search_generation
+
+        try:
+            result = self.get_filtered_records(is_cancelled)
+        except Exception as e:
+            print(f"搜索失败: {e}")
+            return
+        if result is None:
+            return
+
+        with self.render_lock:
+            if not is_cancelled():
+                self.render_records(*result)
 
     def on_filter_change(self, e):
         """筛选类型变化"""
@@ -573,16 +836,156 @@ class RecordsView(ft.View):
         else:
             self.show_snackbar("删除失败", "error")
 
+    # 多选与批量操作
+    def toggle_selection_mode(self, e):
+        """进入或退出多选模式"""
+        self.selection_mode = not self.selection_mode
+        self.selected_ids.clear()
+        self.bulk_bar.visible = self.selection_mode
+        self.refresh_selection()
+
+    def refresh_selection(self):
+        """同步已构建卡片的勾选状态和已选数量"""
+        cards = self.records_list.controls[1:-1]
+        for record, card in zip(self.window_records, cards, strict=True):
+            if isinstance(card.data, ft.Checkbox):
+                card.data.visible = self.selection_mode
+                card.data.value = record.record_id in self.selected_ids
+        self.selected_count_text.value = f"已选择 {len(self.selected_ids)} 条"
+        self.page.update()
+
+    def on_record_selected(self, record_id: int, selected: bool):
+        """勾选或取消勾选一条记录"""
+        if selected:
+            self.selected_ids.add(record_id)
+        else:
+            self.selected_ids.discard(record_id)
+        self.selected_count_text.value = f"已选择 {len(self.selected_ids)} 条"
+        self.selected_count_text.update()
+
+    def select_all_records(self, e):
+        """选择当前筛选条件下的全部记录（包括尚未加载的）"""
+        if self.fully_loaded:
+            self.selected_ids = {
+                record.record_id for page in self.record_pages.values() for record in page
+            }
+        else:
+            # 只读取ID，不为每条匹配记录构建对象
+            self.selected_ids = set(
+                self.state.db.query_record_ids(
+                    self.state.current_user.user_id, self.loaded_criteria
+                )
+            )
+        self.refresh_selection()
+
+    def finish_bulk_operation(self, count: int, action: str):
+        """批量操作完成后退出多选并刷新列表"""
+        if count:
+            self.selection_mode = False
+            self.selected_ids.clear()
+            self.bulk_bar.visible = False
+            self.load_records()
+            self.show_snackbar(f"已{action} {count} 条记录", "success")
+        else:
+            self.show_snackbar(f"{action}失败", "error")
+
+    def show_bulk_dialog(self, title: str, content, on_confirm, confirm_text="确定"):
+        """显示批量操作对话框"""
+        if not self.selected_ids:
+            self.show_snackbar("请先选择记录", "info")
+            return
+
+        def close_dialog(e):
+            dialog.open = False
+            self.page.update()
+
+        def confirmed(e):
+            close_dialog(e)
+            on_confirm()
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text(title),
+            content=content,
+            actions=[
+                ft.TextButton("取消", on_click=close_dialog),
+                ft.TextButton(confirm_text, on_click=confirmed),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+        self.page.overlay.append(dialog)
+        dialog.open = True
+        self.page.update()
+
+    def confirm_bulk_delete(self, e):
+        """确认批量删除"""
+        self.show_bulk_dialog(
+            "确认删除",
+            ft.Text(f"确定要删除选中的 {len(self.selected_ids)} 条记录吗？此操作无法撤销。"),
+            lambda: self.finish_bulk_operation(
+                self.state.delete_records(list(self.selected_ids)), "删除"
+            ),
+            "删除",
+        )
+
+    def show_bulk_category_dialog(self, e):
+        """批量修改分类"""
+        dropdown = ft.Dropdown(
+            label="新分类",
+            width=300,
+            options=[
+                ft.dropdown.Option(str(category.category_id), category.name)
+                for category in self.state.categories
+            ],
+        )
+
+        def apply():
+            if not dropdown.value:
+                self.show_snackbar("请选择分类", "error")
+                return
+            self.finish_bulk_operation(
+                self.state.update_records(
+                    list(self.selected_ids), category_id=int(dropdown.value)
+                ),
+                "修改",
+            )
+
+        self.show_bulk_dialog(f"修改 {len(self.selected_ids)} 条记录的分类", dropdown, apply)
+
+    def show_bulk_type_dialog(self, e):
+        """批量修改收支类型"""
+        dropdown = ft.Dropdown(
+            label="新类型",
+            width=300,
+            options=[
+                ft.dropdown.Option("income", "收入"),
+                ft.dropdown.Option("expense", "支出"),
+            ],
+        )
+
+        def apply():
+            if not dropdown.value:
+                self.show_snackbar("请选择类型", "error")
+                return
+            self.finish_bulk_operation(
+                self.state.update_records(
+                    list(self.selected_ids), record_type=dropdown.value
+                ),
+                "修改",
+            )
+
+        self.show_bulk_dialog(f"修改 {len(self.selected_ids)} 条记录的类型", dropdown, apply)
+
     def export_records(self, e):
         """导出记录"""
-        filtered_records = self.get_filtered_records()
-        if not filtered_records:
+        if not self.total_count:
             self.show_snackbar("没有可导出的记录", "info")
             return
 
         # TODO: 实现实际的导出功能
         self.show_snackbar(
-            f"导出功能开发中，当前有 {len(filtered_records)} 条记录", "info"
+            f"导出功能开发中，当前有 {self.total_count} 条记录", "info"
         )
 
     def handle_logout(self, e):
@@ -2,10 +2,18 @@
 SettingsView for ui
 """
 
+import threading
+from typing import Optional
+
 import flet as ft
 
 from components.sidebar import Sidebar
-from models.export import ExportModule
+from models.backup import BackupModule, read_manifest
+from models.budget import Budget
+from models.export import ExportModule, detect_compression
+from models.export_job import ExportJob, ExportProgress
+from models.importer import ImportModule
+from models.recurring import FREQUENCY_LABELS, RecurringDetector
 
 
 class SettingsView(ft.View):
@@ -59,6 +67,54 @@ class SettingsView(ft.View):
             value=True,
         )
 
+        # 预算设置
+        self.budget_category_dropdown = ft.Dropdown(
+            label="预算分类",
+            width=200,
+            options=[ft.dropdown.Option("overall", "月度总预算")]
+            + [
+                ft.dropdown.Option(str(cat.category_id), cat.name)
+                for cat in self.state.categories
+            ],
+            value="overall",
+        )
+
+        self.budget_amount_field = ft.TextField(
+            label="每月预算金额",
+            width=200,
+            prefix_text="¥",
+            keyboard_type=ft.KeyboardType.NUMBER,
+        )
+
+        self.budget_list = ft.Column([], spacing=4)
+        self.refresh_budget_list()
+
+        # 定期交易
+        self.recurring_list = ft.Column([], spacing=4)
+        self.refresh_recurring_list()
+
+        # 导入文件选择器
+        self.import_picker = ft.FilePicker(on_result=self.on_import_file_picked)
+        self.restore_picker = ft.FilePicker(on_result=self.on_restore_file_picked)
+
+        # 后台导出进度
+        self.export_progress_bar = ft.ProgressBar(width=160, value=0)
+        self.export_progress_text = ft.Text("", size=12, color=ft.Colors.GREY_600)
+        self.export_progress = ft.Column(
+            [
+                self.export_progress_bar,
+                self.export_progress_text,
+                ft.TextButton("取消导出", on_click=self.cancel_export),
+            ],
+            spacing=4,
+            visible=False,
+        )
+        job = self.state.export_job
+        if job and job.running:
+            # 页面重新创建后接管正在运行的任务
+            job.set_callbacks(self.on_export_progress, self.on_export_done)
+            self.update_export_progress(job.progress)
+
     def create_settings_layout(self):
         """创建设置布局"""
         # 侧边栏
@@ -219,6 +275,7 @@ class SettingsView(ft.View):
                                                                     width=160,
                                                                     on_click=self.export_all_data,
                                                                 ),
+                                                                self.export_progress,
                                                                 ft.Container(height=12),
                                                                 ft.ElevatedButton(
                                                                     text="导入数据",
@@ -234,6 +291,34 @@ class SettingsView(ft.View):
                                                                     on_click=self.import_data,
                                                                 ),
                                                                 ft.Container(height=12),
+                                                                ft.ElevatedButton(
+                                                                    text="备份数据",
+                                                                    icon=ft.Icons.BACKUP,
+                                                                    style=ft.ButtonStyle(
+                                                                        bgcolor=ft.Colors.INDIGO_600,
+                                                                        color=ft.Colors.WHITE,
+                                                                        shape=ft.RoundedRectangleBorder(
+                                                                            radius=8
+                                                                        ),
+                                                                    ),
+                                                                    width=160,
+                                                                    on_click=self.backup_data,
+                                                                ),
+                                                                ft.Container(height=12),
+                                                                ft.ElevatedButton(
+                                                                    text="恢复备份",
+                                                                    icon=ft.Icons.SETTINGS_BACKUP_RESTORE,
+                                                                    style=ft.ButtonStyle(
+                                                                        bgcolor=ft.Colors.BLUE_GREY_600,
+                                                                        color=ft.Colors.WHITE,
+                                                                        shape=ft.RoundedRectangleBorder(
+                                                                            radius=8
+                                                                        ),
+                                                                    ),
+                                                                    width=160,
+                                                                    on_click=self.restore_data,
+                                                                ),
+                                                                ft.Container(height=12),
                                                                 ft.ElevatedButton(
                                                                     text="重置应用",
                                                                     icon=ft.Icons.RESTORE,
@@ -264,6 +349,110 @@ class SettingsView(ft.View):
                                     ),
                                     border=ft.border.all(1, ft.Colors.GREY_200),
                                 ),
+                                # 预算管理
+                                ft.Container(
+                                    content=ft.Column(
+                                        [
+                                            ft.Row(
+                                                [
+                                                    ft.Icon(
+                                                        ft.Icons.SAVINGS,
+                                                        size=24,
+                                                        color=ft.Colors.ORANGE_600,
+                                                    ),
+                                                    ft.Text(
+                                                        "预算管理",
+                                                        size=18,
+                                                        weight=ft.FontWeight.W_600,
+                                                    ),
+                                                ],
+                                                spacing=8,
+                                            ),
+                                            ft.Divider(
+                                                height=20, color=ft.Colors.GREY_300
+                                            ),
+                                            ft.Row(
+                                                [
+                                                    self.budget_category_dropdown,
+                                                    self.budget_amount_field,
+                                                    ft.ElevatedButton(
+                                                        text="保存预算",
+                                                        icon=ft.Icons.ADD,
+                                                        style=ft.ButtonStyle(
+                                                            bgcolor=ft.Colors.ORANGE_600,
+                                                            color=ft.Colors.WHITE,
+                                                            shape=ft.RoundedRectangleBorder(
+                                                                radius=8
+                                                            ),
+                                                        ),
+                                                        on_click=self.save_budget,
+                                                    ),
+                                                ],
+                                                spacing=16,
+                                                wrap=True,
+                                            ),
+                                            ft.Container(height=12),
+                                            self.budget_list,
+                                        ]
+                                    ),
+                                    bgcolor=ft.Colors.WHITE,
+                                    border_radius=16,
+                                    padding=ft.padding.all(25),
+                                    margin=ft.margin.symmetric(
+                                        horizontal=20, vertical=10
+                                    ),
+                                    border=ft.border.all(1, ft.Colors.GREY_200),
+                                ),
+                                # 定期交易
+                                ft.Container(
+                                    content=ft.Column(
+                                        [
+                                            ft.Row(
+                                                [
+                                                    ft.Row(
+                                                        [
+                                                            ft.Icon(
+                                                                ft.Icons.EVENT_REPEAT,
+                                                                size=24,
+                                                                color=ft.Colors.PURPLE_600,
+                                                            ),
+                                                            ft.Text(
+                                                                "定期交易",
+                                                                size=18,
+                                                                weight=ft.FontWeight.W_600,
+                                                            ),
+                                                        ],
+                                                        spacing=8,
+                                                    ),
+                                                    ft.ElevatedButton(
+                                                        text="检测定期交易",
+                                                        icon=ft.Icons.AUTO_AWESOME,
+                                                        style=ft.ButtonStyle(
+                                                            bgcolor=ft.Colors.PURPLE_600,
+                                                            color=ft.Colors.WHITE,
+                                                            shape=ft.RoundedRectangleBorder(
+                                                                radius=8
+                                                            ),
+                                                        ),
+                                                        on_click=self.detect_recurring,
+                                                    ),
+                                                ],
+                                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                                            ),
+                                            ft.Divider(
+                                                height=20, color=ft.Colors.GREY_300
+                                            ),
+                                            self.recurring_list,
+                                        ]
+                                    ),
+                                    bgcolor=ft.Colors.WHITE,
+                                    border_radius=16,
+                                    padding=ft.padding.all(25),
+                                    margin=ft.margin.symmetric(
+                                        horizontal=20, vertical=10
+                                    ),
+                                    border=ft.border.all(1, ft.Colors.GREY_200),
+                                ),
                                 # 关于信息
                                 ft.Container(
                                     content=ft.Column(
@@ -383,19 +572,35 @@ class SettingsView(ft.View):
 
         def export_json(e):
             close_dialog(e)
-            success, result = self.export_module.export_to_json()
-            if success:
-                self.show_snackbar(f"JSON导出成功: {result}", "success")
-            else:
-                self.show_snackbar(result, "error")
+            self.start_export("json")
+
+        def export_delta(e):
+            close_dialog(e)
+            self.start_export("delta")
+
+        def merge_delta(e):
+            close_dialog(e)
+            self.start_export("merge")
 
         def export_excel(e):
             close_dialog(e)
-            success, result = self.export_module.export_to_excel()
-            if success:
-                self.show_snackbar(f"Excel导出成功: {result}", "success")
-            else:
-                self.show_snackbar(result, "error")
+            self.start_export("excel")
+
+        def export_csv(e):
+            close_dialog(e)
+            self.start_export("csv")
+
+        def export_parquet(e):
+            close_dialog(e)
+            self.start_export("parquet")
+
+        def export_pdf(e):
+            close_dialog(e)
+            self.start_export("pdf")
+
+        def export_pdf_year(e):
+            close_dialog(e)
+            self.start_export("pdf_year")
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -416,6 +621,30 @@ class SettingsView(ft.View):
                             on_click=export_json,
                         ),
                         ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="增量导出 JSON",
+                            icon=ft.Icons.DIFFERENCE,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.BLUE_400,
+                                color=ft.Colors.WHITE,
+                            ),
+                            tooltip="首次导出全部记录，之后只导出变更",
+                            on_click=export_delta,
+                        ),
+                        ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="合并增量快照",
+                            icon=ft.Icons.MERGE_TYPE,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.BLUE_GREY_600,
+                                color=ft.Colors.WHITE,
+                            ),
+                            tooltip="将最新的完整快照与其后的增量导出合并",
+                            on_click=merge_delta,
+                        ),
+                        ft.Container(height=10),
                         ft.ElevatedButton(
                             text="导出为 Excel",
                             icon=ft.Icons.TABLE_CHART,
@@ -426,6 +655,51 @@ class SettingsView(ft.View):
                             ),
                             on_click=export_excel,
                         ),
+                        ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="导出为 CSV (gzip)",
+                            icon=ft.Icons.DESCRIPTION,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.ORANGE_600,
+                                color=ft.Colors.WHITE,
+                            ),
+                            on_click=export_csv,
+                        ),
+                        ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="导出为 Parquet",
+                            icon=ft.Icons.STORAGE,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.PURPLE_600,
+                                color=ft.Colors.WHITE,
+                            ),
+                            on_click=export_parquet,
+                        ),
+                        ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="本月 PDF 报告",
+                            icon=ft.Icons.PICTURE_AS_PDF,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.RED_600,
+                                color=ft.Colors.WHITE,
+                            ),
+                            on_click=export_pdf,
+                        ),
+                        ft.Container(height=10),
+                        ft.ElevatedButton(
+                            text="全年 PDF 报告",
+                            icon=ft.Icons.PICTURE_AS_PDF,
+                            width=200,
+                            style=ft.ButtonStyle(
+                                bgcolor=ft.Colors.RED_400,
+                                color=ft.Colors.WHITE,
+                            ),
+                            tooltip="并行生成今年的12个月报和年报",
+                            on_click=export_pdf_year,
+                        ),
                     ],
                     tight=True,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
@@ -442,9 +716,439 @@ class SettingsView(ft.View):
         dialog.open = True
         self.page.update()
 
+    def start_export(self, export_format: str):
+        """在后台线程中启动导出任务"""
+        job = self.state.export_job
+        if job and job.running:
+            self.show_snackbar("已有导出任务正在进行", "info")
+            return
+
+        job = ExportJob(
+            self.state,
+            export_format,
+            on_update=self.on_export_progress,
+            on_done=self.on_export_done,
+        )
+        self.state.export_job = job
+        self.update_export_progress(job.progress)
+        job.start()
+        self.page.update()
+
+    def cancel_export(self, e):
+        """取消正在进行的导出"""
+        job = self.state.export_job
+        if job and job.running:
+            job.cancel()
+            self.export_progress_text.value = "正在取消..."
+            self.page.update()
+
+    def update_export_progress(self, progress: ExportProgress):
+        """根据进度更新进度条和说明文字"""
+        self.export_progress.visible = True
+        self.export_progress_bar.value = progress.fraction if progress.total else None
+        if not progress.total:
+            self.export_progress_text.value = "正在导出..."
+            return
+        text = f"已导出 {progress.written}/{progress.total} 条"
+        eta = progress.eta_seconds
+        if eta is not None and progress.written < progress.total:
+            text += f"，预计剩余 {int(eta) + 1} 秒"
+        self.export_progress_text.value = text
+
+    def on_export_progress(self, progress: ExportProgress):
+        """导出线程报告进度"""
+        self.update_export_progress(progress)
+        self.page.update()
+
+    def on_export_done(self, job: ExportJob):
+        """导出线程结束"""
+        self.export_progress.visible = False
+        success, result = job.result
+        if success:
+            self.show_snackbar(f"{job.label}导出成功: {result}", "success")
+        else:
+            self.show_snackbar(result, "info" if job.progress.cancelled else "error")
+
+    def refresh_budget_list(self):
+        """刷新预算列表"""
+        self.budget_list.controls.clear()
+        for status in self.state.get_budget_statuses():
+            budget = status.budget
+            if budget.is_overall:
+                name = "月度总预算"
+            else:
+                category = self.state.get_category_by_id(budget.category_id)
+                name = category.name if category else "未知分类"
+
+            self.budget_list.controls.append(
+                ft.Row(
+                    [
+                        ft.Text(name, size=14, expand=True),
+                        ft.Text(
+                            f"¥{status.spent:.2f} / ¥{budget.amount:.2f}",
+                            size=13,
+                            color=(
+                                ft.Colors.RED_500
+                                if status.is_over
+                                else ft.Colors.GREY_600
+                            ),
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.DELETE,
+                            icon_color=ft.Colors.RED_400,
+                            icon_size=18,
+                            tooltip="删除预算",
+                            on_click=lambda e, budget_id=budget.budget_id: self.delete_budget(
+                                budget_id
+                            ),
+                        ),
+                    ]
+                )
+            )
+
+    def save_budget(self, e):
+        """保存预算"""
+        if not self.state.current_user:
+            return
+
+        try:
+            amount = float(self.budget_amount_field.value)
+            if amount <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            self.show_snackbar("请输入有效的预算金额", "error")
+            return
+
+        category_value = self.budget_category_dropdown.value
+        budget = Budget(
+            user_id=self.state.current_user.user_id,
+            category_id=None if category_value == "overall" else int(category_value),
+            amount=amount,
+        )
+
+        if self.state.save_budget(budget):
+            self.budget_amount_field.value = ""
+            self.refresh_budget_list()
+            self.show_snackbar("预算已保存", "success")
+        else:
+            self.show_snackbar("预算保存失败", "error")
+
+    def delete_budget(self, budget_id):
+        """删除预算"""
+        if self.state.delete_budget(budget_id):
+            self.refresh_budget_list()
+            self.show_snackbar("预算已删除", "success")
+        else:
+            self.show_snackbar("删除失败", "error")
+
+    def describe_recurring_rule(self, rule) -> str:
+        """生成定期交易规则的描述文字"""
+        category = self.state.get_category_by_id(rule.category_id)
+        category_name = category.name if category else "未知分类"
+        type_text = "收入" if rule.record_type == "income" else "支出"
+        note = f" · {rule.note}" if rule.note else ""
+        return (
+            f"{FREQUENCY_LABELS.get(rule.frequency, rule.frequency)}{type_text} "
+            f"¥{rule.amount:.2f} · {category_name}{note}"
+        )
+
+    def refresh_recurring_list(self):
+        """刷新定期交易规则列表"""
+        self.recurring_list.controls.clear()
+        if not self.state.current_user:
+            return
+
+        rules = self.state.db.get_recurring_rules(self.state.current_user.user_id)
+        if not rules:
+            self.recurring_list.controls.append(
+                ft.Text(
+                    "暂无定期交易，点击右上角从历史记录中检测",
+                    size=14,
+                    color=ft.Colors.GREY_600,
+                )
+            )
+            return
+
+        for rule in rules:
+            self.recurring_list.controls.append(
+                ft.Row(
+                    [
+                        ft.Text(self.describe_recurring_rule(rule), size=14, expand=True),
+                        ft.Text(
+                            f"下次 {rule.next_date.strftime('%Y-%m-%d')}",
+                            size=13,
+                            color=ft.Colors.GREY_600,
+                        ),
+                        ft.IconButton(
+                            icon=ft.Icons.DELETE,
+                            icon_color=ft.Colors.RED_400,
+                            icon_size=18,
+                            tooltip="删除规则",
+                            on_click=lambda e, rule_id=rule.rule_id: self.delete_recurring_rule(
+                                rule_id
+                            ),
+                        ),
+                    ]
+                )
+            )
+
+    def detect_recurring(self, e):
+        """在后台检测定期交易"""
+        if not self.state.current_user:
+            return
+        self.show_snackbar("正在分析历史记录...", "info")
+        RecurringDetector().detect_async(
+            self.state.db, self.state.current_user.user_id, self.show_recurring_proposals
+        )
+
+    def show_recurring_proposals(self, proposals):
+        """显示检测到的定期交易建议"""
+        if not proposals:
+            self.show_snackbar("未发现新的定期交易", "info")
+            return
+
+        def close_dialog(e):
+            dialog.open = False
+            self.page.update()
+
+        def accept(e, rule):
+            if self.state.save_recurring_rule(rule):
+                e.control.disabled = True
+                e.control.text = "已添加"
+                self.refresh_recurring_list()
+                self.page.update()
+            else:
+                self.show_snackbar("添加规则失败", "error")
+
+        items = [
+            ft.Row(
+                [
+                    ft.Column(
+                        [
+                            ft.Text(self.describe_recurring_rule(rule), size=14),
+                            ft.Text(
+                                f"已出现 {rule.occurrences} 次，下次 {rule.next_date.strftime('%Y-%m-%d')}",
+                                size=12,
+                                color=ft.Colors.GREY_600,
+                            ),
+                        ],
+                        spacing=2,
+                        expand=True,
+                    ),
+                    ft.TextButton(
+                        "添加",
+                        on_click=lambda e, rule=rule: accept(e, rule),
+                    ),
+                ]
+            )
+            for rule in proposals
+        ]
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("发现定期交易"),
+            content=ft.Container(
+                content=ft.Column(items, tight=True, scroll=ft.ScrollMode.AUTO),
+                width=460,
+                height=min(80 * len(items), 400),
+            ),
+            actions=[ft.TextButton("完成", on_click=close_dialog)],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+        self.page.overlay.append(dialog)
+        dialog.open = True
+        self.page.update()
+
+    def delete_recurring_rule(self, rule_id):
+        """删除定期交易规则"""
+        if self.state.delete_recurring_rule(rule_id):
+            self.refresh_recurring_list()
+            self.page.update()
+            self.show_snackbar("规则已删除", "success")
+        else:
+            self.show_snackbar("删除失败", "error")
+
     def import_data(self, e):
-        """导入数据"""
-        self.show_snackbar("导入数据功能将在后续版本实现", "info")
+        """选择要导入的文件"""
+        if self.import_picker not in self.page.overlay:
+            self.page.overlay.append(self.import_picker)
+            self.page.update()
+        self.import_picker.pick_files(
+            dialog_title="选择要导入的文件",
+            allowed_extensions=["json", "csv", "gz", "bz2", "xz", "xlsx", "parquet"],
+        )
+
+    def on_import_file_picked(self, e):
+        """选择文件后确认导入方式"""
+        if not e.files:
+            return
+        path = e.files[0].path
+
+        def close_dialog(e):
+            dialog.open = False
+            self.page.update()
+
+        # CSV 文件可以按银行账单导入：识别账单列名并按内容指纹去重
+        statement_check = ft.Checkbox(label="银行账单（跳过重复交易）", value=False)
+        category_dropdown = ft.Dropdown(
+            label="未分类交易计入",
+            options=[
+                ft.dropdown.Option(str(cat.category_id), cat.name)
+                for cat in self.state.categories
+            ],
+            value=(
+                str(self.state.categories[0].category_id)
+                if self.state.categories
+                else None
+            ),
+            visible=False,
+        )
+        is_csv = bool(detect_compression(path)) or path.lower().endswith(".csv")
+
+        def on_statement_change(e):
+            category_dropdown.visible = statement_check.value
+            self.page.update()
+
+        statement_check.on_change = on_statement_change
+
+        def start(dry_run):
+            def handler(e):
+                close_dialog(e)
+                category_id = None
+                if statement_check.value and category_dropdown.value:
+                    category_id = int(category_dropdown.value)
+                self.run_import(path, dry_run, category_id)
+
+            return handler
+
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("导入数据"),
+            content=ft.Column(
+                [
+                    ft.Text(
+                        f"文件: {e.files[0].name}\n试运行只校验数据，不写入数据库。",
+                        size=14,
+                    ),
+                    ft.Column([statement_check, category_dropdown], visible=is_csv),
+                ],
+                tight=True,
+            ),
+            actions=[
+                ft.TextButton("取消", on_click=close_dialog),
+                ft.TextButton("试运行", on_click=start(True)),
+                ft.ElevatedButton("导入", on_click=start(False)),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+        self.page.overlay.append(dialog)
+        dialog.open = True
+        self.page.update()
+
+    def run_import(
+        self, path: str, dry_run: bool = False, statement_category_id: Optional[int] = None
+    ):
+        """在后台线程中导入，完成后提示结果
+
+        指定 statement_category_id 时按银行账单导入并去重。
+        """
+        self.show_snackbar("正在校验..." if dry_run else "正在导入...", "info")
+
+        def worker():
+            importer = ImportModule(self.state)
+            if statement_category_id is not None:
+                report = importer.import_statement(path, statement_category_id, dry_run)
+            else:
+                report = importer.import_file(path, dry_run)
+            self.show_snackbar(report.summary(), "success" if report.success else "error")
+
+        threading.Thread(target=worker, name="import", daemon=True).start()
+
+    def backup_data(self, e):
+        """在后台线程中创建完整备份，完成后提示结果"""
+        self.show_snackbar("正在备份...", "info")
+
+        def worker():
+            success, result = BackupModule(self.state).create_backup()
+            if success:
+                self.show_snackbar(f"备份成功: {result}", "success")
+            else:
+                self.show_snackbar(result, "error")
+
+        threading.Thread(target=worker, name="backup", daemon=True).start()
+
+    def restore_data(self, e):
+        """选择要恢复的备份文件"""
+        if self.restore_picker not in self.page.overlay:
+            self.page.overlay.append(self.restore_picker)
+            self.page.update()
+        self.restore_picker.pick_files(
+            dialog_title="选择备份文件",
+            initial_directory=str(BackupModule(self.state).backup_dir),
+            allowed_extensions=["zip"],
+        )
+
+    def on_restore_file_picked(self, e):
+        """选择备份文件后显示备份信息并确认恢复"""
+        if not e.files:
+            return
+        path = e.files[0].path
+        try:
+            manifest = read_manifest(path)
+        except ValueError as error:
+            self.show_snackbar(str(error), "error")
+            return
+
+        def close_dialog(e):
+            dialog.open = False
+            self.page.update()
+
+        def confirm(e):
+            close_dialog(e)
+            self.run_restore(path)
+
+        counts = manifest.get("counts", {})
+        dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("恢复备份"),
+            content=ft.Text(
+                f"备份时间: {manifest['created_at']}\n"
+                f"用户 {counts.get('users', 0)} 个，记录 {counts.get('records', 0)} 条\n\n"
+                "恢复后当前数据将被备份中的数据替换，需要重新登录。",
+                size=14,
+            ),
+            actions=[
+                ft.TextButton("取消", on_click=close_dialog),
+                ft.ElevatedButton("恢复", on_click=confirm),
+            ],
+            actions_alignment=ft.MainAxisAlignment.END,
+        )
+
+        self.page.overlay.append(dialog)
+        dialog.open = True
+        self.page.update()
+
+    def run_restore(self, path: str):
+        """在后台线程中恢复备份，完成后退出到欢迎页重新登录
+
+        写回前先退出登录并停止定时生成、导出和导入，避免它们同时写入数据库。
+        """
+        self.show_snackbar("正在恢复...", "info")
+
+        def finish(success: bool, message: str):
+            self.show_snackbar(
+                f"{message}，请重新登录", "success" if success else "error"
+            )
+            self.go("/welcome")
+
+        def worker():
+            self.state.stop_background_work()
+            success, message = BackupModule(self.state).restore_backup(path)
+            self.page.run_thread(finish, success, message)
+
+        threading.Thread(target=worker, name="restore", daemon=True).start()
 
     def reset_app_data(self, e):
         """重置应用数据"""
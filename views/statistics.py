@@ -8,7 +8,8 @@ from typing import Dict, List, Tuple
 
 import flet as ft
 
-from components.cards import create_stat_card
+from components.cards import create_budget_list, create_stat_card
+from components.heatmap import create_calendar_heatmap
 from components.sidebar import Sidebar
 
 
@@ -21,6 +22,9 @@ class StatisticsView(ft.View):
         self.go = go
         self.page = state.page
         self.current_period = "month"
+        self.heatmap_year = datetime.now().year
+        self.heatmap_container = None
+        self.trend_chart_container = None
         self.controls = [self.create_statistics_layout()]
 
     def create_statistics_layout(self):
@@ -110,6 +114,30 @@ class StatisticsView(ft.View):
                                         horizontal=20, vertical=10
                                     ),
                                 ),
+                                # 本月预算
+                                ft.Container(
+                                    content=ft.Column(
+                                        [
+                                            ft.Text(
+                                                "本月预算",
+                                                size=16,
+                                                weight=ft.FontWeight.W_600,
+                                            ),
+                                            ft.Container(height=12),
+                                            create_budget_list(
+                                                self.state.get_budget_statuses(),
+                                                self.state,
+                                            ),
+                                        ]
+                                    ),
+                                    bgcolor=ft.Colors.WHITE,
+                                    border_radius=16,
+                                    padding=ft.padding.all(20),
+                                    margin=ft.margin.symmetric(
+                                        horizontal=20, vertical=10
+                                    ),
+                                    border=ft.border.all(1, ft.Colors.GREY_200),
+                                ),
                                 # 图表区域
                                 ft.Container(
                                     content=ft.ResponsiveRow(
@@ -145,7 +173,7 @@ class StatisticsView(ft.View):
                                                             weight=ft.FontWeight.W_600,
                                                         ),
                                                         ft.Container(height=16),
-                                                        self.create_trend_chart(),
+                                                        self.create_trend_section(),
                                                     ]
                                                 ),
                                                 bgcolor=ft.Colors.WHITE,
@@ -163,6 +191,27 @@ class StatisticsView(ft.View):
                                         horizontal=20, vertical=10
                                     ),
                                 ),
+                                # 年度支出日历热力图
+                                ft.Container(
+                                    content=ft.Column(
+                                        [
+                                            ft.Text(
+                                                "每日支出日历",
+                                                size=16,
+                                                weight=ft.FontWeight.W_600,
+                                            ),
+                                            ft.Container(height=16),
+                                            self.create_heatmap_section(),
+                                        ]
+                                    ),
+                                    bgcolor=ft.Colors.WHITE,
+                                    border_radius=16,
+                                    padding=ft.padding.all(20),
+                                    margin=ft.margin.symmetric(
+                                        horizontal=20, vertical=10
+                                    ),
+                                    border=ft.border.all(1, ft.Colors.GREY_200),
+                                ),
                                 # 详细分析
                                 ft.Container(
                                     content=ft.Column(
@@ -547,12 +596,29 @@ class StatisticsView(ft.View):
 
         income_data = trend_data["income"]
         expense_data = trend_data["expense"]
-        date_labels = trend_data["date_labels"]
+        date_labels = list(trend_data["date_labels"])
+
+        # 后台预测结果（未就绪时先只显示历史数据）
+        forecast = self.get_forecast()
+        forecast_series = []
+        forecast_values = []
+        if forecast:
+            last_index = len(income_data) - 1
+            date_labels += [d.strftime("%m/%d") for d in forecast.horizon_dates]
+            for record_type, last_value, color in [
+                ("income", income_data[-1], ft.Colors.GREEN_500),
+                ("expense", expense_data[-1], ft.Colors.RED_500),
+            ]:
+                forecast_values += forecast.daily_upper[record_type]
+                forecast_series += self.create_forecast_series(
+                    forecast, record_type, last_index, last_value, color
+                )
 
         # 计算最大值用于缩放
         max_value = max(
             max(income_data) if income_data else 0,
             max(expense_data) if expense_data else 0,
+            max(forecast_values) if forecast_values else 0,
         )
         max_value = max_value * 1.2 if max_value > 0 else 100  # 留20%空间
 
@@ -560,13 +626,14 @@ class StatisticsView(ft.View):
         income_spots = []
         expense_spots = []
 
-        for i, (income, expense) in enumerate(zip(income_data, expense_data)):
+        for i, (income, expense) in enumerate(zip(income_data, expense_data, strict=True)):
             income_spots.append(ft.LineChartDataPoint(i, income))
             expense_spots.append(ft.LineChartDataPoint(i, expense))
 
         # 创建折线图
         line_chart = ft.LineChart(
-            data_series=[
+            data_series=forecast_series
+            + [
                 ft.LineChartData(
                     data_points=income_spots,
                     stroke_width=3,
@@ -643,16 +710,33 @@ class StatisticsView(ft.View):
             alignment=ft.MainAxisAlignment.CENTER,
         )
 
+        if forecast:
+            legend.controls.append(
+                ft.Row(
+                    [
+                        ft.Container(
+                            width=16,
+                            height=3,
+                            bgcolor=ft.Colors.GREY_400,
+                            border_radius=1,
+                        ),
+                        ft.Text("预测 (95%区间)", size=11, color=ft.Colors.GREY_600),
+                    ],
+                    spacing=6,
+                )
+            )
+
         return ft.Container(
             content=ft.Column(
                 [
                     ft.Container(
                         content=line_chart,
-                        height=180,
+                        height=160 if forecast else 180,
                         padding=ft.padding.only(right=10, top=10),
                     ),
                     ft.Container(height=10),
                     legend,
+                    self.create_forecast_summary(forecast),
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 spacing=0,
@@ -660,6 +744,110 @@ class StatisticsView(ft.View):
             height=250,
         )
 
+    def create_trend_section(self):
+        """创建趋势图区域，预测完成后只刷新该区域"""
+        self.trend_chart_container = ft.Container(content=self.create_trend_chart())
+        return self.trend_chart_container
+
+    def get_forecast(self):
+        """获取缓存的预测结果，未缓存时提交后台计算"""
+        if not self.state.current_user:
+            return None
+        return self.state.forecast_service.request(
+            self.state.current_user.user_id,
+            self.state.data_version,
+            callback=self.on_forecast_ready,
+        )
+
+    def on_forecast_ready(self, forecast):
+        """后台预测完成后交给页面线程刷新趋势图"""
+        self.page.run_thread(self.refresh_trend_chart)
+
+    def refresh_trend_chart(self):
+        """重建趋势图区域"""
+        if self.trend_chart_container is None:
+            return
+        try:
+            self.trend_chart_container.content = self.create_trend_chart()
+            self.trend_chart_container.update()
+        except Exception as e:
+            # 视图可能已被切换
+            print(f"刷新预测图表失败: {e}")
+
+    def create_forecast_series(self, forecast, record_type, last_index, last_value, color):
+        """创建预测折线及置信区间上下限"""
+        dashed = [
+            (forecast.daily_expected[record_type], 2, 0.8, [6, 4]),
+            (forecast.daily_upper[record_type], 1, 0.3, [2, 3]),
+            (forecast.daily_lower[record_type], 1, 0.3, [2, 3]),
+        ]
+        series = []
+        for values, width, opacity, pattern in dashed:
+            points = [ft.LineChartDataPoint(last_index, last_value)] + [
+                ft.LineChartDataPoint(last_index + i + 1, value)
+                for i, value in enumerate(values)
+            ]
+            series.append(
+                ft.LineChartData(
+                    data_points=points,
+                    stroke_width=width,
+                    color=ft.Colors.with_opacity(opacity, color),
+                    dash_pattern=pattern,
+                )
+            )
+        return series
+
+    def create_forecast_summary(self, forecast):
+        """创建月末/年末预测摘要"""
+        if not forecast:
+            return ft.Container()
+
+        expense = forecast.totals["expense"]
+        income = forecast.totals["income"]
+        return ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(
+                        f"预计月末支出 ¥{expense['month'].expected:.0f}"
+                        f" (¥{expense['month'].lower:.0f}~{expense['month'].upper:.0f})",
+                        size=11,
+                        color=ft.Colors.GREY_600,
+                    ),
+                    ft.Text(
+                        f"预计年末收入 ¥{income['year'].expected:.0f} / "
+                        f"支出 ¥{expense['year'].expected:.0f}",
+                        size=11,
+                        color=ft.Colors.GREY_600,
+                    ),
+                ],
+                spacing=16,
+                alignment=ft.MainAxisAlignment.CENTER,
+                wrap=True,
+            ),
+            padding=ft.padding.only(top=6),
+        )
+
+    def create_heatmap_section(self):
+        """创建日历热力图区域"""
+        self.heatmap_container = ft.Container(content=self.create_heatmap())
+        return self.heatmap_container
+
+    def create_heatmap(self):
+        """根据缓存的每日汇总创建当前年份的热力图"""
+        daily_totals = self.state.get_daily_totals(self.heatmap_year)
+        return create_calendar_heatmap(
+            self.heatmap_year,
+            daily_totals.get("expense", []),
+            on_prev_year=lambda e: self.change_heatmap_year(-1),
+            on_next_year=lambda e: self.change_heatmap_year(1),
+        )
+
+    def change_heatmap_year(self, delta: int):
+        """切换热力图年份，只刷新热力图区域"""
+        self.heatmap_year += delta
+        self.heatmap_container.content = self.create_heatmap()
+        self.heatmap_container.update()
+
     def get_category_data(self) -> Dict[str, float]:
         """获取分类统计数据（仅支出）"""
         if not self.state.current_user: